@@ -0,0 +1,248 @@
+"""
+Benchmark suite for strats-oanda.
+
+Micro-benchmarks run the parsers and serializers over recorded OANDA payloads
+in `benchmarks/fixtures`. Macro-benchmarks push ticks through PricingStreamClient
+and orders through OrderClient against the local FakeOANDAServer.
+
+Usage:
+
+    python benchmarks/run.py                        # print results as JSON
+    python benchmarks/run.py -o bench.json          # save results
+    python benchmarks/run.py --compare base.json    # compare with saved results
+    python benchmarks/run.py -k parse_time          # only run matching benchmarks
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from dataclasses import asdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable, Optional
+
+from strats_oanda.client import (
+    OrderClient,
+    OrderTemplate,
+    PricingStreamClient,
+    RequestScheduler,
+)
+from strats_oanda.helper import JSONEncoder, parse_time, parse_time_ns, remove_none, to_camel_case
+from strats_oanda.helper.encoder import encode_request
+from strats_oanda.helper.json import JSON_BACKEND
+from strats_oanda.model import (
+    ClientExtensions,
+    LimitOrderRequest,
+    MarketOrderRequest,
+    decode_client_price,
+    parse_client_price,
+    parse_create_market_order_response,
+    parse_order_fill_transaction,
+)
+from strats_oanda.testing import FakeOANDAServer
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(name: str) -> dict:
+    with open(FIXTURES / name) as f:
+        return json.load(f)
+
+
+def micro(name: str, func: Callable[[], object], repeat: int = 5) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    best = min(times)
+    return {
+        "name": name,
+        "kind": "micro",
+        "unit": "ops/sec",
+        "value": 1 / best,
+        "best_us": best * 1e6,
+        "mean_us": statistics.mean(times) * 1e6,
+        "stdev_us": statistics.stdev(times) * 1e6 if len(times) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def micro_benchmarks() -> list[tuple[str, Callable[[], object]]]:
+    price = load_fixture("client_price.json")
+    price_bytes = json.dumps(price).encode() + b"\n"
+    fill = load_fixture("order_fill_transaction.json")
+    market_order_response = load_fixture("create_market_order_response.json")
+    time_str = price["time"]
+
+    limit_order = LimitOrderRequest(
+        instrument="USD_JPY",
+        units=Decimal("1000"),
+        price=Decimal("150.000"),
+        client_extensions=ClientExtensions(id="my-order-1", tag="grid", comment=""),
+    )
+
+    def encode_limit_order():
+        req = to_camel_case(remove_none({"order": asdict(limit_order)}))
+        return json.dumps(req, cls=JSONEncoder)
+
+    template = OrderTemplate(limit_order)
+
+    return [
+        ("parse_time", lambda: parse_time(time_str)),
+        ("parse_time_ns", lambda: parse_time_ns(time_str)),
+        ("parse_client_price", lambda: parse_client_price(price)),
+        (
+            "stream_line/default",
+            lambda: parse_client_price(json.loads(price_bytes.decode("utf-8").strip())),
+        ),
+        ("stream_line/fast_decode", lambda: decode_client_price(price_bytes)),
+        ("parse_order_fill_transaction", lambda: parse_order_fill_transaction(fill)),
+        (
+            "parse_create_market_order_response",
+            lambda: parse_create_market_order_response(market_order_response),
+        ),
+        ("remove_none", lambda: remove_none({"order": asdict(limit_order)})),
+        ("to_camel_case", lambda: to_camel_case({"order": asdict(limit_order)})),
+        ("encode_limit_order", encode_limit_order),
+        ("encode_limit_order/compiled", lambda: encode_request("order", limit_order)),
+        (
+            "encode_limit_order/template",
+            lambda: template.render(Decimal("1000"), Decimal("150.010"), tag="grid"),
+        ),
+    ]
+
+
+async def bench_pricing_stream(n: int, fast_decode: bool) -> dict:
+    async with FakeOANDAServer(tick_rate=0) as server:
+        server.basic_config()
+        client = PricingStreamClient(["USD_JPY", "EUR_USD"], fast_decode=fast_decode)
+        count = 0
+        start = time.perf_counter()
+        async for _ in client.stream():
+            count += 1
+            if count == n:
+                break
+        elapsed = time.perf_counter() - start
+    name = "pricing_stream/fast_decode" if fast_decode else "pricing_stream"
+    return {
+        "name": name,
+        "kind": "macro",
+        "unit": "ticks/sec",
+        "value": n / elapsed,
+        "elapsed_sec": elapsed,
+        "number": n,
+    }
+
+
+async def bench_market_orders(n: int, concurrency: int) -> dict:
+    async with FakeOANDAServer() as server:
+        server.basic_config()
+        # measure the client itself, not the client-side rate limit
+        async with OrderClient(scheduler=RequestScheduler(rate=0)) as client:
+            request = MarketOrderRequest(instrument="USD_JPY", units=Decimal("1"))
+            latencies: list[float] = []
+
+            async def worker(k: int):
+                for _ in range(k):
+                    t = time.perf_counter()
+                    await client.create_market_order(request)
+                    latencies.append(time.perf_counter() - t)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(n // concurrency) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "name": f"market_orders/concurrency={concurrency}",
+        "kind": "macro",
+        "unit": "orders/sec",
+        "value": len(latencies) / elapsed,
+        "elapsed_sec": elapsed,
+        "number": len(latencies),
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+def macro_benchmarks(quick: bool) -> list[tuple[str, Callable[[], dict]]]:
+    ticks = 5_000 if quick else 50_000
+    orders = 200 if quick else 2_000
+    return [
+        ("pricing_stream", lambda: asyncio.run(bench_pricing_stream(ticks, False))),
+        ("pricing_stream/fast_decode", lambda: asyncio.run(bench_pricing_stream(ticks, True))),
+        ("market_orders/concurrency=1", lambda: asyncio.run(bench_market_orders(orders, 1))),
+        ("market_orders/concurrency=10", lambda: asyncio.run(bench_market_orders(orders, 10))),
+    ]
+
+
+def environment() -> dict:
+    try:
+        package_version = version("strats-oanda")
+    except PackageNotFoundError:
+        package_version = "unknown"
+    return {
+        "package_version": package_version,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "json_backend": JSON_BACKEND,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def compare(results: list[dict], base_path: str):
+    with open(base_path) as f:
+        base = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"{'benchmark':<44}{'base':>14}{'current':>14}{'ratio':>8}", file=sys.stderr)
+    for r in results:
+        if r["name"] not in base:
+            continue
+        b = base[r["name"]]["value"]
+        print(
+            f"{r['name']:<44}{b:>14.1f}{r['value']:>14.1f}{r['value'] / b:>8.2f}",
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks matching this")
+    parser.add_argument("--compare", help="compare with results saved by --output")
+    parser.add_argument("--quick", action="store_true", help="smaller macro-benchmarks")
+    parser.add_argument("--micro-only", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, func in micro_benchmarks():
+        if args.filter in name:
+            results.append(micro(name, func))
+            print(f"{name}: {results[-1]['value']:.1f} {results[-1]['unit']}", file=sys.stderr)
+
+    if not args.micro_only:
+        for name, run in macro_benchmarks(args.quick):
+            if args.filter in name:
+                results.append(run())
+                print(f"{name}: {results[-1]['value']:.1f} {results[-1]['unit']}", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
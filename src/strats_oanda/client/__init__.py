@@ -1,8 +1,26 @@
+from .candle_store import CandleStore as CandleStore
+from .health import PrometheusStreamHealthExporter as PrometheusStreamHealthExporter
+from .health import StreamHealth as StreamHealth
 from .instrument import GetCandlesQueryParams as GetCandlesQueryParams
 from .instrument import GetCandlesResponse as GetCandlesResponse
 from .instrument import InstrumentClient as InstrumentClient
+from .latency import PrometheusLatencyExporter as PrometheusLatencyExporter
+from .latency import RequestTimings as RequestTimings
 from .order import CancelOrderResponse as CancelOrderResponse
 from .order import CreateLimitOrderResponse as CreateLimitOrderResponse
 from .order import OrderClient as OrderClient
+from .order import OrderTemplate as OrderTemplate
 from .pricing import PricingStreamClient as PricingStreamClient
+from .pricing_hub import PricingHub as PricingHub
+from .pricing_hub import PricingSubscription as PricingSubscription
+from .pricing_hub import get_pricing_hub as get_pricing_hub
+from .recorder import ReplayStreamClient as ReplayStreamClient
+from .recorder import TickRecorder as TickRecorder
+from .recorder import TickRecording as TickRecording
+from .scheduler import Priority as Priority
+from .scheduler import RequestScheduler as RequestScheduler
+from .scheduler import get_scheduler as get_scheduler
+from .session import create_stream_session as create_stream_session
+from .tracing import TickToTradeTracer as TickToTradeTracer
+from .tracing import TickTrace as TickTrace
 from .transaction import TransactionClient as TransactionClient
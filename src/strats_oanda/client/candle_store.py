@@ -0,0 +1,145 @@
+"""
+On-disk candle cache (SQLite)
+
+Candles are stored as the raw JSON returned by OANDA, keyed by
+(instrument, granularity, price component, time). The store also remembers which
+time ranges it fully holds, so callers only need to fetch the gaps.
+Incomplete candles (`complete == False`) are never stored.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Union
+
+from strats_oanda.helper import format_datetime, parse_time
+
+# (instrument, granularity with alignment / options (GetCandlesQueryParams.cache_key),
+#  price component)
+CandleKey = tuple[str, str, str]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    instrument TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    price TEXT NOT NULL,
+    time TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (instrument, granularity, price, time)
+);
+CREATE TABLE IF NOT EXISTS ranges (
+    instrument TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    price TEXT NOT NULL,
+    from_time TEXT NOT NULL,
+    to_time TEXT NOT NULL
+);
+"""
+
+
+def _utc(t: datetime) -> datetime:
+    return t.replace(tzinfo=timezone.utc) if t.tzinfo is None else t
+
+
+class CandleStore:
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def covered_ranges(self, key: CandleKey) -> list[tuple[datetime, datetime]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT from_time, to_time FROM ranges"
+                " WHERE instrument = ? AND granularity = ? AND price = ? ORDER BY from_time",
+                key,
+            ).fetchall()
+        return [(parse_time(a), parse_time(b)) for a, b in rows]
+
+    def missing_ranges(
+        self,
+        key: CandleKey,
+        from_time: datetime,
+        to_time: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        Return the sub-ranges of [from_time, to_time) not held by the store.
+        """
+        from_time, to_time = _utc(from_time), _utc(to_time)
+        gaps = []
+        t = from_time
+        for a, b in self.covered_ranges(key):
+            if b <= t:
+                continue
+            if a >= to_time:
+                break
+            if a > t:
+                gaps.append((t, a))
+            t = max(t, b)
+        if t < to_time:
+            gaps.append((t, to_time))
+        return gaps
+
+    def get(self, key: CandleKey, from_time: datetime, to_time: datetime) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM candles"
+                " WHERE instrument = ? AND granularity = ? AND price = ?"
+                " AND time >= ? AND time < ? ORDER BY time",
+                (*key, format_datetime(_utc(from_time)), format_datetime(_utc(to_time))),
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def put(
+        self,
+        key: CandleKey,
+        candles: list[dict],
+        from_time: datetime,
+        to_time: datetime,
+        now: Optional[datetime] = None,
+    ):
+        """
+        Store the complete candles fetched for [from_time, to_time) and mark the range
+        as held, up to the first incomplete candle (or `now`).
+        """
+        from_time, to_time = _utc(from_time), _utc(to_time)
+        covered_to = min(to_time, _utc(now) if now else datetime.now(timezone.utc))
+
+        rows = []
+        for candle in candles:
+            if not candle["complete"]:
+                covered_to = min(covered_to, parse_time(candle["time"]))
+                continue
+            rows.append((*key, format_datetime(parse_time(candle["time"])), json.dumps(candle)))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            if from_time < covered_to:
+                self._add_range(key, from_time, covered_to)
+
+    def _add_range(self, key: CandleKey, from_time: datetime, to_time: datetime):
+        rows = self._conn.execute(
+            "SELECT rowid, from_time, to_time FROM ranges"
+            " WHERE instrument = ? AND granularity = ? AND price = ?"
+            " AND from_time <= ? AND to_time >= ?",
+            (*key, format_datetime(to_time), format_datetime(from_time)),
+        ).fetchall()
+
+        # merge with overlapping or adjacent ranges
+        for rowid, a, b in rows:
+            from_time = min(from_time, parse_time(a))
+            to_time = max(to_time, parse_time(b))
+            self._conn.execute("DELETE FROM ranges WHERE rowid = ?", (rowid,))
+        self._conn.execute(
+            "INSERT INTO ranges VALUES (?, ?, ?, ?, ?)",
+            (*key, format_datetime(from_time), format_datetime(to_time)),
+        )
@@ -0,0 +1,66 @@
+"""
+Latest-value-only (conflating) delivery for slow pricing consumers
+"""
+
+import asyncio
+from typing import Optional, Union
+
+from strats_oanda.model.pricing import ClientPrice, LazyClientPrice
+
+Price = Union[ClientPrice, LazyClientPrice]
+
+
+class ConflatingQueue:
+    """
+    Keep only the newest price per instrument until the consumer takes it.
+    Instruments are delivered in the order they became pending, so a busy
+    instrument cannot starve the others. Memory is bounded by the number of
+    instruments, and overwritten ticks are counted per instrument in `dropped`.
+    """
+
+    def __init__(self):
+        self._latest: dict[Optional[str], Price] = {}
+        self._event = asyncio.Event()
+        self._closed = False
+        self.dropped: dict[Optional[str], int] = {}
+
+    def qsize(self) -> int:
+        return len(self._latest)
+
+    def empty(self) -> bool:
+        return not self._latest
+
+    def full(self) -> bool:
+        return False
+
+    def put_nowait(self, price: Price):
+        instrument = price.instrument
+        if instrument in self._latest:
+            self.dropped[instrument] = self.dropped.get(instrument, 0) + 1
+        self._latest[instrument] = price
+        self._event.set()
+
+    def get_nowait(self) -> Price:
+        if not self._latest:
+            raise asyncio.QueueEmpty
+        instrument = next(iter(self._latest))
+        return self._latest.pop(instrument)
+
+    async def get(self) -> Optional[Price]:
+        """
+        Return the next pending price, or None once the queue is closed and drained.
+        """
+        while not self._latest:
+            if self._closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+        return self.get_nowait()
+
+    def close(self):
+        self._closed = True
+        self._event.set()
+
+    @property
+    def total_dropped(self) -> int:
+        return sum(self.dropped.values())
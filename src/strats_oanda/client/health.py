@@ -0,0 +1,209 @@
+"""
+Stream health and stall detection
+
+OANDA sends a heartbeat every 5 seconds on the pricing and transaction streams.
+A stream which delivers neither data nor heartbeats for `stall_timeout` seconds is
+considered stalled (e.g. a half-open TCP connection) and the client reconnects
+instead of waiting for the transport to notice.
+
+    exporter = PrometheusStreamHealthExporter()
+    start_http_server(8000, registry=exporter.registry)
+    client = PricingStreamClient(["USD_JPY"], stall_timeout=15.0)
+    exporter.add(client.name, client.health)
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiohttp
+from prometheus_client import CollectorRegistry
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# cf. https://developer.oanda.com/rest-live-v20/pricing-ep/
+HEARTBEAT_INTERVAL = 5.0
+DEFAULT_STALL_TIMEOUT = 20.0
+
+
+class StreamHealth:
+    """
+    Arrival times (time.monotonic_ns()) of the messages and heartbeats of a stream.
+    Heartbeat jitter is the deviation of the interval between two heartbeats
+    from `heartbeat_interval`, in seconds.
+    """
+
+    def __init__(self, heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        self.heartbeat_interval = heartbeat_interval
+        self.last_message_ns: Optional[int] = None
+        self.last_heartbeat_ns: Optional[int] = None
+        # when the client last went back to reading the stream (connected, or the
+        # consumer asked for the next message)
+        self.resumed_ns = time.monotonic_ns()
+        # False while the consumer holds a message, i.e. the stream is not being read
+        self.waiting = True
+        self.messages = 0
+        self.heartbeats = 0
+        self.connects = 0
+        self.stalls = 0
+        self.jitter = 0.0
+        self.max_jitter = 0.0
+        self._total_jitter = 0.0
+        self._intervals = 0
+
+    @property
+    def mean_jitter(self) -> float:
+        return self._total_jitter / self._intervals if self._intervals else 0.0
+
+    @property
+    def since_last_message(self) -> Optional[float]:
+        if self.last_message_ns is None:
+            return None
+        return (time.monotonic_ns() - self.last_message_ns) / 1e9
+
+    @property
+    def idle(self) -> float:
+        """
+        Seconds the client has been waiting for the stream. Time spent by the
+        consumer between two messages doesn't count: 0 while it holds a message.
+        """
+        if not self.waiting:
+            return 0.0
+        last = self.resumed_ns
+        if self.last_message_ns is not None and self.last_message_ns > last:
+            last = self.last_message_ns
+        return (time.monotonic_ns() - last) / 1e9
+
+    def on_connect(self):
+        self.connects += 1
+        self.resumed_ns = time.monotonic_ns()
+        self.waiting = True
+        # the heartbeat interval does not span a reconnection
+        self.last_heartbeat_ns = None
+
+    def on_resume(self):
+        self.resumed_ns = time.monotonic_ns()
+        self.waiting = True
+
+    def on_deliver(self):
+        """
+        The client hands a message to the consumer and stops reading the stream
+        until `on_resume`.
+        """
+        self.waiting = False
+
+    def on_message(self, received_ns: int):
+        self.last_message_ns = received_ns
+        self.messages += 1
+
+    def on_heartbeat(self, received_ns: int):
+        self.last_message_ns = received_ns
+        self.heartbeats += 1
+        if self.last_heartbeat_ns is not None:
+            interval = (received_ns - self.last_heartbeat_ns) / 1e9
+            self.jitter = abs(interval - self.heartbeat_interval)
+            self.max_jitter = max(self.max_jitter, self.jitter)
+            self._total_jitter += self.jitter
+            self._intervals += 1
+        self.last_heartbeat_ns = received_ns
+
+
+async def _watch(
+    name: str,
+    health: StreamHealth,
+    resp: aiohttp.ClientResponse,
+    stall_timeout: float,
+):
+    while True:
+        # re-armed for a full period while the consumer holds a message
+        idle = health.idle
+        if idle >= stall_timeout:
+            health.stalls += 1
+            logger.warning(f"{name} No message for {idle:.1f} seconds, reconnecting")
+            # the reader gets ClientConnectionError and the client reconnects
+            resp.close()
+            return
+        await asyncio.sleep(stall_timeout - idle)
+
+
+@asynccontextmanager
+async def stall_watchdog(
+    name: str,
+    health: StreamHealth,
+    resp: aiohttp.ClientResponse,
+    stall_timeout: Optional[float],
+) -> AsyncIterator[None]:
+    """
+    Close `resp` when the client waits `stall_timeout` seconds without a message.
+    The watchdog only wakes up when the deadline passes, so receiving messages
+    costs a timestamp or two each.
+    """
+    health.on_connect()
+    if stall_timeout is None:
+        yield
+        return
+
+    task = asyncio.create_task(_watch(name, health, resp, stall_timeout))
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+class PrometheusStreamHealthExporter:
+    """
+    Collector exporting the StreamHealth of each added stream, labelled by stream name.
+    Values are read at scrape time. The collector is registered on `registry`, or on
+    a registry of its own by default.
+    """
+
+    def __init__(
+        self,
+        name: str = "oanda_stream",
+        registry: Optional[CollectorRegistry] = None,
+    ):
+        self.name = name
+        self.streams: dict[str, StreamHealth] = {}
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self.registry.register(self)
+
+    def add(self, stream: str, health: StreamHealth):
+        self.streams[stream] = health
+
+    def remove(self, stream: str):
+        self.streams.pop(stream, None)
+
+    def collect(self):
+        since_last = GaugeMetricFamily(
+            f"{self.name}_seconds_since_last_message",
+            "Seconds since the last message or heartbeat",
+            labels=["stream"],
+        )
+        jitter = GaugeMetricFamily(
+            f"{self.name}_heartbeat_jitter_seconds",
+            "Deviation of the last heartbeat interval from the expected one",
+            labels=["stream"],
+        )
+        max_jitter = GaugeMetricFamily(
+            f"{self.name}_heartbeat_jitter_max_seconds",
+            "Largest deviation of a heartbeat interval from the expected one",
+            labels=["stream"],
+        )
+        heartbeats = CounterMetricFamily(
+            f"{self.name}_heartbeats", "Received heartbeats", labels=["stream"]
+        )
+        stalls = CounterMetricFamily(
+            f"{self.name}_stalls", "Reconnections forced by the watchdog", labels=["stream"]
+        )
+        for stream, health in self.streams.items():
+            if (idle := health.since_last_message) is not None:
+                since_last.add_metric([stream], idle)
+            jitter.add_metric([stream], health.jitter)
+            max_jitter.add_metric([stream], health.max_jitter)
+            heartbeats.add_metric([stream], health.heartbeats)
+            stalls.add_metric([stream], health.stalls)
+        yield from (since_last, jitter, max_jitter, heartbeats, stalls)
@@ -1,9 +1,11 @@
 # Instrument Endpoint
 # cf. https://developer.oanda.com/rest-live-v20/instrument-ep/
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Optional
 
+import aiohttp
 import requests
 
 from strats_oanda.config import get_config
@@ -11,16 +13,74 @@ from strats_oanda.helper import format_datetime
 from strats_oanda.logger import logger
 from strats_oanda.model.instrument import (
     Candlestick,
+    CandlestickArrays,
     CandlestickGranularity,
+    WeeklyAlignment,
     parse_candlestick,
+    parse_candlestick_arrays,
+    validate_pricing_component,
 )
 
+from .candle_store import CandleStore
+from .scheduler import Priority, RequestScheduler, get_scheduler
+
+# Maximum number of candles OANDA returns in one response
+MAX_CANDLES_PER_REQUEST = 5000
+
 
 @dataclass
 class GetCandlesQueryParams:
     count: Optional[int] = None
     from_time: Optional[datetime] = None
     to_time: Optional[datetime] = None
+    granularity: CandlestickGranularity = CandlestickGranularity.M1
+    # PricingComponent
+    # Can contain any combination of the characters “M” (midpoint candles)
+    # “B” (bid candles) and “A” (ask candles).
+    # cf. https://developer.oanda.com/rest-live-v20/primitives-df/#PricingComponent
+    price: str = "M"
+    smooth: Optional[bool] = None
+    include_first: Optional[bool] = None
+    # The hour of the day (in the alignment_timezone) used for granularities
+    # that have daily alignments. [0, 23]
+    daily_alignment: Optional[int] = None
+    # e.g. "America/New_York"
+    alignment_timezone: Optional[str] = None
+    weekly_alignment: Optional[WeeklyAlignment] = None
+
+    def __post_init__(self):
+        validate_pricing_component(self.price)
+        if self.daily_alignment is not None and not 0 <= self.daily_alignment <= 23:
+            raise ValueError(f"daily_alignment must be in [0, 23]: {self.daily_alignment}")
+
+    @property
+    def alignment_key(self) -> str:
+        """
+        Identify candles aligned differently (daily / weekly alignment) in caches.
+        """
+        if (
+            self.daily_alignment is None
+            and self.alignment_timezone is None
+            and self.weekly_alignment is None
+        ):
+            return self.granularity.value
+        # 0 is a valid daily alignment, distinct from OANDA's default (17)
+        daily = "" if self.daily_alignment is None else self.daily_alignment
+        weekly = self.weekly_alignment.value if self.weekly_alignment else ""
+        return f"{self.granularity.value}@{daily}/{self.alignment_timezone or ''}/{weekly}"
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Identify candles which differ in caches: alignment, smoothing, and whether
+        each window includes its first candle. The defaults keep `alignment_key`.
+        """
+        key = self.alignment_key
+        if self.smooth:
+            key += "+smooth"
+        if self.include_first is False:
+            key += "+exclude_first"
+        return key
 
 
 @dataclass
@@ -38,9 +98,66 @@ def parse_get_candles_response(data) -> GetCandlesResponse:
     )
 
 
+def to_query(params: GetCandlesQueryParams) -> dict[str, str]:
+    payload = {
+        "price": params.price,
+        "granularity": params.granularity.value,
+    }
+    if params.count is not None:
+        payload["count"] = str(params.count)
+    if params.from_time is not None:
+        payload["from"] = format_datetime(params.from_time)
+    if params.to_time is not None:
+        payload["to"] = format_datetime(params.to_time)
+    if params.smooth is not None:
+        payload["smooth"] = "true" if params.smooth else "false"
+    if params.include_first is not None:
+        payload["includeFirst"] = "true" if params.include_first else "false"
+    if params.daily_alignment is not None:
+        payload["dailyAlignment"] = str(params.daily_alignment)
+    if params.alignment_timezone is not None:
+        payload["alignmentTimezone"] = params.alignment_timezone
+    if params.weekly_alignment is not None:
+        payload["weeklyAlignment"] = params.weekly_alignment.value
+    return payload
+
+
+def split_time_range(
+    from_time: datetime,
+    to_time: datetime,
+    params: GetCandlesQueryParams,
+) -> list[GetCandlesQueryParams]:
+    """
+    Split [from_time, to_time) into windows of at most MAX_CANDLES_PER_REQUEST candles.
+    Other query parameters are copied from `params`.
+    """
+    window = params.granularity.timedelta * MAX_CANDLES_PER_REQUEST
+    windows = []
+    t = from_time
+    while t < to_time:
+        end = min(t + window, to_time)
+        windows.append(replace(params, count=None, from_time=t, to_time=end))
+        t = end
+    return windows
+
+
 class InstrumentClient:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        keepalive_timeout: float = 60.0,
+        cache: Optional[CandleStore] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.config = get_config()
+        self.max_concurrency = max_concurrency
+        # Rate limit shared with the other REST clients of the account.
+        # Candle requests yield to order requests.
+        self.scheduler = scheduler or get_scheduler()
+        self.keepalive_timeout = keepalive_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        # If set, `get_candles_range` only fetches what the cache doesn't hold
+        self.cache = cache
 
     def get_candles(
         self,
@@ -48,28 +165,163 @@ class InstrumentClient:
         params: GetCandlesQueryParams,
     ) -> Optional[GetCandlesResponse]:
         url = f"{self.config.rest_url}/v3/instruments/{instrument}/candles"
-        payload = {
-            # PricingComponent
-            # Can contain any combination of the characters “M” (midpoint candles)
-            # “B” (bid candles) and “A” (ask candles).
-            # cf. https://developer.oanda.com/rest-live-v20/primitives-df/#PricingComponent
-            "price": "M",
-            "granularity": "M1",
-        }
-        if params.count is not None:
-            payload["count"] = str(params.count)
-        if params.from_time is not None:
-            payload["from"] = format_datetime(params.from_time)
-        if params.to_time is not None:
-            payload["to"] = format_datetime(params.to_time)
-
         headers = {
             "Authorization": f"Bearer {self.config.token}",
             "Content-Type": "application/json",
         }
-        res = requests.get(url, headers=headers, params=payload)
+        # blocks the thread while rate limited
+        self.scheduler.acquire_blocking(Priority.HISTORY)
+        res = requests.get(url, headers=headers, params=to_query(params))
 
         if res.status_code == 200:
             return parse_get_candles_response(res.json())
         logger.error(f"Error get candles data: {res.status_code} {res.text}")
         return None
+
+    async def open(self):
+        self.session = aiohttp.ClientSession(
+            headers={
+                "Authorization": f"Bearer {self.config.token}",
+                "Content-Type": "application/json",
+            },
+            connector=aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                keepalive_timeout=self.keepalive_timeout,
+            ),
+        )
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        else:
+            raise ValueError("session is not opened")
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def fetch_candles(
+        self,
+        instrument: str,
+        params: GetCandlesQueryParams,
+    ) -> GetCandlesResponse:
+        """
+        Async version of `get_candles` over the pooled session.
+        """
+        return parse_get_candles_response(await self._fetch(instrument, params))
+
+    async def get_candles_range(
+        self,
+        instrument: str,
+        from_time: datetime,
+        to_time: datetime,
+        granularity: CandlestickGranularity = CandlestickGranularity.M1,
+        price: str = "M",
+        params: Optional[GetCandlesQueryParams] = None,
+    ) -> GetCandlesResponse:
+        """
+        Fetch all candles in [from_time, to_time).
+        The range is split into 5000-candle windows which are fetched concurrently
+        (at most `max_concurrency` at a time, rate limited by `scheduler`),
+        then merged in time order without duplicates.
+        With a cache, only the ranges missing from it (including the still-incomplete
+        last candle) are fetched and the rest is read from disk.
+        `params` overrides `granularity` / `price` and carries the alignment options.
+        """
+        params = params or GetCandlesQueryParams(granularity=granularity, price=price)
+        candles = await self._get_raw_candles_range(instrument, from_time, to_time, params)
+        return GetCandlesResponse(
+            instrument=instrument,
+            granularity=params.granularity,
+            candles=[parse_candlestick(x) for x in candles],
+        )
+
+    async def get_candle_arrays(
+        self,
+        instrument: str,
+        from_time: datetime,
+        to_time: datetime,
+        granularity: CandlestickGranularity = CandlestickGranularity.M1,
+        price: str = "M",
+        params: Optional[GetCandlesQueryParams] = None,
+    ) -> CandlestickArrays:
+        """
+        Same as `get_candles_range`, but returns columnar NumPy arrays (requires numpy).
+        """
+        params = params or GetCandlesQueryParams(granularity=granularity, price=price)
+        candles = await self._get_raw_candles_range(instrument, from_time, to_time, params)
+        return parse_candlestick_arrays(candles)
+
+    async def get_candles_multi(
+        self,
+        instrument: str,
+        from_time: datetime,
+        to_time: datetime,
+        granularities: list[CandlestickGranularity],
+        price: str = "M",
+    ) -> dict[CandlestickGranularity, GetCandlesResponse]:
+        """
+        Fetch each granularity at its own resolution (aggregated by the server)
+        concurrently, instead of fetching M1 and resampling locally.
+        """
+        responses = await asyncio.gather(
+            *(
+                self.get_candles_range(instrument, from_time, to_time, granularity, price)
+                for granularity in granularities
+            )
+        )
+        return dict(zip(granularities, responses))
+
+    async def _get_raw_candles_range(
+        self,
+        instrument: str,
+        from_time: datetime,
+        to_time: datetime,
+        params: GetCandlesQueryParams,
+    ) -> list[dict]:
+        key = (instrument, params.cache_key, params.price)
+        if self.cache is None:
+            gaps = [(from_time, to_time)]
+        else:
+            gaps = self.cache.missing_ranges(key, from_time, to_time)
+
+        windows = [w for a, b in gaps for w in split_time_range(a, b, params)]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(window: GetCandlesQueryParams) -> dict:
+            async with semaphore:
+                return await self._fetch(instrument, window)
+
+        logger.info(f"get candles {instrument} {params.granularity.value}: {len(windows)} requests")
+        pages = await asyncio.gather(*(fetch(w) for w in windows))
+
+        candles: dict[str, dict] = {}
+        if self.cache is not None:
+            for w, page in zip(windows, pages):
+                assert w.from_time is not None and w.to_time is not None
+                self.cache.put(key, page["candles"], w.from_time, w.to_time)
+            for candle in self.cache.get(key, from_time, to_time):
+                candles[candle["time"]] = candle
+        for page in pages:
+            for candle in page["candles"]:
+                candles[candle["time"]] = candle
+
+        return [candles[t] for t in sorted(candles)]
+
+    async def _fetch(self, instrument: str, params: GetCandlesQueryParams) -> dict:
+        if self.session is None or self.session.closed:
+            raise RuntimeError(
+                "ClientSession is not open. Use `async with InstrumentClient() as client:` format",
+            )
+
+        await self.scheduler.acquire(Priority.HISTORY)
+        url = f"{self.config.rest_url}/v3/instruments/{instrument}/candles"
+        async with self.session.get(url, params=to_query(params)) as res:
+            if res.status == 200:
+                return await res.json()
+            text = await res.text()
+            raise RuntimeError(f"error get candles: http_status={res.status} text={text}")
@@ -0,0 +1,169 @@
+"""
+Per-stage latency of REST requests
+
+Stages of one request (seconds, summed over retries):
+
+    encode   serializing the request body
+    queue    waiting for the rate limiter and for a free connection in the pool
+    connect  DNS + TCP + TLS of a new connection (0 when a connection is reused)
+    ttfb     request headers sent -> response headers received
+    body     reading the response body
+    parse    decoding JSON and building the response model
+
+Timings are collected with aiohttp's TraceConfig and passed to latency hooks,
+e.g. `PrometheusLatencyExporter`.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+STAGES = ("encode", "queue", "connect", "ttfb", "body", "parse")
+
+# 10us .. 5s
+LATENCY_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+@dataclass
+class RequestTimings:
+    endpoint: str
+    method: str
+    encode: float = 0.0
+    queue: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0
+    body: float = 0.0
+    parse: float = 0.0
+    total: float = 0.0
+    attempts: int = 0
+    reused_connection: bool = False
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+    # perf_counter marks of the stage in progress
+    _marks: dict[str, float] = field(default_factory=dict, repr=False, compare=False)
+
+    def start(self, stage: str):
+        self._marks[stage] = time.perf_counter()
+
+    def end(self, stage: str):
+        start = self._marks.pop(stage, None)
+        if start is not None:
+            setattr(self, stage, getattr(self, stage) + time.perf_counter() - start)
+
+
+LatencyHook = Callable[[RequestTimings], None]
+
+
+async def _on_connection_queued_start(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.start("queue")
+
+
+async def _on_connection_queued_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.end("queue")
+
+
+async def _on_connection_create_start(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.start("connect")
+
+
+async def _on_connection_create_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.end("connect")
+
+
+async def _on_connection_reuseconn(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.reused_connection = True
+
+
+async def _on_request_headers_sent(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.start("ttfb")
+
+
+async def _on_request_end(session, ctx, params):
+    if ctx.trace_request_ctx is not None:
+        ctx.trace_request_ctx.end("ttfb")
+
+
+def latency_trace_config() -> aiohttp.TraceConfig:
+    """
+    TraceConfig filling the RequestTimings passed as `trace_request_ctx`.
+    """
+    config = aiohttp.TraceConfig()
+    config.on_connection_queued_start.append(_on_connection_queued_start)
+    config.on_connection_queued_end.append(_on_connection_queued_end)
+    config.on_connection_create_start.append(_on_connection_create_start)
+    config.on_connection_create_end.append(_on_connection_create_end)
+    config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    config.on_request_headers_sent.append(_on_request_headers_sent)
+    config.on_request_end.append(_on_request_end)
+    return config
+
+
+class PrometheusLatencyExporter:
+    """
+    Latency hook observing each stage in a histogram labelled by endpoint and stage.
+    Metrics are registered on `registry`, or on a registry of their own by default,
+    so that several exporters can coexist.
+
+        exporter = PrometheusLatencyExporter("oanda_order")
+        start_http_server(8000, registry=exporter.registry)
+        client = OrderClient()
+        client.add_latency_hook(exporter)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        registry: Optional[CollectorRegistry] = None,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self.latency = Histogram(
+            f"{name}_latency_seconds",
+            "Latency of REST requests by stage",
+            ["endpoint", "stage"],
+            buckets=buckets,
+            registry=self.registry,
+        )
+        self.errors = Counter(
+            f"{name}_errors",
+            "Failed REST requests",
+            ["endpoint"],
+            registry=self.registry,
+        )
+
+    def __call__(self, timings: RequestTimings):
+        if timings.error is not None:
+            self.errors.labels(timings.endpoint).inc()
+            return
+        for stage in STAGES:
+            self.latency.labels(timings.endpoint, stage).observe(getattr(timings, stage))
+        self.latency.labels(timings.endpoint, "total").observe(timings.total)
@@ -3,38 +3,138 @@ Order Endpoints Client
 cf. https://developer.oanda.com/rest-live-v20/order-ep/
 """
 
-import json
+import asyncio
+import contextlib
 import logging
-from dataclasses import asdict
-from typing import Optional
+import time
+from collections.abc import Awaitable, Callable
+from decimal import Decimal
+from functools import partial
+from typing import Optional, TypeVar, Union
 
 import aiohttp
 
 from strats_oanda.config import get_config
-from strats_oanda.helper import JSONEncoder, remove_none, to_camel_case
+from strats_oanda.helper import loads
+from strats_oanda.helper.encoder import (
+    compile_encoder,
+    encode_decimal,
+    encode_request,
+    encode_str,
+)
 from strats_oanda.model import (
     CancelOrderResponse,
     CreateLimitOrderResponse,
     CreateMarketOrderResponse,
     LimitOrderRequest,
     MarketOrderRequest,
+    OrderType,
     parse_cancel_order_response,
     parse_create_limit_order_response,
     parse_create_market_order_response,
 )
 
+from .latency import LatencyHook, RequestTimings, latency_trace_config
+from .scheduler import Priority, RequestScheduler, get_scheduler
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Sending these twice has the same effect as sending them once
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# 429 is refused before being processed, so it is retried for any method
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Fields written per call by OrderTemplate.render
+_TEMPLATE_FIELDS = ("units", "price", "price_bound", "client_extensions")
+
+
+class OrderTemplate:
+    """
+    An order request serialized once. Only units, price and client extensions
+    (tag / id) are written per call, everything else is reused as bytes.
+
+    `price` is the limit price of a LIMIT order and the price bound of a MARKET order.
+    """
+
+    def __init__(self, request: Union[MarketOrderRequest, LimitOrderRequest]):
+        self.request = request
+        self.type = request.type
+        static = compile_encoder(type(request), _TEMPLATE_FIELDS)(request)
+        # without the braces; `instrument` is always present so this is never empty
+        self._static = static[1:-1]
+        self._price_key = b'"price":' if self.type == OrderType.LIMIT else b'"priceBound":'
+        if isinstance(request, LimitOrderRequest):
+            self._price: Optional[Decimal] = request.price
+        else:
+            self._price = request.price_bound
+        self._client_extensions = request.client_extensions
+
+    def render(
+        self,
+        units: Decimal,
+        price: Optional[Decimal] = None,
+        tag: Optional[str] = None,
+        client_id: Optional[str] = None,
+    ) -> bytes:
+        parts = [b'"units":' + encode_decimal(units)]
+        if price is None:
+            price = self._price
+        if price is not None:
+            parts.append(self._price_key + encode_decimal(price))
+
+        ext = self._client_extensions
+        ext_id = client_id if client_id is not None else (ext.id if ext else None)
+        ext_tag = tag if tag is not None else (ext.tag if ext else None)
+        ext_comment = ext.comment if ext else None
+        if ext_id is not None or ext_tag is not None or ext_comment is not None:
+            items = []
+            if ext_id is not None:
+                items.append(b'"id":' + encode_str(ext_id))
+            if ext_tag is not None:
+                items.append(b'"tag":' + encode_str(ext_tag))
+            if ext_comment is not None:
+                items.append(b'"comment":' + encode_str(ext_comment))
+            parts.append(b'"clientExtensions":{' + b",".join(items) + b"}")
+
+        parts.append(self._static)
+        return b'{"order":{' + b",".join(parts) + b"}}"
+
 
 class OrderClient:
-    def __init__(self, keepalive_timeout: float = 60.0, max_retries: int = 2):
+    def __init__(
+        self,
+        keepalive_timeout: float = 60.0,
+        max_retries: int = 2,
+        max_in_flight: int = 10,
+        scheduler: Optional[RequestScheduler] = None,
+        retry_delay: float = 0.1,
+        warm_up_connections: int = 0,
+        keepalive_interval: Optional[float] = None,  # seconds, e.g. 20.0
+    ):
         self.config = get_config()
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.config.token}",
         }
         self.keepalive_timeout = keepalive_timeout
+        # Retry idempotent requests on transport errors / 5xx / 429, and any request
+        # which failed to connect (i.e. was never sent), with exponential backoff
         self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # Opt-in: connections opened by `open()` before the first order and kept alive
+        # by pinging every `keepalive_interval` seconds (< keepalive_timeout).
+        # Both send GET /summary requests, which count towards the rate limit.
+        self.warm_up_connections = warm_up_connections
+        self.keepalive_interval = keepalive_interval
+        self._keepalive_task: Optional[asyncio.Task] = None
+        # Called with the per-stage RequestTimings of every request
+        self.latency_hooks: list[LatencyHook] = []
+        # Default limit of concurrent requests of the batch methods
+        self.max_in_flight = max_in_flight
+        # Rate limit shared with the other REST clients of the account
+        self.scheduler = scheduler or get_scheduler()
         self.session: Optional[aiohttp.ClientSession] = None
 
     async def open(self):
@@ -43,9 +143,20 @@ class OrderClient:
             connector=aiohttp.TCPConnector(
                 keepalive_timeout=self.keepalive_timeout,
             ),
+            trace_configs=[latency_trace_config()],
         )
+        if self.warm_up_connections > 0:
+            await self.warm_up()
+        if self.keepalive_interval:
+            self._keepalive_task = asyncio.create_task(self._keepalive())
 
     async def close(self):
+        if self._keepalive_task is not None:
+            # let a running ping finish before its session is closed
+            self._keepalive_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._keepalive_task
+            self._keepalive_task = None
         if self.session and not self.session.closed:
             await self.session.close()
         else:
@@ -58,49 +169,259 @@ class OrderClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
 
+    def add_latency_hook(self, hook: LatencyHook):
+        self.latency_hooks.append(hook)
+
+    async def ping(self) -> dict:
+        """
+        GET the account summary, which is cheap and keeps the connection alive.
+        """
+        url = f"{self.config.account_rest_url}/summary"
+        return await self._request("ping", "GET", url, dict, priority=Priority.DEFAULT)
+
+    async def warm_up(self, connections: Optional[int] = None):
+        """
+        Open `connections` (default `warm_up_connections`) connections (TCP + TLS)
+        ahead of the first order. Failures are only logged; orders will connect on demand.
+        """
+        if connections is None:
+            connections = self.warm_up_connections
+        results = await asyncio.gather(
+            *(self.ping() for _ in range(connections)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"connection warm-up failed: {result}")
+
+    async def _keepalive(self):
+        assert self.keepalive_interval is not None
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            await self.warm_up(max(self.warm_up_connections, 1))
+
     async def create_market_order(
         self,
         market_order: MarketOrderRequest,
+    ) -> CreateMarketOrderResponse:
+        start = time.perf_counter()
+        order_data = encode_request("order", market_order)
+        return await self._create_market_order(order_data, time.perf_counter() - start)
+
+    async def create_market_order_from_template(
+        self,
+        template: OrderTemplate,
+        units: Decimal,
+        price_bound: Optional[Decimal] = None,
+        tag: Optional[str] = None,
+        client_id: Optional[str] = None,
+    ) -> CreateMarketOrderResponse:
+        if template.type != OrderType.MARKET:
+            raise ValueError(f"not a market order template: {template.type}")
+        start = time.perf_counter()
+        order_data = template.render(units, price_bound, tag, client_id)
+        return await self._create_market_order(order_data, time.perf_counter() - start)
+
+    async def _create_market_order(
+        self,
+        order_data: bytes,
+        encode: float,
     ) -> CreateMarketOrderResponse:
         url = f"{self.config.account_rest_url}/orders"
-        req = to_camel_case(remove_none({"order": asdict(market_order)}))
-        order_data = json.dumps(req, cls=JSONEncoder)
-        logger.info(f"create market order: {order_data}")
+        logger.info(f"create market order: {order_data.decode()}")
 
-        data = await self._request("POST", url, data=order_data)
+        result = await self._request(
+            "create_market_order",
+            "POST",
+            url,
+            parse_create_market_order_response,
+            encode=encode,
+            data=order_data,
+        )
         logger.info("create market order success")
-        return parse_create_market_order_response(data)
+        return result
 
     async def create_limit_order(
         self,
         limit_order: LimitOrderRequest,
+    ) -> CreateLimitOrderResponse:
+        start = time.perf_counter()
+        order_data = encode_request("order", limit_order)
+        return await self._create_limit_order(order_data, time.perf_counter() - start)
+
+    async def create_limit_order_from_template(
+        self,
+        template: OrderTemplate,
+        units: Decimal,
+        price: Optional[Decimal] = None,
+        tag: Optional[str] = None,
+        client_id: Optional[str] = None,
+    ) -> CreateLimitOrderResponse:
+        if template.type != OrderType.LIMIT:
+            raise ValueError(f"not a limit order template: {template.type}")
+        start = time.perf_counter()
+        order_data = template.render(units, price, tag, client_id)
+        return await self._create_limit_order(order_data, time.perf_counter() - start)
+
+    async def _create_limit_order(
+        self,
+        order_data: bytes,
+        encode: float,
     ) -> CreateLimitOrderResponse:
         url = f"{self.config.account_rest_url}/orders"
-        req = to_camel_case(remove_none({"order": asdict(limit_order)}))
-        order_data = json.dumps(req, cls=JSONEncoder)
-        logger.info(f"create limit order: {order_data}")
+        logger.info(f"create limit order: {order_data.decode()}")
 
-        data = await self._request("POST", url, data=order_data)
+        result = await self._request(
+            "create_limit_order",
+            "POST",
+            url,
+            parse_create_limit_order_response,
+            encode=encode,
+            data=order_data,
+        )
         logger.info("create limit order success")
-        return parse_create_limit_order_response(data)
+        return result
 
     async def cancel_limit_order(self, order_id: str) -> CancelOrderResponse:
         url = f"{self.config.account_rest_url}/orders/{order_id}/cancel"
         logger.info(f"cancel order: {order_id=}")
 
-        data = await self._request("PUT", url)
-        logger.info(f"cancel limit order success: {data}")
-        return parse_cancel_order_response(data)
+        result = await self._request("cancel_order", "PUT", url, parse_cancel_order_response)
+        logger.info(f"cancel limit order success: {order_id=}")
+        return result
+
+    async def create_limit_orders(
+        self,
+        limit_orders: list[LimitOrderRequest],
+        max_in_flight: Optional[int] = None,
+    ) -> list[Union[CreateLimitOrderResponse, Exception]]:
+        """
+        Send limit orders concurrently (at most `max_in_flight` at a time).
+        Results are in the order of `limit_orders`; a failed order gives its exception.
+        """
+        return await self._batch(
+            [partial(self.create_limit_order, o) for o in limit_orders],
+            max_in_flight,
+        )
 
-    async def _request(self, method: str, url: str, **kwargs) -> dict:
+    async def cancel_limit_orders(
+        self,
+        order_ids: list[str],
+        max_in_flight: Optional[int] = None,
+    ) -> list[Union[CancelOrderResponse, Exception]]:
+        """
+        Cancel orders concurrently (at most `max_in_flight` at a time).
+        Results are in the order of `order_ids`; a failed cancel gives its exception.
+        """
+        return await self._batch(
+            [partial(self.cancel_limit_order, i) for i in order_ids],
+            max_in_flight,
+        )
+
+    async def _batch(
+        self,
+        calls: list[Callable[[], Awaitable[T]]],
+        max_in_flight: Optional[int],
+    ) -> list[Union[T, Exception]]:
+        semaphore = asyncio.Semaphore(max_in_flight or self.max_in_flight)
+
+        async def run(call: Callable[[], Awaitable[T]]) -> Union[T, Exception]:
+            async with semaphore:
+                try:
+                    return await call()
+                except Exception as e:
+                    logger.error(f"batch order request failed: {e}")
+                    return e
+
+        return list(await asyncio.gather(*(run(call) for call in calls)))
+
+    async def _request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        parse: Callable[[dict], T],
+        priority: Priority = Priority.ORDER,
+        encode: float = 0.0,
+        **kwargs,
+    ) -> T:
         if self.session is None or self.session.closed:
             raise RuntimeError(
                 "ClientSession is not open. Use `async with OrderClient() as client:` format",
             )
 
-        async with self.session.request(method, url, **kwargs) as res:
-            if res.status == 201 or res.status == 200:
-                return await res.json()
-            else:
-                text = await res.text()
-                raise RuntimeError(f"error order request: http_status={res.status} text={text}")
+        timings = RequestTimings(endpoint=endpoint, method=method, encode=encode)
+        start = time.perf_counter()
+        try:
+            body = await self._send(self.session, method, url, priority, timings, **kwargs)
+            timings.start("parse")
+            result = parse(loads(body))
+            timings.end("parse")
+            return result
+        except Exception as e:
+            timings.error = str(e) or type(e).__name__
+            raise
+        finally:
+            timings.total = timings.encode + time.perf_counter() - start
+            for hook in self.latency_hooks:
+                try:
+                    hook(timings)
+                except Exception:
+                    logger.exception("latency hook failed")
+
+    async def _send(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        priority: Priority,
+        timings: RequestTimings,
+        **kwargs,
+    ) -> bytes:
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            timings.queue += await self.scheduler.acquire(priority)
+            timings.attempts += 1
+            try:
+                async with session.request(method, url, trace_request_ctx=timings, **kwargs) as res:
+                    timings.status = res.status
+                    timings.start("body")
+                    body = await res.read()
+                    timings.end("body")
+                    if res.status == 201 or res.status == 200:
+                        return body
+                    text = body.decode(errors="replace")
+                    retryable = res.status == 429 or (idempotent and res.status in RETRY_STATUSES)
+                    if not retryable or attempt >= self.max_retries:
+                        raise RuntimeError(
+                            f"error order request: http_status={res.status} text={text}"
+                        )
+                    delay = _retry_after(res.headers.get("Retry-After"))
+                    reason = f"http_status={res.status}"
+            except aiohttp.ClientConnectorError as e:
+                # the connection was never established, so the request was not sent
+                if attempt >= self.max_retries:
+                    raise
+                delay = None
+                reason = str(e)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = None
+                reason = str(e) or type(e).__name__
+
+            if delay is None:
+                delay = self.retry_delay * 2**attempt
+            attempt += 1
+            logger.warning(
+                f"retry {method} {url} ({attempt}/{self.max_retries}) in {delay:.3f}s: {reason}"
+            )
+            await asyncio.sleep(delay)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
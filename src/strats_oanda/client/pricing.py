@@ -4,18 +4,31 @@ cf. https://developer.oanda.com/rest-live-v20/pricing-ep/
 """
 
 import asyncio
-import json
+import contextlib
 import logging
 import random
+import time
 from collections.abc import AsyncGenerator
-from typing import Optional
+from typing import Optional, Union
 
 import aiohttp
 from aiohttp import ClientConnectionError, ClientPayloadError, ServerDisconnectedError
 from strats.monitor import StreamClient
 
 from strats_oanda.config import get_config
-from strats_oanda.model.pricing import ClientPrice, parse_client_price
+from strats_oanda.helper import loads
+from strats_oanda.model.pricing import (
+    ClientPrice,
+    LazyClientPrice,
+    PricingHeartbeat,
+    parse_client_price,
+    parse_pricing_heartbeat,
+)
+
+from .conflation import ConflatingQueue
+from .health import DEFAULT_STALL_TIMEOUT, StreamHealth, stall_watchdog
+from .recorder import TickRecorder
+from .session import create_stream_session
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +42,12 @@ class PricingStreamClient(StreamClient):
         name: Optional[str] = None,
         max_retries: int = 5,
         base_delay: float = 1.0,  # seconds
+        fast_decode: bool = False,
+        conflate: bool = False,
+        recorder: Optional[TickRecorder] = None,
+        stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT,  # seconds
+        health: Optional[StreamHealth] = None,
+        session: Optional[aiohttp.ClientSession] = None,
     ):
         if not isinstance(instruments, list):
             raise ValueError(f"instruments must be list: {instruments}")
@@ -41,73 +60,177 @@ class PricingStreamClient(StreamClient):
         self.instruments = instruments
         self.max_retries = max_retries
         self.base_delay = base_delay
-
-    async def stream(self) -> AsyncGenerator[ClientPrice, None]:
-        attempt = 0
-
-        while True:
+        # If True, decode raw bytes directly (orjson/msgspec when installed)
+        # and yield LazyClientPrice instead of ClientPrice.
+        self.fast_decode = fast_decode
+        # If True, the socket is drained in a background task and only the newest
+        # price per instrument is kept while the consumer is busy.
+        self.conflate = conflate
+        self.conflating_queue: Optional[ConflatingQueue] = None
+        # Append every received tick to a columnar recording
+        self.recorder = recorder
+        # Reconnect when neither a price nor a heartbeat arrives for this long
+        # (None disables the watchdog)
+        self.stall_timeout = stall_timeout
+        self.health = health or StreamHealth()
+        # Kept across reconnects. An injected session is shared with others
+        # and not closed by this client.
+        self.session = session
+        self._owns_session = session is None
+        self.last_heartbeat: Optional[PricingHeartbeat] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            if not self._owns_session:
+                raise RuntimeError(f"{self.name} The injected ClientSession is closed")
+            self.session = create_stream_session()
+        return self.session
+
+    async def _release_session(self):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def close(self):
+        await self._release_session()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def dropped(self) -> dict[Optional[str], int]:
+        """
+        Number of ticks dropped by conflation per instrument.
+        """
+        if self.conflating_queue is None:
+            return {}
+        return self.conflating_queue.dropped
+
+    async def stream(self) -> AsyncGenerator[Union[ClientPrice, LazyClientPrice], None]:
+        if not self.conflate:
+            prices = self._stream()
             try:
-                logger.info(f"{self.name} Connecting...")
-
-                url = f"{self.config.account_streaming_url}/pricing/stream"
-                params = {"instruments": ",".join(self.instruments)}
-                headers = {
-                    "Authorization": f"Bearer {self.config.token}",
-                    "Accept-Datetime-Format": "RFC3339",
-                }
-                timeout = aiohttp.ClientTimeout(total=60 * 60 * 24)
-
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.get(url, headers=headers, params=params) as resp:
+                async for price in prices:
+                    yield price
+            finally:
+                # release the connection and session now, not when garbage collected
+                await prices.aclose()
+            return
+
+        queue = ConflatingQueue()
+        self.conflating_queue = queue
+        task = asyncio.create_task(self._drain(queue))
+        try:
+            while True:
+                latest = await queue.get()
+                if latest is None:
+                    break
+                yield latest
+        finally:
+            # let _stream() flush the recorder and release the session now
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _drain(self, queue: ConflatingQueue):
+        try:
+            async for price in self._stream():
+                queue.put_nowait(price)
+        finally:
+            queue.close()
+
+    async def _stream(self) -> AsyncGenerator[Union[ClientPrice, LazyClientPrice], None]:
+        attempt = 0
+        try:
+            while True:
+                try:
+                    logger.info(f"{self.name} Connecting...")
+
+                    url = f"{self.config.account_streaming_url}/pricing/stream"
+                    params = {"instruments": ",".join(self.instruments)}
+                    headers = {
+                        "Authorization": f"Bearer {self.config.token}",
+                        "Accept-Datetime-Format": "RFC3339",
+                    }
+                    timeout = aiohttp.ClientTimeout(total=60 * 60 * 24)
+
+                    session = self._get_session()
+                    async with session.get(
+                        url, headers=headers, params=params, timeout=timeout
+                    ) as resp:
                         if resp.status != 200:
                             raise RuntimeError(f"Failed to connect: status={resp.status}")
 
                         logger.info(f"{self.name} Connected to OANDA pricing stream")
                         attempt = 0  # reset retry count on success
 
-                        async for line_bytes in resp.content:
-                            line = line_bytes.decode("utf-8").strip()
-
-                            if not line or "HEARTBEAT" in line:
-                                continue
-
-                            try:
-                                msg = json.loads(line)
-                                yield parse_client_price(msg)
-                            except Exception as e:
-                                logger.error(f"{self.name} Failed to parse message: {e}, {line=}")
-                                continue
-
-            except asyncio.CancelledError:
-                logger.info(f"{self.name} cancelled")
-                raise
-
-            except (
-                ClientConnectionError,
-                ClientPayloadError,
-                ServerDisconnectedError,
-                asyncio.TimeoutError,
-            ) as e:
-                logger.warning(
-                    f"{self.name} Stream disconnected (retryable): {type(e).__name__}: {e}"
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"{self.name} Unhandled exception in PricingStreamClient:"
-                    f"{type(e).__name__}: {e}"
-                )
-
-            finally:
-                logger.info(f"{self.name} Disconnected from pricing stream")
-
-            attempt += 1
-            if attempt > self.max_retries:
-                logger.error(
-                    f"{self.name} Max retry attempts exceeded({self.max_retries}), giving up."
-                )
-                break
-
-            delay = self.base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
-            logger.info(f"{self.name} Retrying in {delay:.1f} seconds... (attempt {attempt})")
-            await asyncio.sleep(delay)
+                        async with stall_watchdog(self.name, self.health, resp, self.stall_timeout):
+                            async for line_bytes in resp.content:
+                                received_ns = time.monotonic_ns()
+                                if not line_bytes.strip():
+                                    continue
+
+                                try:
+                                    data = loads(line_bytes)
+                                    if data.get("type") == "HEARTBEAT":
+                                        self.last_heartbeat = parse_pricing_heartbeat(data)
+                                        self.health.on_heartbeat(received_ns)
+                                        continue
+                                    price: Union[ClientPrice, LazyClientPrice]
+                                    if self.fast_decode:
+                                        price = LazyClientPrice(data)
+                                    else:
+                                        price = parse_client_price(data)
+                                except Exception as e:
+                                    logger.error(
+                                        f"{self.name} Failed to parse message: {e}, {line_bytes=}"
+                                    )
+                                    continue
+                                self.health.on_message(received_ns)
+                                price.received_ns = received_ns
+                                if self.recorder is not None:
+                                    self.recorder.record(price)
+                                self.health.on_deliver()
+                                yield price
+                                self.health.on_resume()
+
+                except asyncio.CancelledError:
+                    logger.info(f"{self.name} cancelled")
+                    raise
+
+                except (
+                    ClientConnectionError,
+                    ClientPayloadError,
+                    ServerDisconnectedError,
+                    asyncio.TimeoutError,
+                ) as e:
+                    logger.warning(
+                        f"{self.name} Stream disconnected (retryable): {type(e).__name__}: {e}"
+                    )
+
+                except Exception as e:
+                    logger.error(
+                        f"{self.name} Unhandled exception in PricingStreamClient:"
+                        f"{type(e).__name__}: {e}"
+                    )
+
+                finally:
+                    if self.recorder is not None:
+                        self.recorder.flush()
+                    logger.info(f"{self.name} Disconnected from pricing stream")
+
+                attempt += 1
+                if attempt > self.max_retries:
+                    logger.error(
+                        f"{self.name} Max retry attempts exceeded({self.max_retries}), giving up."
+                    )
+                    break
+
+                delay = self.base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
+                logger.info(f"{self.name} Retrying in {delay:.1f} seconds... (attempt {attempt})")
+                await asyncio.sleep(delay)
+        finally:
+            await self._release_session()
@@ -0,0 +1,259 @@
+"""
+Multiplexed Pricing Stream
+One upstream pricing stream per account, fanned out to per-subscriber queues.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Iterable
+from typing import Optional, Union
+
+import aiohttp
+from strats.monitor import StreamClient
+
+from strats_oanda.config import get_config
+from strats_oanda.model.pricing import ClientPrice, LazyClientPrice
+
+from .conflation import ConflatingQueue
+from .health import DEFAULT_STALL_TIMEOUT, StreamHealth
+from .pricing import PricingStreamClient
+from .session import create_stream_session
+
+logger = logging.getLogger(__name__)
+
+Price = Union[ClientPrice, LazyClientPrice]
+
+_CLOSED = object()
+
+
+class PricingSubscription(StreamClient):
+    """
+    A subscriber of PricingHub.
+    Prices of the subscribed instruments are delivered through a bounded queue.
+    When the queue is full, the oldest price is dropped.
+    With `conflate=True`, only the newest price per instrument is kept instead.
+    """
+
+    def __init__(
+        self,
+        hub: "PricingHub",
+        instruments: set[str],
+        maxsize: int,
+        conflate: bool = False,
+    ):
+        self.hub = hub
+        self.instruments = instruments
+        self.queue: Union[asyncio.Queue, ConflatingQueue] = (
+            ConflatingQueue() if conflate else asyncio.Queue(maxsize=maxsize)
+        )
+        self.dropped = 0
+        self.closed = False
+
+    @property
+    def dropped_by_instrument(self) -> dict[Optional[str], int]:
+        if isinstance(self.queue, ConflatingQueue):
+            return self.queue.dropped
+        return {}
+
+    def put(self, price: Price):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(price)
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.queue.put_nowait(price)
+            self.dropped += 1
+
+    def subscribe(self, instruments: Iterable[str]):
+        self.hub.subscribe(instruments, subscription=self)
+
+    def unsubscribe(self, instruments: Optional[Iterable[str]] = None):
+        self.hub.unsubscribe(self, instruments)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if isinstance(self.queue, ConflatingQueue):
+            self.queue.close()
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSED)
+
+    async def stream(self) -> AsyncGenerator[Price, None]:
+        while True:
+            price = await self.queue.get()
+            if price is None or price is _CLOSED:
+                break
+            yield price
+
+
+class PricingHub:
+    """
+    Keep one upstream PricingStreamClient per account and fan out each tick
+    (parsed once) to every subscriber of its instrument.
+    The upstream is reconnected with the union of live subscriptions
+    whenever the union changes.
+    """
+
+    _counter = 0
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,  # seconds
+        fast_decode: bool = False,
+        resubscribe_delay: float = 0.05,  # seconds
+        stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT,  # seconds
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        # Update class-specific counter
+        type(self)._counter += 1
+
+        self.name = name or f"{type(self).__name__}_{type(self)._counter}"
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.fast_decode = fast_decode
+        # Coalesce subscription changes made in a burst into one reconnection
+        self.resubscribe_delay = resubscribe_delay
+        self.stall_timeout = stall_timeout
+        # shared by the upstreams, so that it survives resubscriptions
+        self.health = StreamHealth()
+        # shared by the upstreams, so that resubscriptions reuse the connector
+        # and DNS cache. An injected session is not closed by the hub.
+        self.session = session
+        self._owns_session = session is None
+
+        self.subscriptions: list[PricingSubscription] = []
+        self._by_instrument: dict[str, list[PricingSubscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def instruments(self) -> list[str]:
+        return sorted(self._by_instrument)
+
+    def subscribe(
+        self,
+        instruments: Iterable[str],
+        maxsize: int = 1000,
+        subscription: Optional[PricingSubscription] = None,
+        conflate: bool = False,
+    ) -> PricingSubscription:
+        if subscription is None:
+            subscription = PricingSubscription(self, set(), maxsize, conflate=conflate)
+            self.subscriptions.append(subscription)
+        elif subscription not in self.subscriptions:
+            raise ValueError(f"subscription is not registered in {self.name}")
+
+        subscription.instruments.update(instruments)
+        self._update()
+        return subscription
+
+    def unsubscribe(
+        self,
+        subscription: PricingSubscription,
+        instruments: Optional[Iterable[str]] = None,
+    ):
+        if subscription not in self.subscriptions:
+            return
+
+        if instruments is None:
+            subscription.instruments.clear()
+        else:
+            subscription.instruments.difference_update(instruments)
+
+        if not subscription.instruments:
+            self.subscriptions.remove(subscription)
+            subscription.close()
+        self._update()
+
+    async def close(self):
+        for subscription in self.subscriptions:
+            subscription.close()
+        self.subscriptions.clear()
+        self._by_instrument.clear()
+        await self._stop()
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def create_upstream(self, instruments: list[str]) -> PricingStreamClient:
+        if self.session is None or self.session.closed:
+            self.session = create_stream_session()
+        return PricingStreamClient(
+            instruments,
+            name=f"{self.name}_upstream",
+            max_retries=self.max_retries,
+            base_delay=self.base_delay,
+            fast_decode=self.fast_decode,
+            stall_timeout=self.stall_timeout,
+            health=self.health,
+            session=self.session,
+        )
+
+    def _update(self):
+        by_instrument: dict[str, list[PricingSubscription]] = {}
+        for subscription in self.subscriptions:
+            for instrument in subscription.instruments:
+                by_instrument.setdefault(instrument, []).append(subscription)
+
+        union_changed = by_instrument.keys() != self._by_instrument.keys()
+        self._by_instrument = by_instrument
+
+        if union_changed:
+            self._restart()
+
+    def _restart(self):
+        previous = self._task
+        if previous is not None and not previous.done():
+            previous.cancel()
+        self._task = None
+
+        if self._by_instrument:
+            self._task = asyncio.create_task(self._run(self.instruments, previous))
+
+    async def _stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, instruments: list[str], previous: Optional[asyncio.Task] = None):
+        if previous is not None:
+            # Let the cancelled upstream close its connection before opening the next one.
+            # asyncio.wait doesn't raise its CancelledError, but still propagates ours.
+            await asyncio.wait({previous})
+        await asyncio.sleep(self.resubscribe_delay)
+        logger.info(f"{self.name} Streaming {instruments}")
+
+        upstream = self.create_upstream(instruments)
+        async for price in upstream.stream():
+            for subscription in self._by_instrument.get(price.instrument or "", ()):
+                subscription.put(price)
+
+        # upstream gave up, so subscribers will never receive prices any more
+        logger.error(f"{self.name} Upstream pricing stream is finished")
+        for subscription in self.subscriptions:
+            subscription.close()
+        self.subscriptions.clear()
+        self._by_instrument.clear()
+
+
+_hubs: dict[str, PricingHub] = {}
+
+
+def get_pricing_hub() -> PricingHub:
+    """
+    Return the shared PricingHub of the configured account.
+    """
+    account = get_config().account
+    if account not in _hubs:
+        _hubs[account] = PricingHub(name=f"PricingHub_{account}")
+    return _hubs[account]
@@ -0,0 +1,271 @@
+"""
+Columnar Tick Recorder and Replay
+
+A recording is a directory with one append-only file per column,
+stored in native byte order:
+
+    time_ns.i64         timestamp in nanoseconds since the epoch
+    instrument.u16      instrument id (line number in instruments.txt)
+    bid.f64             top-of-book bid price
+    ask.f64             top-of-book ask price
+    bid_liquidity.i64   top-of-book bid liquidity
+    ask_liquidity.i64   top-of-book ask liquidity
+    instruments.txt     instrument names, one per line
+
+The number of recorded ticks is the length of the shortest column, so a recording
+interrupted in the middle of a flush is still readable. TickRecorder truncates the
+columns to that length before appending to an existing recording, so that the rows
+stay aligned across columns.
+"""
+
+import asyncio
+import logging
+import mmap
+import os
+from array import array
+from collections.abc import AsyncGenerator, Iterable
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional, Union
+
+from strats.monitor import StreamClient
+
+from strats_oanda.model.pricing import ClientPrice, LazyClientPrice, PriceBucket
+
+logger = logging.getLogger(__name__)
+
+# (file name, array typecode)
+COLUMNS = (
+    ("time_ns.i64", "q"),
+    ("instrument.u16", "H"),
+    ("bid.f64", "d"),
+    ("ask.f64", "d"),
+    ("bid_liquidity.i64", "q"),
+    ("ask_liquidity.i64", "q"),
+)
+INSTRUMENTS_FILE = "instruments.txt"
+
+
+class TickRecorder:
+    """
+    Append top-of-book ticks to a columnar recording.
+    Ticks are buffered in memory and appended to the column files every `flush_size` ticks.
+    """
+
+    def __init__(self, path: Union[str, Path], flush_size: int = 10_000):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.flush_size = flush_size
+
+        _align_columns(self.path)
+        self.instruments = _read_instruments(self.path)
+        self._instrument_ids = {x: i for i, x in enumerate(self.instruments)}
+        self._buffers: list[array] = [array(typecode) for _, typecode in COLUMNS]
+
+    def __len__(self) -> int:
+        return len(self._buffers[0])
+
+    def record(self, price: Union[ClientPrice, LazyClientPrice]):
+        best_bid, best_ask = price.best_bid, price.best_ask
+        if best_bid is None or best_ask is None or price.instrument is None:
+            return
+
+        time_ns, instrument, bid, ask, bid_liquidity, ask_liquidity = self._buffers
+        time_ns.append(price.time_ns or 0)
+        instrument.append(self._instrument_id(price.instrument))
+        bid.append(float(best_bid.price))
+        ask.append(float(best_ask.price))
+        bid_liquidity.append(int(best_bid.liquidity))
+        ask_liquidity.append(int(best_ask.liquidity))
+
+        if len(time_ns) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if len(self) == 0:
+            return
+        for (file_name, _), buffer in zip(COLUMNS, self._buffers):
+            with open(self.path / file_name, "ab") as f:
+                buffer.tofile(f)
+            del buffer[:]
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _instrument_id(self, instrument: str) -> int:
+        instrument_id = self._instrument_ids.get(instrument)
+        if instrument_id is None:
+            instrument_id = len(self.instruments)
+            self.instruments.append(instrument)
+            self._instrument_ids[instrument] = instrument_id
+            with open(self.path / INSTRUMENTS_FILE, "a") as f:
+                f.write(f"{instrument}\n")
+        return instrument_id
+
+
+class RecordedTick:
+    """
+    Top-of-book tick read from a recording.
+    Prices are floats; `best_bid` / `best_ask` build Decimal PriceBuckets on access
+    so that code written for ClientPrice keeps working.
+    """
+
+    __slots__ = ("instrument", "time_ns", "bid", "ask", "bid_liquidity", "ask_liquidity")
+
+    def __init__(
+        self,
+        instrument: str,
+        time_ns: int,
+        bid: float,
+        ask: float,
+        bid_liquidity: int,
+        ask_liquidity: int,
+    ):
+        self.instrument = instrument
+        self.time_ns = time_ns
+        self.bid = bid
+        self.ask = ask
+        self.bid_liquidity = bid_liquidity
+        self.ask_liquidity = ask_liquidity
+
+    @property
+    def time(self) -> datetime:
+        return datetime.fromtimestamp(self.time_ns / 1_000_000_000, tz=timezone.utc)
+
+    @property
+    def best_bid(self) -> PriceBucket:
+        return PriceBucket(price=Decimal(repr(self.bid)), liquidity=self.bid_liquidity)
+
+    @property
+    def best_ask(self) -> PriceBucket:
+        return PriceBucket(price=Decimal(repr(self.ask)), liquidity=self.ask_liquidity)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(instrument={self.instrument!r}, time_ns={self.time_ns}, "
+            f"bid={self.bid}, ask={self.ask})"
+        )
+
+
+class TickRecording:
+    """
+    Read-only, memory-mapped view of a recording.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.instruments = _read_instruments(self.path)
+        self._files = []
+        self._mmaps = []
+        self.columns: list[memoryview] = []
+
+        for file_name, typecode in COLUMNS:
+            file_path = self.path / file_name
+            if not file_path.exists() or file_path.stat().st_size == 0:
+                self.columns.append(memoryview(array(typecode)))
+                continue
+            f = open(file_path, "rb")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._files.append(f)
+            self._mmaps.append(mm)
+            # ignore a trailing partial item written by an interrupted flush
+            size = len(mm) - len(mm) % array(typecode).itemsize
+            self.columns.append(memoryview(mm)[:size].cast(typecode))  # type: ignore[call-overload]
+
+    def __len__(self) -> int:
+        return min(len(c) for c in self.columns)
+
+    def __iter__(self):
+        time_ns, instrument, bid, ask, bid_liquidity, ask_liquidity = self.columns
+        names = self.instruments
+        for i in range(len(self)):
+            yield RecordedTick(
+                names[instrument[i]],
+                time_ns[i],
+                bid[i],
+                ask[i],
+                bid_liquidity[i],
+                ask_liquidity[i],
+            )
+
+    def close(self):
+        for column in self.columns:
+            column.release()
+        self.columns = []
+        for mm in self._mmaps:
+            mm.close()
+        for f in self._files:
+            f.close()
+        self._mmaps, self._files = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ReplayStreamClient(StreamClient):
+    """
+    Replay a recording as fast as possible, yielding RecordedTick.
+    """
+
+    _counter = 0
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        instruments: Optional[Iterable[str]] = None,
+        name: Optional[str] = None,
+        yield_interval: int = 1000,  # ticks
+    ):
+        # Update class-specific counter
+        type(self)._counter += 1
+
+        self.name = name or f"{type(self).__name__}_{type(self)._counter}"
+        self.path = Path(path)
+        self.instruments = set(instruments) if instruments is not None else None
+        # Give control back to the event loop every `yield_interval` ticks
+        self.yield_interval = yield_interval
+
+    async def stream(self) -> AsyncGenerator[RecordedTick, None]:
+        with TickRecording(self.path) as recording:
+            logger.info(f"{self.name} Replaying {len(recording)} ticks from {self.path}")
+            count = 0
+            for tick in recording:
+                if self.instruments is not None and tick.instrument not in self.instruments:
+                    continue
+                yield tick
+                count += 1
+                if count % self.yield_interval == 0:
+                    await asyncio.sleep(0)
+        logger.info(f"{self.name} Replay finished")
+
+
+def _align_columns(path: Path):
+    """
+    Truncate the column files to the number of rows of the shortest one,
+    dropping the rows (and partial items) of an interrupted flush.
+    """
+    files = [(path / file_name, array(typecode).itemsize) for file_name, typecode in COLUMNS]
+    sizes = [(f.stat().st_size if f.exists() else 0, itemsize) for f, itemsize in files]
+    rows = min(size // itemsize for size, itemsize in sizes)
+    for (file_path, itemsize), (size, _) in zip(files, sizes):
+        if size > rows * itemsize:
+            logger.warning(f"Truncate {file_path} to {rows} rows (interrupted flush)")
+            os.truncate(file_path, rows * itemsize)
+
+
+def _read_instruments(path: Path) -> list[str]:
+    file_path = path / INSTRUMENTS_FILE
+    if not file_path.exists():
+        return []
+    with open(file_path) as f:
+        return [line.strip() for line in f if line.strip()]
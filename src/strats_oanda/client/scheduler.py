@@ -0,0 +1,173 @@
+"""
+Client-side rate limiting of the OANDA REST API
+
+All REST calls of an account go through one token bucket, so that bursts are
+smoothed out on our side instead of being answered with 429 by OANDA.
+Waiting requests are served by priority: order placement and cancellation
+first, candle and transaction history last.
+cf. https://developer.oanda.com/rest-live-v20/best-practices/
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional
+
+from strats_oanda.config import get_config
+
+# OANDA allows 120 requests per second per account
+DEFAULT_RATE = 100.0
+DEFAULT_BURST = 20
+
+
+class Priority(IntEnum):
+    ORDER = 0
+    DEFAULT = 1
+    HISTORY = 2
+
+
+@dataclass
+class SchedulerStats:
+    count: int = 0
+    delayed: int = 0
+    total_delay: float = 0.0
+    max_delay: float = 0.0
+
+    @property
+    def mean_delay(self) -> float:
+        return self.total_delay / self.count if self.count else 0.0
+
+
+class RequestScheduler:
+    """
+    Token bucket of `rate` requests per second holding at most `burst` tokens.
+    `rate <= 0` disables the limit.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.stats: dict[Priority, SchedulerStats] = {p: SchedulerStats() for p in Priority}
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._blocking_lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def reset_stats(self):
+        self.stats = {p: SchedulerStats() for p in Priority}
+
+    async def acquire(self, priority: Priority = Priority.DEFAULT) -> float:
+        """
+        Wait for a token and return the queueing delay in seconds.
+        """
+        if self.rate <= 0:
+            self._record(priority, 0.0)
+            return 0.0
+
+        start = time.monotonic()
+        self._refill(start)
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(priority, 0.0)
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # waiters of a previous event loop can never be woken up
+            self._loop = loop
+            self._waiters.clear()
+            self._timer = None
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the token was handed over but the caller is gone: give it back
+            if future.done() and not future.cancelled():
+                self._tokens += 1
+            raise
+
+        delay = time.monotonic() - start
+        self._record(priority, delay)
+        return delay
+
+    def acquire_blocking(self, priority: Priority = Priority.DEFAULT) -> float:
+        """
+        Blocking `acquire` for synchronous callers; returns the delay in seconds.
+        It sleeps the calling thread until a token is available, without queueing
+        behind the waiters of `acquire`, so call it from a worker thread.
+        """
+        if self.rate <= 0:
+            self._record(priority, 0.0)
+            return 0.0
+
+        start = time.monotonic()
+        waited = False
+        with self._blocking_lock:
+            while True:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                time.sleep((1 - self._tokens) / self.rate)
+                waited = True
+
+        delay = time.monotonic() - start if waited else 0.0
+        self._record(priority, delay)
+        return delay
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _schedule(self):
+        if self._timer is not None:
+            return
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+
+    def _dispatch(self):
+        self._timer = None
+        self._refill(time.monotonic())
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # cancelled while waiting
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        if self._waiters:
+            self._schedule()
+
+    def _record(self, priority: Priority, delay: float):
+        stats = self.stats[priority]
+        stats.count += 1
+        if delay > 0:
+            stats.delayed += 1
+            stats.total_delay += delay
+            stats.max_delay = max(stats.max_delay, delay)
+
+
+_schedulers: dict[str, RequestScheduler] = {}
+
+
+def get_scheduler() -> RequestScheduler:
+    """
+    Return the shared RequestScheduler of the configured account.
+    """
+    account = get_config().account
+    if account not in _schedulers:
+        _schedulers[account] = RequestScheduler()
+    return _schedulers[account]
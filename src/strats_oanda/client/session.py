@@ -0,0 +1,51 @@
+"""
+Long-lived HTTP sessions of the streaming clients
+
+A stream client keeps one ClientSession across reconnects, so that a reconnect
+doesn't rebuild the connector, resolve the host again or reload the CA
+certificates. All sessions share one SSLContext.
+
+TLS session resumption needs the saved `SSLSession` of the previous connection to be
+set on the new one, which asyncio's transports don't allow, so a reconnect still does
+a full TLS handshake. Everything around it (context, resolver cache, connector) is
+kept alive.
+"""
+
+import ssl
+from typing import Optional
+
+import aiohttp
+
+# seconds to keep resolved addresses of the streaming host
+DNS_CACHE_TTL = 300
+
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def get_ssl_context() -> ssl.SSLContext:
+    """
+    Return the SSLContext shared by the streaming sessions.
+    """
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def create_stream_session(
+    ttl_dns_cache: Optional[int] = DNS_CACHE_TTL,
+    limit: int = 10,
+) -> aiohttp.ClientSession:
+    """
+    Session for long-lived streams: no total timeout (set one per request),
+    cached DNS and the shared SSLContext.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=limit,
+            use_dns_cache=True,
+            ttl_dns_cache=ttl_dns_cache,
+            ssl=get_ssl_context(),
+        ),
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=30),
+    )
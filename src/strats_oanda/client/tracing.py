@@ -0,0 +1,168 @@
+"""
+Tick-to-trade latency tracing
+
+Stages (seconds), per instrument:
+
+    feed           OANDA price time -> tick received
+    decide         tick received -> order sent (strategy time)
+    fill           order sent -> fill received
+    tick_to_trade  tick received -> fill received
+    end_to_end     OANDA price time -> fill received
+
+Receive times are the `received_ns` monotonic stamps set by PricingStreamClient and
+TransactionClient. Stages starting at the OANDA price time compare it with our wall
+clock, so they are only as accurate as the clock synchronization.
+
+    tracer = TickToTradeTracer()
+    start_http_server(8000, registry=tracer.registry)
+
+    async for price in pricing_client.stream():
+        if signal(price):
+            client_id = next_client_id()
+            tracer.order_sent(price, client_order_id=client_id)
+            await order_client.create_limit_order(..., client_extensions=...(id=client_id))
+
+    async for tx in transaction_client.stream():
+        tracer.on_transaction(tx)
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from prometheus_client import CollectorRegistry, Histogram
+
+from strats_oanda.model import ClientPrice, LazyClientPrice, OrderFillTransaction, Transaction
+
+from .latency import LATENCY_BUCKETS
+
+TRACE_STAGES = ("feed", "decide", "fill", "tick_to_trade", "end_to_end")
+
+
+@dataclass
+class TickTrace:
+    instrument: str
+    # OANDA price time (unix ns)
+    tick_time_ns: Optional[int]
+    # time.monotonic_ns()
+    tick_received_ns: int
+    order_sent_ns: int
+    client_order_id: Optional[str] = None
+    order_id: Optional[str] = None
+    fill_received_ns: Optional[int] = None
+
+
+class TickToTradeTracer:
+    """
+    Link orders to the tick which triggered them and to their fill, and observe
+    the latency of each stage in a histogram labelled by instrument and stage.
+    Orders are matched to fills by client order id (client extensions) or order id.
+    At most `max_pending` unfilled orders are tracked; the oldest are dropped.
+    The histogram is registered on `registry`, or on a registry of its own by default.
+    """
+
+    def __init__(
+        self,
+        name: str = "oanda_tick_to_trade",
+        registry: Optional[CollectorRegistry] = None,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        max_pending: int = 10000,
+    ):
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self.latency = Histogram(
+            f"{name}_latency_seconds",
+            "Tick-to-trade latency by stage",
+            ["instrument", "stage"],
+            buckets=buckets,
+            registry=self.registry,
+        )
+        self.max_pending = max_pending
+        self._by_client_id: OrderedDict[str, TickTrace] = OrderedDict()
+        self._by_order_id: OrderedDict[str, TickTrace] = OrderedDict()
+        # wall clock = monotonic + offset
+        self._offset_ns = time.time_ns() - time.monotonic_ns()
+
+    @property
+    def pending(self) -> int:
+        return len({id(t) for t in (*self._by_client_id.values(), *self._by_order_id.values())})
+
+    def on_tick(self, price: Union[ClientPrice, LazyClientPrice]):
+        """
+        Observe the feed latency of a tick.
+        """
+        if price.instrument is None or price.received_ns is None:
+            return
+        if (tick_time_ns := price.time_ns) is not None:
+            feed = price.received_ns + self._offset_ns - tick_time_ns
+            self._observe(price.instrument, "feed", feed)
+
+    def order_sent(
+        self,
+        price: Union[ClientPrice, LazyClientPrice],
+        client_order_id: Optional[str] = None,
+        order_id: Optional[str] = None,
+    ) -> TickTrace:
+        """
+        Record that an order triggered by `price` is being sent now.
+        """
+        now = time.monotonic_ns()
+        trace = TickTrace(
+            instrument=price.instrument or "",
+            tick_time_ns=price.time_ns,
+            tick_received_ns=price.received_ns if price.received_ns is not None else now,
+            order_sent_ns=now,
+            client_order_id=client_order_id,
+        )
+        self._observe(trace.instrument, "decide", now - trace.tick_received_ns)
+        if client_order_id is not None:
+            self._add(self._by_client_id, client_order_id, trace)
+        if order_id is not None:
+            self.order_created(trace, order_id)
+        return trace
+
+    def order_created(self, trace: TickTrace, order_id: str):
+        """
+        Link the order id returned by OANDA to the trace, for orders sent without
+        a client order id.
+        """
+        trace.order_id = order_id
+        self._add(self._by_order_id, order_id, trace)
+
+    def on_transaction(self, tx: Transaction) -> Optional[TickTrace]:
+        """
+        Complete the trace of the order filled by `tx`, if any.
+        """
+        if not isinstance(tx, OrderFillTransaction):
+            return None
+
+        trace = None
+        if tx.client_order_id is not None:
+            trace = self._by_client_id.pop(tx.client_order_id, None)
+        by_order_id = self._by_order_id.pop(tx.order_id, None)
+        trace = trace or by_order_id
+        if trace is None:
+            return None
+        if trace.client_order_id is not None:
+            self._by_client_id.pop(trace.client_order_id, None)
+        if trace.order_id is not None:
+            self._by_order_id.pop(trace.order_id, None)
+
+        received_ns = tx.received_ns if tx.received_ns is not None else time.monotonic_ns()
+        trace.fill_received_ns = received_ns
+        instrument = trace.instrument or tx.instrument
+        self._observe(instrument, "fill", received_ns - trace.order_sent_ns)
+        self._observe(instrument, "tick_to_trade", received_ns - trace.tick_received_ns)
+        if trace.tick_time_ns is not None:
+            self._observe(
+                instrument, "end_to_end", received_ns + self._offset_ns - trace.tick_time_ns
+            )
+        return trace
+
+    def _add(self, traces: OrderedDict[str, TickTrace], key: str, trace: TickTrace):
+        traces[key] = trace
+        while len(traces) > self.max_pending:
+            traces.popitem(last=False)
+
+    def _observe(self, instrument: str, stage: str, ns: int):
+        self.latency.labels(instrument, stage).observe(ns / 1e9)
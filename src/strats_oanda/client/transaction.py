@@ -1,12 +1,19 @@
 """
 Transaction Stream Endpoints
 cf. https://developer.oanda.com/rest-live-v20/transaction-ep/
+
+The client remembers the ID of the last transaction it has received (or, before the
+first one, of the last heartbeat). After a reconnect, the transactions created while
+disconnected are fetched from `/transactions/sinceid` (and `/transactions/idrange`
+when there is more than one page) and yielded before the live stream, so that no
+transaction is lost or yielded twice.
 """
 
 import asyncio
-import json
 import logging
 import random
+import time
+from collections import Counter
 from collections.abc import AsyncGenerator
 from typing import Optional
 
@@ -15,15 +22,23 @@ from aiohttp import ClientConnectionError, ClientPayloadError, ServerDisconnecte
 from strats.monitor import StreamClient
 
 from strats_oanda.config import get_config
+from strats_oanda.helper import loads
 from strats_oanda.model.transaction import (
+    TRANSACTION_PARSERS,
     Transaction,
-    parse_limit_order_transaction,
-    parse_order_cancel_transaction,
-    parse_order_fill_transaction,
+    TransactionHeartbeat,
+    parse_transaction_heartbeat,
 )
 
+from .health import DEFAULT_STALL_TIMEOUT, StreamHealth, stall_watchdog
+from .scheduler import Priority, RequestScheduler, get_scheduler
+from .session import create_stream_session
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of transactions OANDA returns in one sinceid / idrange response
+MAX_TRANSACTIONS_PER_REQUEST = 1000
+
 
 class TransactionClient(StreamClient):
     _counter = 0
@@ -33,6 +48,12 @@ class TransactionClient(StreamClient):
         name: Optional[str] = None,
         max_retries: int = 5,
         base_delay: float = 1.0,  # seconds
+        since_id: Optional[str] = None,
+        max_concurrency: int = 4,
+        scheduler: Optional[RequestScheduler] = None,
+        stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT,  # seconds
+        health: Optional[StreamHealth] = None,
+        session: Optional[aiohttp.ClientSession] = None,
     ):
         # Update class-specific counter
         type(self)._counter += 1
@@ -41,90 +62,235 @@ class TransactionClient(StreamClient):
         self.max_retries = max_retries
         self.base_delay = base_delay
         self.config = get_config()
+        # Messages of transaction types without a parser, by type
+        self.unknown_counts: Counter[str] = Counter()
+        # ID of the last transaction received.
+        # If set, transactions after it are backfilled when the stream (re)connects.
+        self.last_transaction_id = since_id
+        # lastTransactionID of the last heartbeat, where to resume if no transaction
+        # was received yet. Not used for de-duplication: a heartbeat may announce
+        # a transaction that is still on its way.
+        self.last_heartbeat: Optional[TransactionHeartbeat] = None
+        # concurrent idrange requests of a backfill
+        self.max_concurrency = max_concurrency
+        self.scheduler = scheduler or get_scheduler()
+        # Reconnect when neither a transaction nor a heartbeat arrives for this long
+        # (None disables the watchdog)
+        self.stall_timeout = stall_timeout
+        self.health = health or StreamHealth()
+        # Kept across reconnects. An injected session is shared with others
+        # and not closed by this client.
+        self.session = session
+        self._owns_session = session is None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            if not self._owns_session:
+                raise RuntimeError(f"{self.name} The injected ClientSession is closed")
+            self.session = create_stream_session()
+        return self.session
+
+    async def _release_session(self):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def close(self):
+        await self._release_session()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
     async def stream(self) -> AsyncGenerator[Transaction, None]:
         attempt = 0
+        try:
+            while True:
+                try:
+                    logger.info(f"{self.name} connecting...")
 
-        while True:
-            try:
-                logger.info(f"{self.name} connecting...")
-
-                url = f"{self.config.account_streaming_url}/transactions/stream"
-                headers = {
-                    "Authorization": f"Bearer {self.config.token}",
-                }
-                timeout = aiohttp.ClientTimeout(total=60 * 60 * 24)
+                    url = f"{self.config.account_streaming_url}/transactions/stream"
+                    headers = {
+                        "Authorization": f"Bearer {self.config.token}",
+                    }
+                    timeout = aiohttp.ClientTimeout(total=60 * 60 * 24)
 
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.get(url, headers=headers) as resp:
+                    session = self._get_session()
+                    async with session.get(url, headers=headers, timeout=timeout) as resp:
                         if resp.status != 200:
                             raise RuntimeError(f"Failed to connect: status={resp.status}")
 
                         logger.info(f"{self.name} Connected to OANDA transaction stream")
                         attempt = 0  # reset on success
 
-                        async for line_bytes in resp.content:
-                            line = line_bytes.decode("utf-8").strip()
+                        since = self.last_transaction_id or (
+                            self.last_heartbeat.last_transaction_id if self.last_heartbeat else None
+                        )
+                        if since is not None:
+                            # the stream is already connected, so nothing falls in between
+                            async for backfilled in self._backfill(session, headers, since):
+                                yield backfilled
 
-                            if not line or "HEARTBEAT" in line:
-                                continue
+                        async with stall_watchdog(self.name, self.health, resp, self.stall_timeout):
+                            async for line_bytes in resp.content:
+                                received_ns = time.monotonic_ns()
+                                line = line_bytes.decode("utf-8").strip()
 
-                            try:
-                                data = json.loads(line)
-                                tx_type = data.get("type")
-
-                                tx: Optional[Transaction] = None
-                                if tx_type == "LIMIT_ORDER":
-                                    tx = parse_limit_order_transaction(data)
-                                elif tx_type == "ORDER_CANCEL":
-                                    tx = parse_order_cancel_transaction(data)
-                                elif tx_type == "ORDER_FILL":
-                                    tx = parse_order_fill_transaction(data)
-                                elif tx_type == "HEARTBEAT":
+                                if not line:
                                     continue
-                                else:
-                                    logger.warning(
-                                        f"{self.name} Unknown transaction type received: {data}"
+
+                                try:
+                                    data = loads(line)
+                                    if data.get("type") == "HEARTBEAT":
+                                        self.last_heartbeat = parse_transaction_heartbeat(data)
+                                        self.health.on_heartbeat(received_ns)
+                                        continue
+                                    self.health.on_message(received_ns)
+                                    if not self._see(data.get("id")):
+                                        continue  # already yielded by the backfill
+                                    tx = self._parse(data, received_ns)
+                                except Exception as e:
+                                    logger.error(
+                                        f"{self.name} Failed to parse transaction message: "
+                                        f"{e}, {line=}"
                                     )
                                     continue
-
                                 if tx is not None:
+                                    self.health.on_deliver()
                                     yield tx
-                            except Exception as e:
-                                logger.error(
-                                    f"{self.name} Failed to parse transaction message: {e}, {line=}"
-                                )
-                                continue
-
-            except asyncio.CancelledError:
-                logger.info(f"{self.name} cancelled")
-                raise
-
-            except (
-                ClientConnectionError,
-                ClientPayloadError,
-                ServerDisconnectedError,
-                asyncio.TimeoutError,
-            ) as e:
-                logger.warning(
-                    f"{self.name} Stream disconnected (retryable):{type(e).__name__}: {e}"
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"{self.name} Unhandled exception in TransactionClient:{type(e).__name__}: {e}"
-                )
-
-            finally:
-                logger.info(f"{self.name} Disconnected from transaction stream")
-
-            attempt += 1
-            if attempt > self.max_retries:
-                logger.error(
-                    f"{self.name} Max retry attempts exceeded({self.max_retries}), giving up."
-                )
-                break
-
-            delay = self.base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
-            logger.info(f"{self.name} Retrying in {delay:.1f} seconds... (attempt {attempt})")
-            await asyncio.sleep(delay)
+                                    self.health.on_resume()
+
+                except asyncio.CancelledError:
+                    logger.info(f"{self.name} cancelled")
+                    raise
+
+                except (
+                    ClientConnectionError,
+                    ClientPayloadError,
+                    ServerDisconnectedError,
+                    asyncio.TimeoutError,
+                ) as e:
+                    logger.warning(
+                        f"{self.name} Stream disconnected (retryable):{type(e).__name__}: {e}"
+                    )
+
+                except Exception as e:
+                    logger.error(
+                        f"{self.name} Unhandled exception in TransactionClient:"
+                        f"{type(e).__name__}: {e}"
+                    )
+
+                finally:
+                    logger.info(f"{self.name} Disconnected from transaction stream")
+
+                attempt += 1
+                if attempt > self.max_retries:
+                    logger.error(
+                        f"{self.name} Max retry attempts exceeded({self.max_retries}), giving up."
+                    )
+                    break
+
+                delay = self.base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
+                logger.info(f"{self.name} Retrying in {delay:.1f} seconds... (attempt {attempt})")
+                await asyncio.sleep(delay)
+        finally:
+            await self._release_session()
+
+    def _see(self, transaction_id: Optional[str]) -> bool:
+        """
+        Advance `last_transaction_id`. False if the ID was already seen.
+        """
+        if transaction_id is None:
+            return True
+        if self.last_transaction_id is not None and int(transaction_id) <= int(
+            self.last_transaction_id
+        ):
+            return False
+        self.last_transaction_id = transaction_id
+        return True
+
+    def _parse(self, data: dict, received_ns: int) -> Optional[Transaction]:
+        tx_type = data.get("type", "")
+        parser = TRANSACTION_PARSERS.get(tx_type)
+        if parser is None:
+            self.unknown_counts[tx_type] += 1
+            return None
+        tx = parser(data)
+        tx.received_ns = received_ns
+        return tx
+
+    async def _backfill(
+        self,
+        session: aiohttp.ClientSession,
+        headers: dict[str, str],
+        since: str,
+    ) -> AsyncGenerator[Transaction, None]:
+        """
+        Yield the transactions after `since`.
+        The first page comes from sinceid, which also tells the latest ID.
+        The remaining pages are fetched concurrently from idrange.
+        """
+        # the live stream repeats what the backfill yields
+        self._see(since)
+        url = f"{self.config.account_rest_url}/transactions"
+        first = await self._get(session, f"{url}/sinceid", headers, {"id": str(since)})
+        pages = [first["transactions"]]
+
+        last_id = int(first["lastTransactionID"])
+        if first["transactions"]:
+            start = int(first["transactions"][-1]["id"]) + 1
+        else:
+            start = last_id + 1
+        ranges = [
+            (a, min(a + MAX_TRANSACTIONS_PER_REQUEST - 1, last_id))
+            for a in range(start, last_id + 1, MAX_TRANSACTIONS_PER_REQUEST)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(a: int, b: int) -> list[dict]:
+            transactions: list[dict] = []
+            async with semaphore:
+                # continue if the server returned less than asked
+                while a <= b:
+                    params = {"from": str(a), "to": str(b)}
+                    page = (await self._get(session, f"{url}/idrange", headers, params))[
+                        "transactions"
+                    ]
+                    if not page:
+                        break
+                    transactions += page
+                    a = int(page[-1]["id"]) + 1
+            return transactions
+
+        pages += await asyncio.gather(*(fetch(a, b) for a, b in ranges))
+
+        count = 0
+        received_ns = time.monotonic_ns()
+        for page in pages:
+            for data in page:
+                if not self._see(data.get("id")):
+                    continue
+                tx = self._parse(data, received_ns)
+                if tx is not None:
+                    count += 1
+                    yield tx
+        logger.info(f"{self.name} Backfilled {count} transactions since {since}")
+
+    async def _get(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, str],
+    ) -> dict:
+        # catching up on fills is more urgent than history, but yields to orders
+        await self.scheduler.acquire(Priority.DEFAULT)
+        async with session.get(
+            url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=30)
+        ) as res:
+            if res.status != 200:
+                text = await res.text()
+                raise RuntimeError(f"error get transactions: http_status={res.status} {text=}")
+            return loads(await res.read())
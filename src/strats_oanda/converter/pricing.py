@@ -1,12 +1,18 @@
+from typing import Union
+
 from strats.model import PricesData
 
-from ..model import ClientPrice
+from ..model import ClientPrice, LazyClientPrice
 
 
-def client_price_to_prices_data(p: ClientPrice, _current_data: PricesData) -> PricesData:
-    if len(p.bids) == 0 or len(p.asks) == 0:
+def client_price_to_prices_data(
+    p: Union[ClientPrice, LazyClientPrice],
+    _current_data: PricesData,
+) -> PricesData:
+    best_bid, best_ask = p.best_bid, p.best_ask
+    if best_bid is None or best_ask is None:
         raise ValueError("bids and asks must be not empty")
     return PricesData(
-        bid=p.bids[0].price,
-        ask=p.asks[0].price,
+        bid=best_bid.price,
+        ask=best_ask.price,
     )
@@ -1,5 +1,8 @@
+from .datetime import datetime_to_ns as datetime_to_ns
 from .datetime import format_datetime as format_datetime
 from .datetime import parse_time as parse_time
+from .datetime import parse_time_ns as parse_time_ns
 from .json import JSONEncoder as JSONEncoder
+from .json import loads as loads
 from .json import remove_none as remove_none
 from .json import to_camel_case as to_camel_case
@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
+
+_EPOCH = datetime(1970, 1, 1)
 
 
 def format_datetime(t: datetime) -> str:
@@ -19,3 +21,24 @@ def parse_time(s: str) -> datetime:
         s = f"{datetime_part}.{microsec_part}Z"
     s = s.replace("Z", "+00:00")
     return datetime.fromisoformat(s)
+
+
+def parse_time_ns(s: str) -> int:
+    """
+    '2025-03-24T15:34:25.366624289Z'
+    -> 1742830465366624289 (nanoseconds since the epoch)
+    """
+    datetime_part, _, frac_part = s.rstrip("Z").partition(".")
+    delta = datetime.fromisoformat(datetime_part) - _EPOCH
+    frac_ns = int(frac_part[:9].ljust(9, "0")) if frac_part else 0
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + frac_ns
+
+
+def datetime_to_ns(t: datetime) -> int:
+    """
+    datetime(2025, 3, 24, 15, 34, 25, 366624, tzinfo=timezone.utc)
+    -> 1742830465366624000
+    """
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return int(t.replace(microsecond=0).timestamp()) * 1_000_000_000 + t.microsecond * 1_000
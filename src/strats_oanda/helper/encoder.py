@@ -0,0 +1,126 @@
+"""
+Compiled JSON encoder for request dataclasses.
+
+`to_camel_case(remove_none(asdict(x)))` + `json.dumps` walks and copies the whole
+object and camelizes every key on every call. A compiled encoder precomputes the
+camelCase key and field order of each dataclass once, skips None fields inline
+and writes bytes directly. The output is the same JSON document.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+import inflection
+
+from .datetime import format_datetime
+
+Encoder = Callable[[Any], bytes]
+
+_encoders: dict[tuple[type, tuple[str, ...]], Encoder] = {}
+_enum_cache: dict[Enum, bytes] = {}
+
+
+def encode_str(v: str) -> bytes:
+    return json.dumps(v).encode()
+
+
+def encode_decimal(v: Decimal) -> bytes:
+    return b'"' + str(v).encode() + b'"'
+
+
+def _encode_enum(v: Enum) -> bytes:
+    b = _enum_cache.get(v)
+    if b is None:
+        b = _enum_cache[v] = encode_value(v.value)
+    return b
+
+
+def _encode_datetime(v: datetime) -> bytes:
+    return b'"' + format_datetime(v).encode() + b'"'
+
+
+def _encode_list(v: list) -> bytes:
+    return b"[" + b",".join(encode_value(x) for x in v if x is not None) + b"]"
+
+
+def _encode_dict(v: dict) -> bytes:
+    return (
+        b"{"
+        + b",".join(
+            encode_str(inflection.camelize(k, False)) + b":" + encode_value(x)
+            for k, x in v.items()
+            if x is not None
+        )
+        + b"}"
+    )
+
+
+def _encode_json(v: Any) -> bytes:
+    return json.dumps(v).encode()
+
+
+_VALUE_ENCODERS: dict[type, Encoder] = {
+    str: encode_str,
+    Decimal: encode_decimal,
+    datetime: _encode_datetime,
+    list: _encode_list,
+    dict: _encode_dict,
+    bool: _encode_json,
+    int: _encode_json,
+    float: _encode_json,
+}
+
+
+def encode_value(v: Any) -> bytes:
+    """
+    Encode a JSON value the way `JSONEncoder` + `to_camel_case` would, as bytes.
+    """
+    t = type(v)
+    encoder = _VALUE_ENCODERS.get(t)
+    if encoder is not None:
+        return encoder(v)
+    if isinstance(v, Enum):
+        return _encode_enum(v)
+    if is_dataclass(v):
+        return compile_encoder(t)(v)
+    raise TypeError(f"Object of type {t.__name__} is not JSON serializable")
+
+
+def compile_encoder(cls: type, exclude: tuple[str, ...] = ()) -> Encoder:
+    """
+    Return a cached encoder of the dataclass `cls` which writes a camelCase JSON object.
+    Fields named in `exclude` are never written.
+    """
+    encoder = _encoders.get((cls, exclude))
+    if encoder is not None:
+        return encoder
+
+    keys = [
+        (f.name, b'"' + inflection.camelize(f.name, False).encode() + b'":')
+        for f in fields(cls)
+        if f.name not in exclude
+    ]
+
+    def encode(obj: Any) -> bytes:
+        parts = []
+        for name, key in keys:
+            v = getattr(obj, name)
+            if v is not None:
+                parts.append(key + encode_value(v))
+        return b"{" + b",".join(parts) + b"}"
+
+    _encoders[(cls, exclude)] = encode
+    return encode
+
+
+def encode_request(name: str, obj: Any) -> bytes:
+    """
+    encode_request("order", MarketOrderRequest(...))
+    -> b'{"order":{"instrument":"USD_JPY",...}}'
+    """
+    return b'{"' + name.encode() + b'":' + compile_encoder(type(obj))(obj) + b"}"
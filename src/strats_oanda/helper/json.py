@@ -1,9 +1,21 @@
 import json
+from collections.abc import Callable
 from decimal import Decimal
 from enum import Enum
+from typing import Any, Union
 
 import inflection
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover
+    msgspec = None
+
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
@@ -33,3 +45,17 @@ def to_camel_case(d):
         return [to_camel_case(i) for i in d]
     else:
         return d
+
+
+# Decode JSON directly from raw bytes with the fastest installed backend.
+# orjson > msgspec > json (stdlib)
+loads: Callable[[Union[bytes, str]], Any]
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+    loads = orjson.loads
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+    loads = msgspec.json.decode
+else:
+    JSON_BACKEND = "json"
+    loads = json.loads
@@ -3,8 +3,13 @@ from .common import OrderPositionFill as OrderPositionFill
 from .common import OrderTriggerCondition as OrderTriggerCondition
 from .common import TimeInForce as TimeInForce
 from .instrument import Candlestick as Candlestick
+from .instrument import CandlestickArrays as CandlestickArrays
 from .instrument import CandlestickData as CandlestickData
+from .instrument import CandlestickDataArrays as CandlestickDataArrays
 from .instrument import CandlestickGranularity as CandlestickGranularity
+from .instrument import WeeklyAlignment as WeeklyAlignment
+from .instrument import parse_candlestick_arrays as parse_candlestick_arrays
+from .instrument import validate_pricing_component as validate_pricing_component
 from .order import CancelOrderResponse as CancelOrderResponse
 from .order import CreateLimitOrderResponse as CreateLimitOrderResponse
 from .order import CreateMarketOrderResponse as CreateMarketOrderResponse
@@ -16,22 +21,53 @@ from .order import parse_cancel_order_response as parse_cancel_order_response
 from .order import parse_create_limit_order_response as parse_create_limit_order_response
 from .order import parse_create_market_order_response as parse_create_market_order_response
 from .pricing import ClientPrice as ClientPrice
+from .pricing import LazyClientPrice as LazyClientPrice
 from .pricing import PriceBucket as PriceBucket
 from .pricing import PricingHeartbeat as PricingHeartbeat
+from .pricing import decode_client_price as decode_client_price
 from .pricing import parse_client_price as parse_client_price
+from .pricing import parse_client_price_lazy as parse_client_price_lazy
 from .pricing import parse_price_bucket as parse_price_bucket
+from .pricing import parse_pricing_heartbeat as parse_pricing_heartbeat
+from .transaction import AccountTransaction as AccountTransaction
 from .transaction import ClientExtensions as ClientExtensions
+from .transaction import DailyFinancingTransaction as DailyFinancingTransaction
+from .transaction import DelayedTradeClosureTransaction as DelayedTradeClosureTransaction
+from .transaction import DividendAdjustmentTransaction as DividendAdjustmentTransaction
+from .transaction import FixedPriceOrderTransaction as FixedPriceOrderTransaction
+from .transaction import GuaranteedStopLossOrderTransaction as GuaranteedStopLossOrderTransaction
 from .transaction import LimitOrderReason as LimitOrderReason
 from .transaction import LimitOrderTransaction as LimitOrderTransaction
+from .transaction import MarginCallEnterTransaction as MarginCallEnterTransaction
+from .transaction import MarginCallExitTransaction as MarginCallExitTransaction
+from .transaction import MarginCallExtendTransaction as MarginCallExtendTransaction
+from .transaction import MarketIfTouchedOrderTransaction as MarketIfTouchedOrderTransaction
 from .transaction import MarketOrderReason as MarketOrderReason
 from .transaction import MarketOrderTransaction as MarketOrderTransaction
 from .transaction import OrderCancelReason as OrderCancelReason
 from .transaction import OrderCancelTransaction as OrderCancelTransaction
+from .transaction import (
+    OrderClientExtensionsModifyTransaction as OrderClientExtensionsModifyTransaction,
+)
 from .transaction import OrderFillReason as OrderFillReason
 from .transaction import OrderFillTransaction as OrderFillTransaction
+from .transaction import PositionFinancing as PositionFinancing
+from .transaction import RejectTransaction as RejectTransaction
 from .transaction import StopLossDetails as StopLossDetails
+from .transaction import StopLossOrderTransaction as StopLossOrderTransaction
+from .transaction import StopOrderTransaction as StopOrderTransaction
 from .transaction import TakeProfitDetails as TakeProfitDetails
+from .transaction import TakeProfitOrderTransaction as TakeProfitOrderTransaction
+from .transaction import (
+    TradeClientExtensionsModifyTransaction as TradeClientExtensionsModifyTransaction,
+)
 from .transaction import TradeOpen as TradeOpen
 from .transaction import TradeReduce as TradeReduce
+from .transaction import TrailingStopLossOrderTransaction as TrailingStopLossOrderTransaction
 from .transaction import Transaction as Transaction
+from .transaction import TransactionHeartbeat as TransactionHeartbeat
+from .transaction import TransferFundsTransaction as TransferFundsTransaction
 from .transaction import parse_order_fill_transaction as parse_order_fill_transaction
+from .transaction import parse_transaction as parse_transaction
+from .transaction import parse_transaction_heartbeat as parse_transaction_heartbeat
+from .transaction import register_transaction_parser as register_transaction_parser
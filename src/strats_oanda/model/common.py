@@ -14,8 +14,11 @@ class TimeInForce(Enum):
 
 # cf. https://developer.oanda.com/rest-live-v20/order-df/#OrderTriggerCondition
 class OrderTriggerCondition(Enum):
-    DEFAULT = "DEFAULT"
-    # ...
+    DEFAULT = "DEFAULT"  # the natural side for the order (bid for long, ask for short)
+    INVERSE = "INVERSE"  # the opposite side of the natural one
+    BID = "BID"
+    ASK = "ASK"
+    MID = "MID"
 
 
 # cf. https://developer.oanda.com/rest-live-v20/order-df/#OrderPositionFill
@@ -37,8 +40,8 @@ class HomeConversionFactors:
 
 def parse_home_conversion_factors(data: dict) -> HomeConversionFactors:
     return HomeConversionFactors(
-        gain_quote_home=data["gainQuoteHome"],
-        loss_quote_home=data["lossQuoteHome"],
-        gain_base_home=data["gainBaseHome"],
-        loss_base_home=data["lossBaseHome"],
+        gain_quote_home=Decimal(data["gainQuoteHome"]["factor"]),
+        loss_quote_home=Decimal(data["lossQuoteHome"]["factor"]),
+        gain_base_home=Decimal(data["gainBaseHome"]["factor"]),
+        loss_base_home=Decimal(data["lossBaseHome"]["factor"]),
     )
@@ -1,16 +1,91 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from ..helper import parse_time
+from ..helper import parse_time, parse_time_ns
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 # https://developer.oanda.com/rest-live-v20/instrument-df/#CandlestickGranularity
 class CandlestickGranularity(Enum):
+    S5 = "S5"  # 5 second candlesticks, minute alignment
+    S10 = "S10"  # 10 second candlesticks, minute alignment
+    S15 = "S15"  # 15 second candlesticks, minute alignment
+    S30 = "S30"  # 30 second candlesticks, minute alignment
     M1 = "M1"  # 1 minute candlesticks, minute alignment
-    # ...
+    M2 = "M2"  # 2 minute candlesticks, hour alignment
+    M4 = "M4"  # 4 minute candlesticks, hour alignment
+    M5 = "M5"  # 5 minute candlesticks, hour alignment
+    M10 = "M10"  # 10 minute candlesticks, hour alignment
+    M15 = "M15"  # 15 minute candlesticks, hour alignment
+    M30 = "M30"  # 30 minute candlesticks, hour alignment
+    H1 = "H1"  # 1 hour candlesticks, hour alignment
+    H2 = "H2"  # 2 hour candlesticks, day alignment
+    H3 = "H3"  # 3 hour candlesticks, day alignment
+    H4 = "H4"  # 4 hour candlesticks, day alignment
+    H6 = "H6"  # 6 hour candlesticks, day alignment
+    H8 = "H8"  # 8 hour candlesticks, day alignment
+    H12 = "H12"  # 12 hour candlesticks, day alignment
+    D = "D"  # 1 day candlesticks, day alignment
+    W = "W"  # 1 week candlesticks, aligned to start of week
+    M = "M"  # 1 month candlesticks, aligned to first day of the month
+
+    @property
+    def timedelta(self) -> timedelta:
+        return timedelta(seconds=GRANULARITY_SECONDS[self.value])
+
+
+GRANULARITY_SECONDS = {
+    "S5": 5,
+    "S10": 10,
+    "S15": 15,
+    "S30": 30,
+    "M1": 60,
+    "M2": 2 * 60,
+    "M4": 4 * 60,
+    "M5": 5 * 60,
+    "M10": 10 * 60,
+    "M15": 15 * 60,
+    "M30": 30 * 60,
+    "H1": 60 * 60,
+    "H2": 2 * 60 * 60,
+    "H3": 3 * 60 * 60,
+    "H4": 4 * 60 * 60,
+    "H6": 6 * 60 * 60,
+    "H8": 8 * 60 * 60,
+    "H12": 12 * 60 * 60,
+    "D": 24 * 60 * 60,
+    "W": 7 * 24 * 60 * 60,
+    # the shortest month, so that a time window never holds more candles than expected
+    "M": 28 * 24 * 60 * 60,
+}
+
+
+# https://developer.oanda.com/rest-live-v20/instrument-df/#WeeklyAlignment
+class WeeklyAlignment(Enum):
+    MONDAY = "Monday"
+    TUESDAY = "Tuesday"
+    WEDNESDAY = "Wednesday"
+    THURSDAY = "Thursday"
+    FRIDAY = "Friday"
+    SATURDAY = "Saturday"
+    SUNDAY = "Sunday"
+
+
+# https://developer.oanda.com/rest-live-v20/primitives-df/#PricingComponent
+# Can contain any combination of the characters “M” (midpoint candles)
+# “B” (bid candles) and “A” (ask candles).
+PRICING_COMPONENTS = "BAM"
+
+
+def validate_pricing_component(price: str) -> str:
+    if not price or len(set(price)) != len(price) or not set(price) <= set(PRICING_COMPONENTS):
+        raise ValueError(f"invalid PricingComponent: {price!r}, must be a combination of B, A, M")
+    return price
 
 
 # https://developer.oanda.com/rest-live-v20/instrument-df/#CandlestickData
@@ -51,3 +126,71 @@ def parse_candlestick(data: dict) -> Candlestick:
         ask=parse_candlestick_data(data["ask"]) if "ask" in data else None,
         mid=parse_candlestick_data(data["mid"]) if "mid" in data else None,
     )
+
+
+# Columnar candles
+# One contiguous (4, n) float64 block per price component; o/h/l/c are row views.
+@dataclass
+class CandlestickDataArrays:
+    ohlc: "np.ndarray"
+
+    @property
+    def o(self) -> "np.ndarray":
+        return self.ohlc[0]
+
+    @property
+    def h(self) -> "np.ndarray":
+        return self.ohlc[1]
+
+    @property
+    def l(self) -> "np.ndarray":  # noqa: E743
+        return self.ohlc[2]
+
+    @property
+    def c(self) -> "np.ndarray":
+        return self.ohlc[3]
+
+
+@dataclass
+class CandlestickArrays:
+    time: "np.ndarray"  # int64, nanoseconds since the epoch
+    volume: "np.ndarray"  # int64
+    complete: "np.ndarray"  # bool
+    bid: Optional[CandlestickDataArrays] = None
+    ask: Optional[CandlestickDataArrays] = None
+    mid: Optional[CandlestickDataArrays] = None
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+def parse_candlestick_arrays(candles: list[dict]) -> CandlestickArrays:
+    """
+    Parse the `candles` of a get candles response straight into NumPy arrays,
+    without building Candlestick / Decimal objects.
+    """
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError(
+            "numpy is required for columnar candles: pip install 'strats-oanda[numpy]'"
+        ) from e
+
+    n = len(candles)
+    arrays = CandlestickArrays(
+        time=np.fromiter((parse_time_ns(x["time"]) for x in candles), dtype=np.int64, count=n),
+        volume=np.fromiter((x["volume"] for x in candles), dtype=np.int64, count=n),
+        complete=np.fromiter((x["complete"] for x in candles), dtype=np.bool_, count=n),
+    )
+    for component in ("bid", "ask", "mid"):
+        if n == 0 or component not in candles[0]:
+            continue
+        ohlc = np.empty((4, n), dtype=np.float64)
+        for i, field in enumerate("ohlc"):
+            ohlc[i] = np.fromiter(
+                (x[component][field] for x in candles),
+                dtype=np.float64,
+                count=n,
+            )
+        setattr(arrays, component, CandlestickDataArrays(ohlc=ohlc))
+    return arrays
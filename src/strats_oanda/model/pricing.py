@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Optional
 
-from ..helper import parse_time
+from ..helper import datetime_to_ns, loads, parse_time, parse_time_ns
 
 
 # https://developer.oanda.com/rest-live-v20/pricing-common-df/#PriceBucket
@@ -34,6 +34,21 @@ class ClientPrice:
     asks: list[PriceBucket]
     closeout_bid: Decimal
     closeout_ask: Decimal
+    # time.monotonic_ns() when the message was read from the stream (not part of the API)
+    received_ns: Optional[int] = field(default=None, init=False, compare=False, repr=False)
+
+    @property
+    def best_bid(self) -> Optional[PriceBucket]:
+        return self.bids[0] if self.bids else None
+
+    @property
+    def best_ask(self) -> Optional[PriceBucket]:
+        return self.asks[0] if self.asks else None
+
+    @property
+    def time_ns(self) -> Optional[int]:
+        t = self.time or self.timestamp
+        return datetime_to_ns(t) if t is not None else None
 
 
 def parse_client_price(data: dict) -> ClientPrice:
@@ -50,8 +65,143 @@ def parse_client_price(data: dict) -> ClientPrice:
     )
 
 
+_UNSET: Any = object()
+
+
+class LazyClientPrice:
+    """
+    Read-only ClientPrice that only builds the top-of-book eagerly.
+    Deeper book levels, closeout prices and datetimes are built on first access.
+    """
+
+    __slots__ = (
+        "_data",
+        "type",
+        "instrument",
+        "tradeable",
+        "best_bid",
+        "best_ask",
+        "_time",
+        "_timestamp",
+        "_bids",
+        "_asks",
+        "_closeout_bid",
+        "_closeout_ask",
+        "received_ns",
+    )
+
+    def __init__(self, data: dict):
+        self._data = data
+        self.type: str = data.get("type", "PRICE")
+        self.instrument: Optional[str] = data.get("instrument")
+        self.tradeable: Optional[bool] = data.get("tradeable")
+
+        bids = data["bids"]
+        asks = data["asks"]
+        self.best_bid: Optional[PriceBucket] = parse_price_bucket(bids[0]) if bids else None
+        self.best_ask: Optional[PriceBucket] = parse_price_bucket(asks[0]) if asks else None
+
+        self._time = _UNSET
+        self._timestamp = _UNSET
+        self._bids = _UNSET
+        self._asks = _UNSET
+        self._closeout_bid = _UNSET
+        self._closeout_ask = _UNSET
+        self.received_ns: Optional[int] = None
+
+    @property
+    def time(self) -> Optional[datetime]:
+        if self._time is _UNSET:
+            s = self._data.get("time")
+            self._time = parse_time(s) if s is not None else None
+        return self._time
+
+    @property
+    def timestamp(self) -> Optional[datetime]:
+        if self._timestamp is _UNSET:
+            s = self._data.get("timestamp")
+            self._timestamp = parse_time(s) if s is not None else None
+        return self._timestamp
+
+    @property
+    def time_ns(self) -> Optional[int]:
+        # Nanosecond precision, built from the raw string without datetime
+        s = self._data.get("time") or self._data.get("timestamp")
+        return parse_time_ns(s) if s is not None else None
+
+    @property
+    def bids(self) -> list[PriceBucket]:
+        if self._bids is _UNSET:
+            self._bids = _parse_book_side(self.best_bid, self._data["bids"])
+        return self._bids
+
+    @property
+    def asks(self) -> list[PriceBucket]:
+        if self._asks is _UNSET:
+            self._asks = _parse_book_side(self.best_ask, self._data["asks"])
+        return self._asks
+
+    @property
+    def closeout_bid(self) -> Decimal:
+        if self._closeout_bid is _UNSET:
+            self._closeout_bid = Decimal(self._data["closeoutBid"])
+        return self._closeout_bid
+
+    @property
+    def closeout_ask(self) -> Decimal:
+        if self._closeout_ask is _UNSET:
+            self._closeout_ask = Decimal(self._data["closeoutAsk"])
+        return self._closeout_ask
+
+    def to_client_price(self) -> ClientPrice:
+        price = ClientPrice(
+            type=self.type,
+            instrument=self.instrument,
+            time=self.time,
+            timestamp=self.timestamp,
+            tradeable=self.tradeable,
+            bids=self.bids,
+            asks=self.asks,
+            closeout_bid=self.closeout_bid,
+            closeout_ask=self.closeout_ask,
+        )
+        price.received_ns = self.received_ns
+        return price
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(instrument={self.instrument!r}, "
+            f"best_bid={self.best_bid!r}, best_ask={self.best_ask!r})"
+        )
+
+
+def _parse_book_side(best: Optional[PriceBucket], levels: list) -> list[PriceBucket]:
+    if best is None:
+        return []
+    return [best] + [parse_price_bucket(x) for x in levels[1:]]
+
+
+def parse_client_price_lazy(data: dict) -> LazyClientPrice:
+    return LazyClientPrice(data)
+
+
+def decode_client_price(raw: bytes) -> LazyClientPrice:
+    """
+    Decode a raw pricing stream line (bytes) into a LazyClientPrice
+    without going through `str`.
+    """
+    return LazyClientPrice(loads(raw))
+
+
 # https://developer.oanda.com/rest-live-v20/pricing-df/#PricingHeartbeat
 @dataclass
 class PricingHeartbeat:
     type: str
     time: datetime
+
+
+def parse_pricing_heartbeat(data: dict) -> PricingHeartbeat:
+    return PricingHeartbeat(
+        type=data["type"],
+        time=parse_time(data["time"]),
+    )
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
@@ -23,6 +24,14 @@ class ClientExtensions:
     comment: str
 
 
+def parse_client_extensions(data: dict) -> ClientExtensions:
+    return ClientExtensions(
+        id=data.get("id", ""),
+        tag=data.get("tag", ""),
+        comment=data.get("comment", ""),
+    )
+
+
 # cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TakeProfitDetails
 @dataclass
 class TakeProfitDetails:
@@ -59,8 +68,111 @@ class LimitOrderReason(Enum):
 
 # https://developer.oanda.com/rest-live-v20/transaction-df/#OrderCancelReason
 class OrderCancelReason(Enum):
+    INTERNAL_SERVER_ERROR = "INTERNAL_SERVER_ERROR"
+    ACCOUNT_LOCKED = "ACCOUNT_LOCKED"
+    ACCOUNT_NEW_POSITIONS_LOCKED = "ACCOUNT_NEW_POSITIONS_LOCKED"
+    ACCOUNT_ORDER_CREATION_LOCKED = "ACCOUNT_ORDER_CREATION_LOCKED"
+    ACCOUNT_ORDER_FILL_LOCKED = "ACCOUNT_ORDER_FILL_LOCKED"
     CLIENT_REQUEST = "CLIENT_REQUEST"
-    # ...
+    MIGRATION = "MIGRATION"
+    MARKET_HALTED = "MARKET_HALTED"
+    LINKED_TRADE_CLOSED = "LINKED_TRADE_CLOSED"
+    TIME_IN_FORCE_EXPIRED = "TIME_IN_FORCE_EXPIRED"
+    INSUFFICIENT_MARGIN = "INSUFFICIENT_MARGIN"
+    FIFO_VIOLATION = "FIFO_VIOLATION"
+    BOUNDS_VIOLATION = "BOUNDS_VIOLATION"
+    CLIENT_REQUEST_REPLACED = "CLIENT_REQUEST_REPLACED"
+    DIVIDEND_ADJUSTMENT_REPLACED = "DIVIDEND_ADJUSTMENT_REPLACED"
+    INSUFFICIENT_LIQUIDITY = "INSUFFICIENT_LIQUIDITY"
+    TAKE_PROFIT_ON_FILL_GTD_TIMESTAMP_IN_PAST = "TAKE_PROFIT_ON_FILL_GTD_TIMESTAMP_IN_PAST"
+    TAKE_PROFIT_ON_FILL_LOSS = "TAKE_PROFIT_ON_FILL_LOSS"
+    LOSING_TAKE_PROFIT = "LOSING_TAKE_PROFIT"
+    STOP_LOSS_ON_FILL_GTD_TIMESTAMP_IN_PAST = "STOP_LOSS_ON_FILL_GTD_TIMESTAMP_IN_PAST"
+    STOP_LOSS_ON_FILL_LOSS = "STOP_LOSS_ON_FILL_LOSS"
+    STOP_LOSS_ON_FILL_PRICE_DISTANCE_MAXIMUM_EXCEEDED = (
+        "STOP_LOSS_ON_FILL_PRICE_DISTANCE_MAXIMUM_EXCEEDED"
+    )
+    STOP_LOSS_ON_FILL_REQUIRED = "STOP_LOSS_ON_FILL_REQUIRED"
+    STOP_LOSS_ON_FILL_GUARANTEED_REQUIRED = "STOP_LOSS_ON_FILL_GUARANTEED_REQUIRED"
+    STOP_LOSS_ON_FILL_GUARANTEED_NOT_ALLOWED = "STOP_LOSS_ON_FILL_GUARANTEED_NOT_ALLOWED"
+    STOP_LOSS_ON_FILL_GUARANTEED_MINIMUM_DISTANCE_NOT_MET = (
+        "STOP_LOSS_ON_FILL_GUARANTEED_MINIMUM_DISTANCE_NOT_MET"
+    )
+    STOP_LOSS_ON_FILL_GUARANTEED_LEVEL_RESTRICTION_EXCEEDED = (
+        "STOP_LOSS_ON_FILL_GUARANTEED_LEVEL_RESTRICTION_EXCEEDED"
+    )
+    STOP_LOSS_ON_FILL_GUARANTEED_HEDGING_NOT_ALLOWED = (
+        "STOP_LOSS_ON_FILL_GUARANTEED_HEDGING_NOT_ALLOWED"
+    )
+    STOP_LOSS_ON_FILL_TIME_IN_FORCE_INVALID = "STOP_LOSS_ON_FILL_TIME_IN_FORCE_INVALID"
+    STOP_LOSS_ON_FILL_TRIGGER_CONDITION_INVALID = "STOP_LOSS_ON_FILL_TRIGGER_CONDITION_INVALID"
+    GUARANTEED_STOP_LOSS_ON_FILL_GTD_TIMESTAMP_IN_PAST = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_GTD_TIMESTAMP_IN_PAST"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_LOSS = "GUARANTEED_STOP_LOSS_ON_FILL_LOSS"
+    GUARANTEED_STOP_LOSS_ON_FILL_PRICE_DISTANCE_MAXIMUM_EXCEEDED = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_PRICE_DISTANCE_MAXIMUM_EXCEEDED"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_REQUIRED = "GUARANTEED_STOP_LOSS_ON_FILL_REQUIRED"
+    GUARANTEED_STOP_LOSS_ON_FILL_NOT_ALLOWED = "GUARANTEED_STOP_LOSS_ON_FILL_NOT_ALLOWED"
+    GUARANTEED_STOP_LOSS_ON_FILL_MINIMUM_DISTANCE_NOT_MET = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_MINIMUM_DISTANCE_NOT_MET"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_LEVEL_RESTRICTION_VOLUME_EXCEEDED = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_LEVEL_RESTRICTION_VOLUME_EXCEEDED"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_LEVEL_RESTRICTION_PRICE_RANGE_EXCEEDED = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_LEVEL_RESTRICTION_PRICE_RANGE_EXCEEDED"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_HEDGING_NOT_ALLOWED = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_HEDGING_NOT_ALLOWED"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_TIME_IN_FORCE_INVALID = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_TIME_IN_FORCE_INVALID"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_TRIGGER_CONDITION_INVALID = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_TRIGGER_CONDITION_INVALID"
+    )
+    TAKE_PROFIT_ON_FILL_PRICE_DISTANCE_MAXIMUM_EXCEEDED = (
+        "TAKE_PROFIT_ON_FILL_PRICE_DISTANCE_MAXIMUM_EXCEEDED"
+    )
+    TRAILING_STOP_LOSS_ON_FILL_GTD_TIMESTAMP_IN_PAST = (
+        "TRAILING_STOP_LOSS_ON_FILL_GTD_TIMESTAMP_IN_PAST"
+    )
+    CLIENT_TRADE_ID_ALREADY_EXISTS = "CLIENT_TRADE_ID_ALREADY_EXISTS"
+    POSITION_CLOSEOUT_FAILED = "POSITION_CLOSEOUT_FAILED"
+    OPEN_TRADES_ALLOWED_EXCEEDED = "OPEN_TRADES_ALLOWED_EXCEEDED"
+    PENDING_ORDERS_ALLOWED_EXCEEDED = "PENDING_ORDERS_ALLOWED_EXCEEDED"
+    TAKE_PROFIT_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS = (
+        "TAKE_PROFIT_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS"
+    )
+    STOP_LOSS_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS = (
+        "STOP_LOSS_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS"
+    )
+    GUARANTEED_STOP_LOSS_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS = (
+        "GUARANTEED_STOP_LOSS_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS"
+    )
+    TRAILING_STOP_LOSS_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS = (
+        "TRAILING_STOP_LOSS_ON_FILL_CLIENT_ORDER_ID_ALREADY_EXISTS"
+    )
+    POSITION_SIZE_EXCEEDED = "POSITION_SIZE_EXCEEDED"
+    HEDGING_GSLO_VIOLATION = "HEDGING_GSLO_VIOLATION"
+    ACCOUNT_POSITION_VALUE_LIMIT_EXCEEDED = "ACCOUNT_POSITION_VALUE_LIMIT_EXCEEDED"
+    INSTRUMENT_BID_REDUCE_ONLY = "INSTRUMENT_BID_REDUCE_ONLY"
+    INSTRUMENT_ASK_REDUCE_ONLY = "INSTRUMENT_ASK_REDUCE_ONLY"
+    INSTRUMENT_BID_HALTED = "INSTRUMENT_BID_HALTED"
+    INSTRUMENT_ASK_HALTED = "INSTRUMENT_ASK_HALTED"
+    STOP_LOSS_ON_FILL_GUARANTEED_BID_HALTED = "STOP_LOSS_ON_FILL_GUARANTEED_BID_HALTED"
+    STOP_LOSS_ON_FILL_GUARANTEED_ASK_HALTED = "STOP_LOSS_ON_FILL_GUARANTEED_ASK_HALTED"
+    GUARANTEED_STOP_LOSS_ON_FILL_BID_HALTED = "GUARANTEED_STOP_LOSS_ON_FILL_BID_HALTED"
+    GUARANTEED_STOP_LOSS_ON_FILL_ASK_HALTED = "GUARANTEED_STOP_LOSS_ON_FILL_ASK_HALTED"
+    FIFO_VIOLATION_SAFEGUARD_VIOLATION = "FIFO_VIOLATION_SAFEGUARD_VIOLATION"
+    FIFO_VIOLATION_SAFEGUARD_PARTIAL_CLOSE_VIOLATION = (
+        "FIFO_VIOLATION_SAFEGUARD_PARTIAL_CLOSE_VIOLATION"
+    )
+    ORDERS_ON_FILL_RMO_MUTUAL_EXCLUSIVITY_MUTUALLY_EXCLUSIVE_VIOLATION = (
+        "ORDERS_ON_FILL_RMO_MUTUAL_EXCLUSIVITY_MUTUALLY_EXCLUSIVE_VIOLATION"
+    )
 
 
 # https://developer.oanda.com/rest-live-v20/transaction-df/#OrderFillReason
@@ -148,6 +260,8 @@ class Transaction:
     batch_id: str
     type: str
     request_id: str  # allow empty string
+    # time.monotonic_ns() when the message was read from the stream (not part of the API)
+    received_ns: Optional[int] = field(default=None, init=False, compare=False, repr=False)
 
 
 # type = MARKET_ORDER
@@ -185,8 +299,15 @@ def parse_market_order_transaction(data: dict) -> MarketOrderTransaction:
         instrument=data["instrument"],
         units=Decimal(data["units"]),
         time_in_force=TimeInForce(data["timeInForce"]),
-        price_bound=Decimal(data["price_bound"]) if "price_bound" in data else None,
+        price_bound=Decimal(data["priceBound"]) if "priceBound" in data else None,
+        position_fill=OrderPositionFill(data.get("positionFill", "DEFAULT")),
         reason=MarketOrderReason(data["reason"]),
+        client_extensions=parse_client_extensions(data["clientExtensions"])
+        if "clientExtensions" in data
+        else None,
+        trade_client_extensions=parse_client_extensions(data["tradeClientExtensions"])
+        if "tradeClientExtensions" in data
+        else None,
     )
 
 
@@ -201,6 +322,10 @@ class LimitOrderTransaction(Transaction):
     gtd_time: Optional[datetime]
     trigger_condition: OrderTriggerCondition
     reason: LimitOrderReason
+    position_fill: OrderPositionFill = OrderPositionFill.DEFAULT
+    client_extensions: Optional[ClientExtensions] = None
+    trade_client_extensions: Optional[ClientExtensions] = None
+    replaces_order_id: Optional[str] = None
 
 
 def parse_limit_order_transaction(data: dict) -> LimitOrderTransaction:
@@ -219,6 +344,14 @@ def parse_limit_order_transaction(data: dict) -> LimitOrderTransaction:
         gtd_time=parse_time(data["gtdTime"]) if "gtdTime" in data else None,
         trigger_condition=OrderTriggerCondition(data["triggerCondition"]),
         reason=LimitOrderReason(data["reason"]),
+        position_fill=OrderPositionFill(data.get("positionFill", "DEFAULT")),
+        client_extensions=parse_client_extensions(data["clientExtensions"])
+        if "clientExtensions" in data
+        else None,
+        trade_client_extensions=parse_client_extensions(data["tradeClientExtensions"])
+        if "tradeClientExtensions" in data
+        else None,
+        replaces_order_id=data["replacesOrderID"] if "replacesOrderID" in data else None,
     )
 
 
@@ -242,6 +375,8 @@ def parse_order_cancel_transaction(data: dict) -> OrderCancelTransaction:
         type=data["type"],
         order_id=data["orderID"],
         reason=OrderCancelReason(data["reason"]),
+        client_order_id=data["clientOrderID"] if "clientOrderID" in data else None,
+        replaced_by_order_id=data["replacedByOrderID"] if "replacedByOrderID" in data else None,
     )
 
 
@@ -299,9 +434,600 @@ def parse_order_fill_transaction(data: dict) -> OrderFillTransaction:
         quote_guaranteed_execution_fee=Decimal(data["quoteGuaranteedExecutionFee"]),
         account_balance=Decimal(data["accountBalance"]),
         trade_opened=parse_trade_open(data["tradeOpened"]) if "tradeOpened" in data else None,
-        trades_closed=[parse_trade_reduce(x) for x in data["tradeClosed"]]
-        if "tradeClosed" in data
+        trades_closed=[parse_trade_reduce(x) for x in data["tradesClosed"]]
+        if "tradesClosed" in data
         else None,
         trade_reduced=parse_trade_reduce(data["tradeReduced"]) if "tradeReduced" in data else None,
         half_spread_cost=Decimal(data["halfSpreadCost"]),
     )
+
+
+def _parse_transaction_base(data: dict) -> dict:
+    return {
+        "id": data["id"],
+        "time": parse_time(data["time"]),
+        "user_id": data["userID"],
+        "account_id": data["accountID"],
+        "batch_id": data["batchID"],
+        "request_id": data["requestID"] if "requestID" in data else "",
+        "type": data["type"],
+    }
+
+
+def _optional_decimal(data: dict, key: str) -> Optional[Decimal]:
+    return Decimal(data[key]) if key in data else None
+
+
+def _optional_time(data: dict, key: str) -> Optional[datetime]:
+    return parse_time(data[key]) if key in data else None
+
+
+def _optional_client_extensions(data: dict, key: str) -> Optional[ClientExtensions]:
+    return parse_client_extensions(data[key]) if key in data else None
+
+
+# https://developer.oanda.com/rest-live-v20/transaction-df/#StopOrderReason
+class StopOrderReason(Enum):
+    CLIENT_ORDER = "CLIENT_ORDER"
+    REPLACEMENT = "REPLACEMENT"
+
+
+# https://developer.oanda.com/rest-live-v20/transaction-df/#MarketIfTouchedOrderReason
+class MarketIfTouchedOrderReason(Enum):
+    CLIENT_ORDER = "CLIENT_ORDER"
+    REPLACEMENT = "REPLACEMENT"
+
+
+# https://developer.oanda.com/rest-live-v20/transaction-df/#TakeProfitOrderReason
+class TakeProfitOrderReason(Enum):
+    CLIENT_ORDER = "CLIENT_ORDER"
+    REPLACEMENT = "REPLACEMENT"
+    ON_FILL = "ON_FILL"
+
+
+# https://developer.oanda.com/rest-live-v20/transaction-df/#StopLossOrderReason
+class StopLossOrderReason(Enum):
+    CLIENT_ORDER = "CLIENT_ORDER"
+    REPLACEMENT = "REPLACEMENT"
+    ON_FILL = "ON_FILL"
+
+
+# https://developer.oanda.com/rest-live-v20/transaction-df/#GuaranteedStopLossOrderReason
+class GuaranteedStopLossOrderReason(Enum):
+    CLIENT_ORDER = "CLIENT_ORDER"
+    REPLACEMENT = "REPLACEMENT"
+    ON_FILL = "ON_FILL"
+
+
+# https://developer.oanda.com/rest-live-v20/transaction-df/#TrailingStopLossOrderReason
+class TrailingStopLossOrderReason(Enum):
+    CLIENT_ORDER = "CLIENT_ORDER"
+    REPLACEMENT = "REPLACEMENT"
+    ON_FILL = "ON_FILL"
+
+
+# https://developer.oanda.com/rest-live-v20/transaction-df/#FixedPriceOrderReason
+class FixedPriceOrderReason(Enum):
+    PLATFORM_ACCOUNT_MIGRATION = "PLATFORM_ACCOUNT_MIGRATION"
+    TRADE_CLOSE_DIVISION_ACCOUNT_MIGRATION = "TRADE_CLOSE_DIVISION_ACCOUNT_MIGRATION"
+    TRADE_CLOSE_ADMINISTRATIVE_ACTION = "TRADE_CLOSE_ADMINISTRATIVE_ACTION"
+
+
+# type = STOP_ORDER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#StopOrderTransaction
+@dataclass
+class StopOrderTransaction(Transaction):
+    instrument: str
+    units: Decimal
+    price: Decimal
+    time_in_force: TimeInForce
+    trigger_condition: OrderTriggerCondition
+    reason: StopOrderReason
+    price_bound: Optional[Decimal] = None
+    gtd_time: Optional[datetime] = None
+    position_fill: OrderPositionFill = OrderPositionFill.DEFAULT
+    client_extensions: Optional[ClientExtensions] = None
+    trade_client_extensions: Optional[ClientExtensions] = None
+    replaces_order_id: Optional[str] = None
+
+
+def parse_stop_order_transaction(data: dict) -> StopOrderTransaction:
+    return StopOrderTransaction(
+        **_parse_transaction_base(data),
+        instrument=data["instrument"],
+        units=Decimal(data["units"]),
+        price=Decimal(data["price"]),
+        time_in_force=TimeInForce(data["timeInForce"]),
+        trigger_condition=OrderTriggerCondition(data["triggerCondition"]),
+        reason=StopOrderReason(data["reason"]),
+        price_bound=_optional_decimal(data, "priceBound"),
+        gtd_time=_optional_time(data, "gtdTime"),
+        position_fill=OrderPositionFill(data.get("positionFill", "DEFAULT")),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+        trade_client_extensions=_optional_client_extensions(data, "tradeClientExtensions"),
+        replaces_order_id=data.get("replacesOrderID"),
+    )
+
+
+# type = MARKET_IF_TOUCHED_ORDER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#MarketIfTouchedOrderTransaction
+@dataclass
+class MarketIfTouchedOrderTransaction(Transaction):
+    instrument: str
+    units: Decimal
+    price: Decimal
+    time_in_force: TimeInForce
+    trigger_condition: OrderTriggerCondition
+    reason: MarketIfTouchedOrderReason
+    price_bound: Optional[Decimal] = None
+    gtd_time: Optional[datetime] = None
+    position_fill: OrderPositionFill = OrderPositionFill.DEFAULT
+    client_extensions: Optional[ClientExtensions] = None
+    trade_client_extensions: Optional[ClientExtensions] = None
+    replaces_order_id: Optional[str] = None
+
+
+def parse_market_if_touched_order_transaction(data: dict) -> MarketIfTouchedOrderTransaction:
+    return MarketIfTouchedOrderTransaction(
+        **_parse_transaction_base(data),
+        instrument=data["instrument"],
+        units=Decimal(data["units"]),
+        price=Decimal(data["price"]),
+        time_in_force=TimeInForce(data["timeInForce"]),
+        trigger_condition=OrderTriggerCondition(data["triggerCondition"]),
+        reason=MarketIfTouchedOrderReason(data["reason"]),
+        price_bound=_optional_decimal(data, "priceBound"),
+        gtd_time=_optional_time(data, "gtdTime"),
+        position_fill=OrderPositionFill(data.get("positionFill", "DEFAULT")),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+        trade_client_extensions=_optional_client_extensions(data, "tradeClientExtensions"),
+        replaces_order_id=data.get("replacesOrderID"),
+    )
+
+
+# type = TAKE_PROFIT_ORDER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TakeProfitOrderTransaction
+@dataclass
+class TakeProfitOrderTransaction(Transaction):
+    trade_id: str
+    price: Decimal
+    time_in_force: TimeInForce
+    trigger_condition: OrderTriggerCondition
+    reason: TakeProfitOrderReason
+    client_trade_id: Optional[str] = None
+    gtd_time: Optional[datetime] = None
+    client_extensions: Optional[ClientExtensions] = None
+    order_fill_transaction_id: Optional[str] = None
+    replaces_order_id: Optional[str] = None
+
+
+def parse_take_profit_order_transaction(data: dict) -> TakeProfitOrderTransaction:
+    return TakeProfitOrderTransaction(
+        **_parse_transaction_base(data),
+        trade_id=data["tradeID"],
+        price=Decimal(data["price"]),
+        time_in_force=TimeInForce(data["timeInForce"]),
+        trigger_condition=OrderTriggerCondition(data["triggerCondition"]),
+        reason=TakeProfitOrderReason(data["reason"]),
+        client_trade_id=data.get("clientTradeID"),
+        gtd_time=_optional_time(data, "gtdTime"),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+        order_fill_transaction_id=data.get("orderFillTransactionID"),
+        replaces_order_id=data.get("replacesOrderID"),
+    )
+
+
+# type = STOP_LOSS_ORDER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#StopLossOrderTransaction
+@dataclass
+class StopLossOrderTransaction(Transaction):
+    trade_id: str
+    time_in_force: TimeInForce
+    trigger_condition: OrderTriggerCondition
+    reason: StopLossOrderReason
+    price: Optional[Decimal] = None
+    distance: Optional[Decimal] = None
+    client_trade_id: Optional[str] = None
+    gtd_time: Optional[datetime] = None
+    client_extensions: Optional[ClientExtensions] = None
+    order_fill_transaction_id: Optional[str] = None
+    replaces_order_id: Optional[str] = None
+
+
+def parse_stop_loss_order_transaction(data: dict) -> StopLossOrderTransaction:
+    return StopLossOrderTransaction(
+        **_parse_transaction_base(data),
+        trade_id=data["tradeID"],
+        time_in_force=TimeInForce(data["timeInForce"]),
+        trigger_condition=OrderTriggerCondition(data["triggerCondition"]),
+        reason=StopLossOrderReason(data["reason"]),
+        price=_optional_decimal(data, "price"),
+        distance=_optional_decimal(data, "distance"),
+        client_trade_id=data.get("clientTradeID"),
+        gtd_time=_optional_time(data, "gtdTime"),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+        order_fill_transaction_id=data.get("orderFillTransactionID"),
+        replaces_order_id=data.get("replacesOrderID"),
+    )
+
+
+# type = GUARANTEED_STOP_LOSS_ORDER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#GuaranteedStopLossOrderTransaction
+@dataclass
+class GuaranteedStopLossOrderTransaction(Transaction):
+    trade_id: str
+    time_in_force: TimeInForce
+    trigger_condition: OrderTriggerCondition
+    reason: GuaranteedStopLossOrderReason
+    price: Optional[Decimal] = None
+    distance: Optional[Decimal] = None
+    guaranteed_execution_premium: Optional[Decimal] = None
+    client_trade_id: Optional[str] = None
+    gtd_time: Optional[datetime] = None
+    client_extensions: Optional[ClientExtensions] = None
+    order_fill_transaction_id: Optional[str] = None
+    replaces_order_id: Optional[str] = None
+
+
+def parse_guaranteed_stop_loss_order_transaction(
+    data: dict,
+) -> GuaranteedStopLossOrderTransaction:
+    return GuaranteedStopLossOrderTransaction(
+        **_parse_transaction_base(data),
+        trade_id=data["tradeID"],
+        time_in_force=TimeInForce(data["timeInForce"]),
+        trigger_condition=OrderTriggerCondition(data["triggerCondition"]),
+        reason=GuaranteedStopLossOrderReason(data["reason"]),
+        price=_optional_decimal(data, "price"),
+        distance=_optional_decimal(data, "distance"),
+        guaranteed_execution_premium=_optional_decimal(data, "guaranteedExecutionPremium"),
+        client_trade_id=data.get("clientTradeID"),
+        gtd_time=_optional_time(data, "gtdTime"),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+        order_fill_transaction_id=data.get("orderFillTransactionID"),
+        replaces_order_id=data.get("replacesOrderID"),
+    )
+
+
+# type = TRAILING_STOP_LOSS_ORDER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TrailingStopLossOrderTransaction
+@dataclass
+class TrailingStopLossOrderTransaction(Transaction):
+    trade_id: str
+    distance: Decimal
+    time_in_force: TimeInForce
+    trigger_condition: OrderTriggerCondition
+    reason: TrailingStopLossOrderReason
+    client_trade_id: Optional[str] = None
+    gtd_time: Optional[datetime] = None
+    client_extensions: Optional[ClientExtensions] = None
+    order_fill_transaction_id: Optional[str] = None
+    replaces_order_id: Optional[str] = None
+
+
+def parse_trailing_stop_loss_order_transaction(data: dict) -> TrailingStopLossOrderTransaction:
+    return TrailingStopLossOrderTransaction(
+        **_parse_transaction_base(data),
+        trade_id=data["tradeID"],
+        distance=Decimal(data["distance"]),
+        time_in_force=TimeInForce(data["timeInForce"]),
+        trigger_condition=OrderTriggerCondition(data["triggerCondition"]),
+        reason=TrailingStopLossOrderReason(data["reason"]),
+        client_trade_id=data.get("clientTradeID"),
+        gtd_time=_optional_time(data, "gtdTime"),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+        order_fill_transaction_id=data.get("orderFillTransactionID"),
+        replaces_order_id=data.get("replacesOrderID"),
+    )
+
+
+# type = FIXED_PRICE_ORDER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#FixedPriceOrderTransaction
+@dataclass
+class FixedPriceOrderTransaction(Transaction):
+    instrument: str
+    units: Decimal
+    price: Decimal
+    reason: FixedPriceOrderReason
+    position_fill: OrderPositionFill = OrderPositionFill.DEFAULT
+    client_extensions: Optional[ClientExtensions] = None
+    trade_client_extensions: Optional[ClientExtensions] = None
+
+
+def parse_fixed_price_order_transaction(data: dict) -> FixedPriceOrderTransaction:
+    return FixedPriceOrderTransaction(
+        **_parse_transaction_base(data),
+        instrument=data["instrument"],
+        units=Decimal(data["units"]),
+        price=Decimal(data["price"]),
+        reason=FixedPriceOrderReason(data["reason"]),
+        position_fill=OrderPositionFill(data.get("positionFill", "DEFAULT")),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+        trade_client_extensions=_optional_client_extensions(data, "tradeClientExtensions"),
+    )
+
+
+# type = ORDER_CLIENT_EXTENSIONS_MODIFY
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#OrderClientExtensionsModifyTransaction
+@dataclass
+class OrderClientExtensionsModifyTransaction(Transaction):
+    order_id: str
+    client_order_id: Optional[str] = None
+    client_extensions_modify: Optional[ClientExtensions] = None
+    trade_client_extensions_modify: Optional[ClientExtensions] = None
+
+
+def parse_order_client_extensions_modify_transaction(
+    data: dict,
+) -> OrderClientExtensionsModifyTransaction:
+    return OrderClientExtensionsModifyTransaction(
+        **_parse_transaction_base(data),
+        order_id=data["orderID"],
+        client_order_id=data.get("clientOrderID"),
+        client_extensions_modify=_optional_client_extensions(data, "clientExtensionsModify"),
+        trade_client_extensions_modify=_optional_client_extensions(
+            data, "tradeClientExtensionsModify"
+        ),
+    )
+
+
+# type = TRADE_CLIENT_EXTENSIONS_MODIFY
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TradeClientExtensionsModifyTransaction
+@dataclass
+class TradeClientExtensionsModifyTransaction(Transaction):
+    trade_id: str
+    client_trade_id: Optional[str] = None
+    trade_client_extensions_modify: Optional[ClientExtensions] = None
+
+
+def parse_trade_client_extensions_modify_transaction(
+    data: dict,
+) -> TradeClientExtensionsModifyTransaction:
+    return TradeClientExtensionsModifyTransaction(
+        **_parse_transaction_base(data),
+        trade_id=data["tradeID"],
+        client_trade_id=data.get("clientTradeID"),
+        trade_client_extensions_modify=_optional_client_extensions(
+            data, "tradeClientExtensionsModify"
+        ),
+    )
+
+
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#PositionFinancing
+@dataclass
+class PositionFinancing:
+    instrument: str
+    financing: Decimal
+
+
+def parse_position_financing(data: dict) -> PositionFinancing:
+    return PositionFinancing(
+        instrument=data["instrument"],
+        financing=Decimal(data["financing"]),
+    )
+
+
+# type = DAILY_FINANCING
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#DailyFinancingTransaction
+@dataclass
+class DailyFinancingTransaction(Transaction):
+    financing: Decimal
+    account_balance: Decimal
+    position_financings: list[PositionFinancing]
+    account_financing_mode: Optional[str] = None
+
+
+def parse_daily_financing_transaction(data: dict) -> DailyFinancingTransaction:
+    return DailyFinancingTransaction(
+        **_parse_transaction_base(data),
+        financing=Decimal(data["financing"]),
+        account_balance=Decimal(data["accountBalance"]),
+        position_financings=[
+            parse_position_financing(x) for x in data.get("positionFinancings", [])
+        ],
+        account_financing_mode=data.get("accountFinancingMode"),
+    )
+
+
+# type = MARGIN_CALL_ENTER
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#MarginCallEnterTransaction
+@dataclass
+class MarginCallEnterTransaction(Transaction):
+    pass
+
+
+# type = MARGIN_CALL_EXTEND
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#MarginCallExtendTransaction
+@dataclass
+class MarginCallExtendTransaction(Transaction):
+    extension_number: Optional[int] = None
+
+
+# type = MARGIN_CALL_EXIT
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#MarginCallExitTransaction
+@dataclass
+class MarginCallExitTransaction(Transaction):
+    pass
+
+
+def parse_margin_call_enter_transaction(data: dict) -> MarginCallEnterTransaction:
+    return MarginCallEnterTransaction(**_parse_transaction_base(data))
+
+
+def parse_margin_call_extend_transaction(data: dict) -> MarginCallExtendTransaction:
+    return MarginCallExtendTransaction(
+        **_parse_transaction_base(data),
+        extension_number=data.get("extensionNumber"),
+    )
+
+
+def parse_margin_call_exit_transaction(data: dict) -> MarginCallExitTransaction:
+    return MarginCallExitTransaction(**_parse_transaction_base(data))
+
+
+# type = DELAYED_TRADE_CLOSURE
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#DelayedTradeClosureTransaction
+@dataclass
+class DelayedTradeClosureTransaction(Transaction):
+    reason: MarketOrderReason
+    # comma separated trade IDs
+    trade_ids: str
+
+
+def parse_delayed_trade_closure_transaction(data: dict) -> DelayedTradeClosureTransaction:
+    return DelayedTradeClosureTransaction(
+        **_parse_transaction_base(data),
+        reason=MarketOrderReason(data["reason"]),
+        trade_ids=data["tradeIDs"],
+    )
+
+
+# type = TRANSFER_FUNDS
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TransferFundsTransaction
+@dataclass
+class TransferFundsTransaction(Transaction):
+    amount: Decimal
+    account_balance: Decimal
+    funding_reason: Optional[str] = None
+    comment: Optional[str] = None
+
+
+def parse_transfer_funds_transaction(data: dict) -> TransferFundsTransaction:
+    return TransferFundsTransaction(
+        **_parse_transaction_base(data),
+        amount=Decimal(data["amount"]),
+        account_balance=Decimal(data["accountBalance"]),
+        funding_reason=data.get("fundingReason"),
+        comment=data.get("comment"),
+    )
+
+
+# type = DIVIDEND_ADJUSTMENT
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#DividendAdjustmentTransaction
+@dataclass
+class DividendAdjustmentTransaction(Transaction):
+    instrument: str
+    dividend_adjustment: Decimal
+    account_balance: Decimal
+
+
+def parse_dividend_adjustment_transaction(data: dict) -> DividendAdjustmentTransaction:
+    return DividendAdjustmentTransaction(
+        **_parse_transaction_base(data),
+        instrument=data["instrument"],
+        dividend_adjustment=Decimal(data["dividendAdjustment"]),
+        account_balance=Decimal(data["accountBalance"]),
+    )
+
+
+# type = CREATE / CLOSE / REOPEN / CLIENT_CONFIGURE / RESET_RESETTABLE_PL
+# Account administration, kept with the common fields and the raw message.
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#CreateTransaction
+@dataclass
+class AccountTransaction(Transaction):
+    data: dict = field(default_factory=dict, repr=False)
+
+
+def parse_account_transaction(data: dict) -> AccountTransaction:
+    return AccountTransaction(**_parse_transaction_base(data), data=data)
+
+
+# type = *_REJECT
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TransactionRejectReason
+@dataclass
+class RejectTransaction(Transaction):
+    reject_reason: Optional[str] = None
+    instrument: Optional[str] = None
+    units: Optional[Decimal] = None
+    order_id: Optional[str] = None
+    trade_id: Optional[str] = None
+    client_extensions: Optional[ClientExtensions] = None
+
+
+def parse_reject_transaction(data: dict) -> RejectTransaction:
+    return RejectTransaction(
+        **_parse_transaction_base(data),
+        reject_reason=data.get("rejectReason"),
+        instrument=data.get("instrument"),
+        units=_optional_decimal(data, "units"),
+        order_id=data.get("orderID"),
+        trade_id=data.get("tradeID"),
+        client_extensions=_optional_client_extensions(data, "clientExtensions"),
+    )
+
+
+# Not a Transaction: sent on the transaction stream every 5 seconds
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TransactionHeartbeat
+@dataclass
+class TransactionHeartbeat:
+    type: str
+    last_transaction_id: str
+    time: datetime
+
+
+def parse_transaction_heartbeat(data: dict) -> TransactionHeartbeat:
+    return TransactionHeartbeat(
+        type=data["type"],
+        last_transaction_id=data["lastTransactionID"],
+        time=parse_time(data["time"]),
+    )
+
+
+TransactionParser = Callable[[dict], Transaction]
+
+# cf. https://developer.oanda.com/rest-live-v20/transaction-df/#TransactionType
+TRANSACTION_PARSERS: dict[str, TransactionParser] = {
+    "CREATE": parse_account_transaction,
+    "CLOSE": parse_account_transaction,
+    "REOPEN": parse_account_transaction,
+    "CLIENT_CONFIGURE": parse_account_transaction,
+    "CLIENT_CONFIGURE_REJECT": parse_reject_transaction,
+    "TRANSFER_FUNDS": parse_transfer_funds_transaction,
+    "TRANSFER_FUNDS_REJECT": parse_reject_transaction,
+    "MARKET_ORDER": parse_market_order_transaction,
+    "MARKET_ORDER_REJECT": parse_reject_transaction,
+    "FIXED_PRICE_ORDER": parse_fixed_price_order_transaction,
+    "LIMIT_ORDER": parse_limit_order_transaction,
+    "LIMIT_ORDER_REJECT": parse_reject_transaction,
+    "STOP_ORDER": parse_stop_order_transaction,
+    "STOP_ORDER_REJECT": parse_reject_transaction,
+    "MARKET_IF_TOUCHED_ORDER": parse_market_if_touched_order_transaction,
+    "MARKET_IF_TOUCHED_ORDER_REJECT": parse_reject_transaction,
+    "TAKE_PROFIT_ORDER": parse_take_profit_order_transaction,
+    "TAKE_PROFIT_ORDER_REJECT": parse_reject_transaction,
+    "STOP_LOSS_ORDER": parse_stop_loss_order_transaction,
+    "STOP_LOSS_ORDER_REJECT": parse_reject_transaction,
+    "GUARANTEED_STOP_LOSS_ORDER": parse_guaranteed_stop_loss_order_transaction,
+    "GUARANTEED_STOP_LOSS_ORDER_REJECT": parse_reject_transaction,
+    "TRAILING_STOP_LOSS_ORDER": parse_trailing_stop_loss_order_transaction,
+    "TRAILING_STOP_LOSS_ORDER_REJECT": parse_reject_transaction,
+    "ORDER_FILL": parse_order_fill_transaction,
+    "ORDER_CANCEL": parse_order_cancel_transaction,
+    "ORDER_CANCEL_REJECT": parse_reject_transaction,
+    "ORDER_CLIENT_EXTENSIONS_MODIFY": parse_order_client_extensions_modify_transaction,
+    "ORDER_CLIENT_EXTENSIONS_MODIFY_REJECT": parse_reject_transaction,
+    "TRADE_CLIENT_EXTENSIONS_MODIFY": parse_trade_client_extensions_modify_transaction,
+    "TRADE_CLIENT_EXTENSIONS_MODIFY_REJECT": parse_reject_transaction,
+    "MARGIN_CALL_ENTER": parse_margin_call_enter_transaction,
+    "MARGIN_CALL_EXTEND": parse_margin_call_extend_transaction,
+    "MARGIN_CALL_EXIT": parse_margin_call_exit_transaction,
+    "DELAYED_TRADE_CLOSURE": parse_delayed_trade_closure_transaction,
+    "DAILY_FINANCING": parse_daily_financing_transaction,
+    "DIVIDEND_ADJUSTMENT": parse_dividend_adjustment_transaction,
+    "RESET_RESETTABLE_PL": parse_account_transaction,
+}
+
+
+def register_transaction_parser(transaction_type: str, parser: TransactionParser):
+    """
+    Add or replace the parser of a transaction type.
+    """
+    TRANSACTION_PARSERS[transaction_type] = parser
+
+
+def parse_transaction(data: dict) -> Optional[Transaction]:
+    """
+    Parse any transaction by its type. Returns None for unknown types.
+    """
+    parser = TRANSACTION_PARSERS.get(data.get("type", ""))
+    return parser(data) if parser is not None else None
@@ -1,4 +1,5 @@
 from .trade import Trade as Trade
+from .trade import TradeAggregates as TradeAggregates
 from .trade import TradeMetrics as TradeMetrics
 from .trade import trade_to_trade_metrics as trade_to_trade_metrics
 from .trade import transaction_to_trade as transaction_to_trade
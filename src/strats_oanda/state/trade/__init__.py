@@ -1,4 +1,9 @@
+from .aggregate import Aggregate as Aggregate
+from .aggregate import TradeAggregates as TradeAggregates
+from .history import Transaction as Transaction
+from .history import TransactionHistory as TransactionHistory
 from .metrics import TradeMetrics as TradeMetrics
 from .metrics import trade_to_trade_metrics as trade_to_trade_metrics
+from .position import Position as Position
 from .trade import Trade as Trade
 from .trade import transaction_to_trade as transaction_to_trade
@@ -0,0 +1,68 @@
+"""
+Running aggregates of the fills of a Trade
+
+Updated once per fill, so that reading the totals doesn't depend on how many
+fills the trade has accumulated.
+"""
+
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Optional
+
+from .history import Transaction
+
+
+@dataclass
+class Aggregate:
+    # sum of realized pl
+    profit: Decimal = Decimal("0")
+    # sum of signed units
+    units: Decimal = Decimal("0")
+    # number of fills
+    count: int = 0
+
+    def add(self, transaction: Transaction):
+        if transaction.pl is not None:
+            self.profit += transaction.pl
+        self.units += transaction.units
+        self.count += 1
+
+
+TagKey = tuple[str, Hashable]
+
+
+@dataclass
+class TradeAggregates:
+    """
+    Totals over all fills, broken down by instrument and by tag.
+    A fill tagged `{"level": 1, "side": "bid"}` counts in `by_tag[("level", 1)]`
+    and in `by_tag[("side", "bid")]`. Tags with unhashable values are not broken down.
+    """
+
+    total: Aggregate = field(default_factory=Aggregate)
+    by_instrument: dict[Optional[str], Aggregate] = field(default_factory=dict)
+    by_tag: dict[TagKey, Aggregate] = field(default_factory=dict)
+
+    def add(self, transaction: Transaction):
+        self.total.add(transaction)
+
+        by_instrument = self.by_instrument.get(transaction.instrument)
+        if by_instrument is None:
+            by_instrument = self.by_instrument[transaction.instrument] = Aggregate()
+        by_instrument.add(transaction)
+
+        if transaction.tags:
+            for key, value in transaction.tags.items():
+                if not isinstance(value, Hashable):
+                    continue
+                by_tag = self.by_tag.get((key, value))
+                if by_tag is None:
+                    by_tag = self.by_tag[(key, value)] = Aggregate()
+                by_tag.add(transaction)
+
+    def instrument(self, instrument: str) -> Aggregate:
+        return self.by_instrument.get(instrument) or Aggregate()
+
+    def tag(self, key: str, value: Any) -> Aggregate:
+        return self.by_tag.get((key, value)) or Aggregate()
@@ -0,0 +1,238 @@
+"""
+Bounded transaction history of a Trade
+
+The most recent `max_size` fills are kept in memory as compact `__slots__` records.
+Older fills are appended to a JSON Lines log (one fill per line, Decimals as
+strings so nothing is rounded) if a path is given, and dropped otherwise.
+The aggregates of the Trade are kept separately, so they stay exact after eviction.
+
+    trade = Trade(order_client, history_size=10_000, history_path="fills.jsonl")
+    for tx in trade.transactions.query(from_time=..., tag=("level", 1)):
+        ...
+"""
+
+import json
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import IO, Any, Optional, Union
+
+from strats_oanda.helper import format_datetime, loads, parse_time
+
+
+@dataclass
+class Transaction:
+    id: str
+    order_id: str
+    units: Decimal
+    price: Decimal
+    time: datetime
+    pl: Optional[Decimal] = None
+    tags: Optional[dict] = None
+    instrument: Optional[str] = None
+
+
+# a log line starts with '{"time": "2025-03-26T13:50:53.182325000Z"'
+_TIME_SLICE = slice(10, 40)
+
+
+class _Record:
+    __slots__ = ("id", "order_id", "units", "price", "time", "pl", "tags", "instrument")
+
+    def __init__(self, tx: Transaction):
+        self.id = tx.id
+        self.order_id = tx.order_id
+        self.units = tx.units
+        self.price = tx.price
+        self.time = tx.time
+        self.pl = tx.pl
+        self.tags = tx.tags
+        self.instrument = tx.instrument
+
+    def to_transaction(self) -> Transaction:
+        return Transaction(
+            id=self.id,
+            order_id=self.order_id,
+            units=self.units,
+            price=self.price,
+            time=self.time,
+            pl=self.pl,
+            tags=self.tags,
+            instrument=self.instrument,
+        )
+
+    def to_json(self) -> str:
+        # time first: its fixed-width string form sorts in time order
+        return json.dumps(
+            {
+                "time": _format_utc(self.time),
+                "id": self.id,
+                "order_id": self.order_id,
+                "units": str(self.units),
+                "price": str(self.price),
+                "pl": str(self.pl) if self.pl is not None else None,
+                "tags": self.tags,
+                "instrument": self.instrument,
+            },
+            default=str,
+        )
+
+
+def _parse_line(data: dict) -> Transaction:
+    return Transaction(
+        id=data["id"],
+        order_id=data["order_id"],
+        units=Decimal(data["units"]),
+        price=Decimal(data["price"]),
+        time=parse_time(data["time"]),
+        pl=Decimal(data["pl"]) if data["pl"] is not None else None,
+        tags=data["tags"],
+        instrument=data["instrument"],
+    )
+
+
+def _format_utc(t: datetime) -> str:
+    if t.tzinfo is not None:
+        t = t.astimezone(timezone.utc)
+    return format_datetime(t)
+
+
+class _IdSet:
+    """
+    Set of evicted transaction ids. Numeric ids (all of OANDA's) are bits of a
+    bitmap starting at the lowest one, i.e. one bit per account transaction
+    since the first eviction, whatever order they are added in.
+    """
+
+    def __init__(self):
+        self._base = 0  # id of the first bit, a multiple of 8
+        self._bits = bytearray()
+        self._others: set[str] = set()
+
+    def add(self, transaction_id: str):
+        if not transaction_id.isdigit():
+            self._others.add(transaction_id)
+            return
+        i = int(transaction_id)
+        if not self._bits:
+            self._base = i - i % 8
+        elif i < self._base:
+            base = i - i % 8
+            self._bits[:0] = bytes((self._base - base) // 8)
+            self._base = base
+        byte, bit = divmod(i - self._base, 8)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte - len(self._bits) + 1))
+        self._bits[byte] |= 1 << bit
+
+    def __contains__(self, transaction_id: str) -> bool:
+        if not transaction_id.isdigit():
+            return transaction_id in self._others
+        byte, bit = divmod(int(transaction_id) - self._base, 8)
+        return 0 <= byte < len(self._bits) and bool(self._bits[byte] >> bit & 1)
+
+
+def _match_tag(tags: Optional[dict], tag: Optional[tuple[str, Hashable]]) -> bool:
+    if tag is None:
+        return True
+    return tags is not None and tag[0] in tags and tags[tag[0]] == tag[1]
+
+
+class TransactionHistory(Mapping[str, Transaction]):
+    """
+    Mapping of transaction id to Transaction over the in-memory window.
+    `query` also reads the evicted fills from the log.
+
+    Evicted fills still count as seen (`in`), so that de-duplication keeps working
+    past the window. Their ids are kept in a bitmap, not as records.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        path: Union[str, Path, None] = None,
+    ):
+        if max_size is not None and max_size < 1:
+            raise ValueError(f"max_size must be positive: {max_size}")
+        self.max_size = max_size
+        self.path = Path(path) if path is not None else None
+        self.evicted = 0
+        self._records: OrderedDict[str, _Record] = OrderedDict()
+        self._evicted_ids = _IdSet()
+        self._file: Optional[IO[str]] = None
+
+    def __getitem__(self, transaction_id: str) -> Transaction:
+        return self._records[transaction_id].to_transaction()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, transaction_id: object) -> bool:
+        if transaction_id in self._records:
+            return True
+        return isinstance(transaction_id, str) and transaction_id in self._evicted_ids
+
+    def add(self, transaction: Transaction):
+        self._records[transaction.id] = _Record(transaction)
+        if self.max_size is not None and len(self._records) > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        assert self.max_size is not None
+        while len(self._records) > self.max_size:
+            transaction_id, record = self._records.popitem(last=False)
+            self._evicted_ids.add(transaction_id)
+            if self.path is not None:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(record.to_json() + "\n")
+            self.evicted += 1
+
+    def query(
+        self,
+        from_time: Optional[datetime] = None,
+        to_time: Optional[datetime] = None,
+        tag: Optional[tuple[str, Any]] = None,
+    ) -> Iterator[Transaction]:
+        """
+        Fills in [from_time, to_time) having `tag` (a (key, value) pair),
+        from the log then from memory, in the order they were added.
+        """
+        if self.path is not None and self.path.exists():
+            self.flush()
+            from_str = _format_utc(from_time) if from_time is not None else None
+            to_str = _format_utc(to_time) if to_time is not None else None
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    # compare the time before decoding the rest of the line
+                    t = line[_TIME_SLICE]
+                    if (from_str is not None and t < from_str) or (
+                        to_str is not None and t >= to_str
+                    ):
+                        continue
+                    data = loads(line)
+                    if _match_tag(data["tags"], tag):
+                        yield _parse_line(data)
+
+        for record in list(self._records.values()):
+            if from_time is not None and record.time < from_time:
+                continue
+            if to_time is not None and record.time >= to_time:
+                continue
+            if _match_tag(record.tags, tag):
+                yield record.to_transaction()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,15 +1,129 @@
-from prometheus_client import Counter, Gauge
+"""
+Prometheus metrics of Trades
+
+`trade_to_trade_metrics` only marks the trade as changed. The metrics are written
+at most once per `flush_interval` seconds, from the values of the trade at that
+time, so calling it on every fill or tick costs a dict assignment.
+
+    metrics = TradeMetrics()
+    start_http_server(8000, registry=metrics.registry)
+    asyncio.create_task(metrics.run())
+
+    async for tx in transaction_client.stream():
+        trade = transaction_to_trade(tx, trade)
+        trade_to_trade_metrics(trade, metrics)
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge
 
 from .trade import Trade
 
 
 class TradeMetrics:
-    def __init__(self, name: str):
-        self.total_profit = Gauge(f"{name}_total_profit", "")
-        self.net_units = Gauge(f"{name}_net_units", "")
-        self.limit_order_count = Counter(f"{name}_limit_order_count", "")
-        self.transaction_count = Counter(f"{name}_transaction_count", "")
+    """
+    Metrics labelled by trade id (and instrument / tag) on their own registry,
+    so that several TradeMetrics can coexist.
+    Tags are exported as "key=value".
+    """
+
+    def __init__(
+        self,
+        name: str = "oanda_trade",
+        registry: Optional[CollectorRegistry] = None,
+        flush_interval: float = 1.0,  # seconds
+    ):
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self.flush_interval = flush_interval
+
+        self.total_profit = Gauge(
+            f"{name}_total_profit", "Realized P&L", ["trade_id"], registry=self.registry
+        )
+        self.unrealized_profit = Gauge(
+            f"{name}_unrealized_profit",
+            "Unrealized P&L in the home currency",
+            ["trade_id", "instrument"],
+            registry=self.registry,
+        )
+        self.net_units = Gauge(
+            f"{name}_net_units", "Net units", ["trade_id", "instrument"], registry=self.registry
+        )
+        self.instrument_profit = Gauge(
+            f"{name}_instrument_profit",
+            "Realized P&L by instrument",
+            ["trade_id", "instrument"],
+            registry=self.registry,
+        )
+        self.tag_profit = Gauge(
+            f"{name}_tag_profit", "Realized P&L by tag", ["trade_id", "tag"], registry=self.registry
+        )
+        self.tag_units = Gauge(
+            f"{name}_tag_units", "Net units by tag", ["trade_id", "tag"], registry=self.registry
+        )
+        self.limit_order_count = Gauge(
+            f"{name}_limit_order_count", "Open limit orders", ["trade_id"], registry=self.registry
+        )
+        self.transaction_count = Counter(
+            f"{name}_transaction_count",
+            "Fills",
+            ["trade_id", "instrument"],
+            registry=self.registry,
+        )
+
+        self._dirty: dict[int, Trade] = {}
+        self._last_flush = 0.0
+        # fills already counted in transaction_count, by (trade id, instrument)
+        self._counted: dict[tuple[str, str], int] = {}
+
+    def mark(self, trade: Trade):
+        self._dirty[trade.id] = trade
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        dirty, self._dirty = self._dirty, {}
+        for trade in dirty.values():
+            self._export(trade)
+
+    async def run(self):
+        """
+        Flush every `flush_interval` seconds, for trades marked between two fills
+        or ticks.
+        """
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+    def _export(self, trade: Trade):
+        trade_id = str(trade.id)
+        aggregates = trade.aggregates
+        self.total_profit.labels(trade_id).set(float(aggregates.total.profit))
+        self.limit_order_count.labels(trade_id).set(len(trade.limit_orders))
+
+        for instrument, aggregate in aggregates.by_instrument.items():
+            labels = (trade_id, instrument or "")
+            self.net_units.labels(*labels).set(float(aggregate.units))
+            self.instrument_profit.labels(*labels).set(float(aggregate.profit))
+            counted = self._counted.get(labels, 0)
+            if aggregate.count > counted:
+                self.transaction_count.labels(*labels).inc(aggregate.count - counted)
+                self._counted[labels] = aggregate.count
+
+        for (key, value), aggregate in aggregates.by_tag.items():
+            tag = f"{key}={value}"
+            self.tag_profit.labels(trade_id, tag).set(float(aggregate.profit))
+            self.tag_units.labels(trade_id, tag).set(float(aggregate.units))
+
+        for instrument, position in trade.positions.items():
+            self.unrealized_profit.labels(trade_id, instrument).set(
+                float(position.unrealized_pl_home)
+            )
 
 
 def trade_to_trade_metrics(trade: Trade, metrics: TradeMetrics):
-    pass
+    metrics.mark(trade)
@@ -0,0 +1,92 @@
+"""
+Average-cost position per instrument
+
+Each fill updates the open units, the average entry price and the realized P&L
+in O(1). Each tick marks the open units to the price they could be closed at
+(bid for a long, ask for a short) in O(1), so strategies don't have to replay
+the fills to know their exposure.
+
+Amounts are in the quote currency of the instrument, and in the home currency of
+the account using the `homeConversionFactors` of the last fill of the instrument
+(gains and losses have different factors). Realized P&L here is by average cost,
+OANDA's `pl` of a fill is by FIFO trade, so the two can differ while a position is
+built up at different prices.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional, Union
+
+from strats_oanda.model import ClientPrice, HomeConversionFactors, LazyClientPrice
+
+ZERO = Decimal("0")
+ONE = Decimal("1")
+
+
+@dataclass
+class Position:
+    instrument: str
+    # signed: positive for long
+    units: Decimal = ZERO
+    average_price: Decimal = ZERO
+    realized_pl: Decimal = ZERO
+    realized_pl_home: Decimal = ZERO
+    unrealized_pl: Decimal = ZERO
+    unrealized_pl_home: Decimal = ZERO
+    # bid for a long position, ask for a short one
+    mark_price: Optional[Decimal] = None
+    gain_quote_home: Decimal = ONE
+    loss_quote_home: Decimal = ONE
+
+    def to_home(self, quote: Decimal) -> Decimal:
+        return quote * (self.gain_quote_home if quote >= 0 else self.loss_quote_home)
+
+    def fill(
+        self,
+        units: Decimal,
+        price: Decimal,
+        factors: Optional[HomeConversionFactors] = None,
+    ):
+        if factors is not None:
+            self.gain_quote_home = factors.gain_quote_home
+            self.loss_quote_home = factors.loss_quote_home
+
+        if self.units == 0 or (self.units > 0) == (units > 0):
+            # open or add: weighted average of the entry prices
+            total = abs(self.units) + abs(units)
+            self.average_price = (self.average_price * abs(self.units) + price * abs(units)) / total
+            self.units += units
+        else:
+            # reduce, close or flip
+            closed = min(abs(units), abs(self.units))
+            sign = ONE if self.units > 0 else -ONE
+            realized = (price - self.average_price) * closed * sign
+            self.realized_pl += realized
+            self.realized_pl_home += self.to_home(realized)
+            self.units += units
+            if self.units == 0:
+                self.average_price = ZERO
+                self.mark_price = None
+            elif (self.units > 0) != (sign > 0):
+                # the rest opened a position on the other side, marked on the other side
+                self.average_price = price
+                self.mark_price = None
+
+        self._mark()
+
+    def on_price(self, price: Union[ClientPrice, LazyClientPrice]):
+        if self.units == 0:
+            return
+        best = price.best_bid if self.units > 0 else price.best_ask
+        if best is None:
+            return
+        self.mark_price = best.price
+        self._mark()
+
+    def _mark(self):
+        if self.units == 0 or self.mark_price is None:
+            self.unrealized_pl = ZERO
+            self.unrealized_pl_home = ZERO
+            return
+        self.unrealized_pl = (self.mark_price - self.average_price) * self.units
+        self.unrealized_pl_home = self.to_home(self.unrealized_pl)
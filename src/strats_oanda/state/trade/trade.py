@@ -1,30 +1,32 @@
 import logging
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Union
 
 from strats_oanda.client import OrderClient
 from strats_oanda.model import (
+    ClientPrice,
+    CreateLimitOrderResponse,
+    HomeConversionFactors,
+    LazyClientPrice,
     LimitOrderRequest,
     MarketOrderRequest,
+    OrderCancelTransaction,
     OrderFillTransaction,
     OrderPositionFill,
 )
 
+from .aggregate import TradeAggregates
+from .history import Transaction, TransactionHistory
+from .position import Position
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class Transaction:
-    id: str
-    order_id: str
-    units: Decimal
-    price: Decimal
-    time: datetime
-    pl: Optional[Decimal] = None
-    tags: Optional[dict] = None
+OrderEvent = Union[OrderFillTransaction, OrderCancelTransaction]
 
 
 @dataclass
@@ -35,16 +37,40 @@ class LimitOrder:
     time: datetime
     position_fill: OrderPositionFill
     tags: Optional[dict] = None
+    instrument: Optional[str] = None
+    client_order_id: Optional[str] = None
 
 
 class Trade:
     _counter = 0
 
-    def __init__(self, order_client: OrderClient):
+    def __init__(
+        self,
+        order_client: OrderClient,
+        history_size: Optional[int] = None,
+        history_path: Union[str, Path, None] = None,
+        max_pending: int = 1000,
+    ):
         self.order_client = order_client
 
         self.limit_orders: dict[str, LimitOrder] = {}
-        self.transactions: dict[str, Transaction] = {}
+        # order id of the limit orders by client order id
+        self.client_order_ids: dict[str, str] = {}
+        # order id which opened each open OANDA trade, by trade id
+        self.trade_ids: dict[str, str] = {}
+        # Fills and cancels of orders which are not registered (yet), by order id.
+        # The transaction stream may deliver them before `create_limit_order` returns.
+        # They are applied when the order is registered; at most `max_pending`
+        # orders are kept, the oldest are dropped.
+        self.pending: OrderedDict[str, list[OrderEvent]] = OrderedDict()
+        self.max_pending = max_pending
+        # The last `history_size` fills (all if None); older ones are appended
+        # to the log at `history_path`, if given.
+        self.transactions = TransactionHistory(history_size, history_path)
+        # total / per instrument / per tag sums of `transactions`
+        self.aggregates = TradeAggregates()
+        # average-cost position per instrument, marked to market by `on_price`
+        self.positions: dict[str, Position] = {}
 
         # Trade ID
         self.id = type(self)._counter
@@ -55,6 +81,7 @@ class Trade:
 
     async def session_close(self):
         await self.order_client.close()
+        self.transactions.close()
 
     async def create_market_order(
         self,
@@ -63,6 +90,9 @@ class Trade:
     ) -> Transaction:
         result = await self.order_client.create_market_order(request)
         tx = result.order_fill_transaction
+        # the stream may have delivered the same fill already
+        self.pending.pop(tx.order_id, None)
+        self._index_fill(tx)
         transaction = Transaction(
             id=tx.id,
             order_id=tx.order_id,
@@ -71,9 +101,9 @@ class Trade:
             time=tx.time,
             pl=tx.pl,
             tags=tags,
+            instrument=tx.instrument,
         )
-        self.transactions[tx.id] = transaction
-        return transaction
+        return self._add_transaction(transaction, tx.home_conversion_factors)
 
     async def create_limit_order(
         self,
@@ -81,6 +111,37 @@ class Trade:
         tags: Optional[dict] = None,
     ) -> LimitOrder:
         result = await self.order_client.create_limit_order(request)
+        return self._add_limit_order(request, result, tags)
+
+    async def create_limit_orders(
+        self,
+        requests: list[LimitOrderRequest],
+        tags: Optional[list[Optional[dict]]] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> list[Union[LimitOrder, Exception]]:
+        """
+        Batch version of `create_limit_order`. `tags` is per request.
+        Only the orders which were created are added to `limit_orders`.
+        """
+        if tags is not None and len(tags) != len(requests):
+            raise ValueError("tags must have the same length as requests")
+        results = await self.order_client.create_limit_orders(requests, max_in_flight)
+        limit_orders: list[Union[LimitOrder, Exception]] = []
+        for i, (request, result) in enumerate(zip(requests, results)):
+            if isinstance(result, Exception):
+                limit_orders.append(result)
+            else:
+                limit_orders.append(
+                    self._add_limit_order(request, result, tags[i] if tags else None)
+                )
+        return limit_orders
+
+    def _add_limit_order(
+        self,
+        request: LimitOrderRequest,
+        result: CreateLimitOrderResponse,
+        tags: Optional[dict],
+    ) -> LimitOrder:
         tx = result.order_create_transaction
         limit_order = LimitOrder(
             id=tx.id,
@@ -89,59 +150,180 @@ class Trade:
             time=tx.time,
             position_fill=request.position_fill,
             tags=tags,
+            instrument=tx.instrument,
+            client_order_id=tx.client_extensions.id if tx.client_extensions else None,
         )
         self.limit_orders[tx.id] = limit_order
+        if limit_order.client_order_id is not None:
+            self.client_order_ids[limit_order.client_order_id] = tx.id
+        for event in self.pending.pop(tx.id, ()):
+            self._apply(event)
         return limit_order
 
     async def cancel_limit_order(self, order_id: str) -> str:
         if order_id not in self.limit_orders:
             raise ValueError(f"order_id `{order_id}` is not found")
         await self.order_client.cancel_limit_order(order_id)
-        del self.limit_orders[order_id]
+        self._remove_limit_order(order_id)
         return order_id
 
+    async def cancel_limit_orders(
+        self,
+        order_ids: list[str],
+        max_in_flight: Optional[int] = None,
+    ) -> list[Union[str, Exception]]:
+        """
+        Batch version of `cancel_limit_order`. Unknown order ids are not sent.
+        Only the orders which were cancelled are removed from `limit_orders`.
+        """
+        known = list(dict.fromkeys(i for i in order_ids if i in self.limit_orders))
+        cancelled = await self.order_client.cancel_limit_orders(known, max_in_flight)
+        errors = {
+            order_id: result
+            for order_id, result in zip(known, cancelled)
+            if isinstance(result, Exception)
+        }
+
+        results: list[Union[str, Exception]] = []
+        for order_id in order_ids:
+            if order_id in errors:
+                results.append(errors[order_id])
+            elif order_id in known:
+                # may have been filled meanwhile
+                self._remove_limit_order(order_id)
+                results.append(order_id)
+            else:
+                results.append(ValueError(f"order_id `{order_id}` is not found"))
+        return results
+
     def notify_execution(self, tx: OrderFillTransaction):
-        if tx.order_id not in self.limit_orders:
-            logger.warning(f"order_id `{tx.order_id}` is not found")
+        if tx.id in self.transactions:
+            return  # already recorded, e.g. from the market order response
+
+        order_id = self._order_id(tx.order_id, tx.client_order_id)
+        if order_id is None:
+            self._buffer(tx.order_id, tx)
             return
 
-        limit_order = self.limit_orders[tx.order_id]
+        limit_order = self.limit_orders[order_id]
         transaction = Transaction(
             id=tx.id,
-            order_id=tx.order_id,
+            order_id=order_id,
             units=tx.units,
             price=tx.full_vwap,
             time=tx.time,
             pl=tx.pl,
             tags=limit_order.tags,  # inherit the tags from limit_order
+            instrument=tx.instrument,
         )
-        self.transactions[tx.id] = transaction
+        self._add_transaction(transaction, tx.home_conversion_factors)
+        self._index_fill(tx)
 
         # Order filled completely
         if limit_order.units == tx.units:
-            del self.limit_orders[tx.order_id]
+            self._remove_limit_order(order_id)
         # Order filled partialy
         else:
             limit_order.units -= tx.units
-            self.limit_orders[tx.order_id] = limit_order
+
+    def notify_cancel(self, tx: OrderCancelTransaction):
+        order_id = self._order_id(tx.order_id, tx.client_order_id)
+        if order_id is None:
+            # not registered yet, or already removed by `cancel_limit_order`
+            self._buffer(tx.order_id, tx)
+            return
+        self._remove_limit_order(order_id)
+
+    def limit_order_by_client_id(self, client_order_id: str) -> Optional[LimitOrder]:
+        order_id = self.client_order_ids.get(client_order_id)
+        return self.limit_orders.get(order_id) if order_id is not None else None
+
+    def _order_id(self, order_id: str, client_order_id: Optional[str]) -> Optional[str]:
+        if order_id in self.limit_orders:
+            return order_id
+        if client_order_id is not None:
+            return self.client_order_ids.get(client_order_id)
+        return None
+
+    def _apply(self, event: OrderEvent):
+        if isinstance(event, OrderFillTransaction):
+            self.notify_execution(event)
+        else:
+            self.notify_cancel(event)
+
+    def _buffer(self, order_id: str, event: OrderEvent):
+        self.pending.setdefault(order_id, []).append(event)
+        while len(self.pending) > self.max_pending:
+            dropped, _ = self.pending.popitem(last=False)
+            # typically an order of another Trade on the same account
+            logger.debug(f"order_id `{dropped}` is not found, dropped its pending events")
+
+    def _remove_limit_order(self, order_id: str):
+        limit_order = self.limit_orders.pop(order_id, None)
+        if limit_order is not None and limit_order.client_order_id is not None:
+            self.client_order_ids.pop(limit_order.client_order_id, None)
+
+    def _index_fill(self, tx: OrderFillTransaction):
+        if tx.trade_opened is not None:
+            self.trade_ids[tx.trade_opened.trade_id] = tx.order_id
+        for closed in tx.trades_closed or ():
+            self.trade_ids.pop(closed.trade_id, None)
+
+    def _add_transaction(
+        self,
+        transaction: Transaction,
+        factors: Optional[HomeConversionFactors] = None,
+    ) -> Transaction:
+        if transaction.id in self.transactions:
+            # the same fill must not be counted twice
+            return self.transactions.get(transaction.id, transaction)
+        self.transactions.add(transaction)
+        self.aggregates.add(transaction)
+        if transaction.instrument is not None:
+            self.position(transaction.instrument).fill(
+                transaction.units, transaction.price, factors
+            )
+        return transaction
+
+    def position(self, instrument: str) -> Position:
+        position = self.positions.get(instrument)
+        if position is None:
+            position = self.positions[instrument] = Position(instrument)
+        return position
+
+    def on_price(self, price: Union[ClientPrice, LazyClientPrice]):
+        """
+        Mark the position of the instrument of `price` to market.
+        """
+        position = self.positions.get(price.instrument or "")
+        if position is not None:
+            position.on_price(price)
+
+    @property
+    def unrealized_pl(self) -> Decimal:
+        """
+        Unrealized P&L of all positions in the home currency.
+        """
+        return sum((p.unrealized_pl_home for p in self.positions.values()), Decimal("0"))
 
     @property
     def total_profit(self) -> Decimal:
-        total = Decimal("0")
-        for transaction in self.transactions.values():
-            if transaction.pl is not None:
-                total += transaction.pl
-        return total
+        return self.aggregates.total.profit
 
     @property
     def net_units(self) -> Decimal:
-        total = Decimal("0")
-        for transaction in self.transactions.values():
-            total += transaction.units
-        return total
+        return self.aggregates.total.units
+
+    def profit_by_instrument(self) -> dict[Optional[str], Decimal]:
+        return {k: v.profit for k, v in self.aggregates.by_instrument.items()}
+
+    def net_units_by_instrument(self) -> dict[Optional[str], Decimal]:
+        return {k: v.units for k, v in self.aggregates.by_instrument.items()}
 
 
 def transaction_to_trade(tx, trade):
     if isinstance(tx, OrderFillTransaction):
         trade.notify_execution(tx)
+    elif isinstance(tx, OrderCancelTransaction):
+        trade.notify_cancel(tx)
     return trade
@@ -0,0 +1,614 @@
+"""
+Local OANDA v20 stand-in server for tests and load tests.
+
+Serves the subset of the v20 REST / streaming API used by the clients:
+
+    GET  /v3/accounts/{account}/pricing/stream
+    GET  /v3/accounts/{account}/transactions/stream
+    GET  /v3/accounts/{account}/transactions/sinceid
+    GET  /v3/accounts/{account}/transactions/idrange
+    POST /v3/accounts/{account}/orders
+    PUT  /v3/accounts/{account}/orders/{order_id}/cancel
+    GET  /v3/instruments/{instrument}/candles
+
+Usage:
+
+    async with FakeOANDAServer(tick_rate=1000) as server:
+        server.basic_config()
+        async for price in PricingStreamClient(["USD_JPY"]).stream():
+            ...
+"""
+
+import asyncio
+import json
+import logging
+import random
+import socket
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+from aiohttp import web
+
+from strats_oanda.config import basic_config
+from strats_oanda.helper import format_datetime, parse_time
+from strats_oanda.model.instrument import GRANULARITY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICES = {
+    "USD_JPY": Decimal("150.000"),
+    "EUR_USD": Decimal("1.08000"),
+    "EUR_JPY": Decimal("162.000"),
+    "GBP_USD": Decimal("1.27000"),
+}
+
+
+def _now() -> str:
+    return format_datetime(datetime.now(timezone.utc))
+
+
+class FakeOANDAServer:
+    """
+    aiohttp based stand-in of the OANDA v20 API.
+
+    Args:
+        tick_rate: price ticks per second on each pricing stream (0 = as fast as possible)
+        latency: seconds added before every REST response
+        heartbeat_interval: seconds between heartbeats on the streams
+        disconnect_after: abort each stream connection after this many messages
+        stall_after: stop writing to each stream connection after this many messages,
+            keeping it open like a half-open TCP connection
+        max_ticks: end each pricing stream gracefully after this many ticks
+        fill_limit_orders: fill limit orders `fill_delay` seconds after creation
+        fill_delay: seconds until a limit order is filled
+        reject_rate: probability that an order request is rejected with 400
+
+    Set `fail_next` to answer the next REST requests with `fail_status` (e.g. 503)
+    to test retries.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        account: str = "001-001-0000000-001",
+        token: str = "fake-token",
+        tick_rate: float = 10.0,
+        latency: float = 0.0,
+        heartbeat_interval: float = 5.0,
+        disconnect_after: Optional[int] = None,
+        stall_after: Optional[int] = None,
+        max_ticks: Optional[int] = None,
+        fill_limit_orders: bool = False,
+        fill_delay: float = 0.0,
+        reject_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.account = account
+        self.token = token
+        self.tick_rate = tick_rate
+        self.latency = latency
+        self.heartbeat_interval = heartbeat_interval
+        self.disconnect_after = disconnect_after
+        self.stall_after = stall_after
+        self.max_ticks = max_ticks
+        self.fill_limit_orders = fill_limit_orders
+        self.fill_delay = fill_delay
+        self.reject_rate = reject_rate
+
+        self.random = random.Random(seed)
+        self.prices: dict[str, Decimal] = dict(DEFAULT_PRICES)
+        self.last_transaction_id = 0
+        self.transactions: list[dict] = []
+        self.pending_orders: dict[str, dict] = {}
+        self.request_count = 0
+        self.fail_next = 0
+        self.fail_status = 503
+        # maximum number of transactions in a sinceid / idrange response
+        self.transaction_page_size = 1000
+
+        self._transaction_queues: list[asyncio.Queue] = []
+        self._fill_tasks: set[asyncio.Task] = set()
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        prefix = "/v3/accounts/{account}"
+        self.app.add_routes(
+            [
+                web.get(f"{prefix}/pricing/stream", self.handle_pricing_stream),
+                web.get(f"{prefix}/transactions/stream", self.handle_transaction_stream),
+                web.get(f"{prefix}/transactions/sinceid", self.handle_transactions_since_id),
+                web.get(f"{prefix}/transactions/idrange", self.handle_transactions_id_range),
+                web.get(f"{prefix}/summary", self.handle_account_summary),
+                web.post(f"{prefix}/orders", self.handle_create_order),
+                web.put(f"{prefix}/orders/{{order_id}}/cancel", self.handle_cancel_order),
+                web.get("/v3/instruments/{instrument}/candles", self.handle_get_candles),
+            ]
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        # streaming handlers never finish by themselves, so don't wait for them on stop
+        self._runner = web.AppRunner(self.app, handle_signals=False, shutdown_timeout=0.1)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock).start()
+        logger.info(f"FakeOANDAServer started: {self.url}")
+
+    async def stop(self):
+        for task in self._fill_tasks:
+            task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        logger.info("FakeOANDAServer stopped")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    def basic_config(self):
+        """
+        Point the global strats_oanda config to this server.
+        """
+        basic_config(
+            rest_url=self.url,
+            streaming_url=self.url,
+            account=self.account,
+            token=self.token,
+            force=True,
+        )
+
+    # Pricing
+
+    def next_price(self, instrument: str) -> dict:
+        mid = self.prices.get(instrument, Decimal("100.000"))
+        pip = Decimal("0.001") if mid > 10 else Decimal("0.00001")
+        mid += pip * self.random.randint(-2, 2)
+        self.prices[instrument] = mid
+        half_spread = pip * 2
+        return {
+            "type": "PRICE",
+            "time": _now(),
+            "bids": [
+                {"price": str(mid - half_spread), "liquidity": 250000},
+                {"price": str(mid - half_spread - pip), "liquidity": 1000000},
+            ],
+            "asks": [
+                {"price": str(mid + half_spread), "liquidity": 250000},
+                {"price": str(mid + half_spread + pip), "liquidity": 1000000},
+            ],
+            "closeoutBid": str(mid - half_spread * 2),
+            "closeoutAsk": str(mid + half_spread * 2),
+            "status": "tradeable",
+            "tradeable": True,
+            "instrument": instrument,
+        }
+
+    async def handle_pricing_stream(self, request: web.Request) -> web.StreamResponse:
+        if (error := self._authorize(request)) is not None:
+            return error
+        instruments = request.query.get("instruments", "").split(",")
+        resp = await self._prepare_stream(request)
+
+        loop = asyncio.get_running_loop()
+        start = last_heartbeat = loop.time()
+        sent = 0
+        messages = 0
+        while self.max_ticks is None or sent < self.max_ticks:
+            now = loop.time()
+            if self.tick_rate > 0:
+                due = int((now - start) * self.tick_rate) + 1 - sent
+            else:
+                due = 100
+            if self.max_ticks is not None:
+                due = min(due, self.max_ticks - sent)
+
+            lines = []
+            for _ in range(max(due, 0)):
+                lines.append(self.next_price(instruments[sent % len(instruments)]))
+                sent += 1
+            if now - last_heartbeat >= self.heartbeat_interval:
+                lines.append({"type": "HEARTBEAT", "time": _now()})
+                last_heartbeat = now
+
+            if lines:
+                if self._should_stall(messages):
+                    await self._stall(request)
+                    return resp
+                # disconnect / stall after exactly that many messages, even within a batch
+                for limit in (self.disconnect_after, self.stall_after):
+                    if limit is not None:
+                        lines = lines[: limit - messages]
+                messages += len(lines)
+                try:
+                    await resp.write(b"".join(json.dumps(x).encode() + b"\n" for x in lines))
+                except ConnectionResetError:
+                    return resp  # client went away
+                if self._should_disconnect(messages, request):
+                    return resp
+
+            if self.tick_rate > 0:
+                await asyncio.sleep(min(1 / self.tick_rate, self.heartbeat_interval))
+            else:
+                await asyncio.sleep(0)
+
+        await resp.write_eof()
+        return resp
+
+    # Transactions
+
+    async def handle_transaction_stream(self, request: web.Request) -> web.StreamResponse:
+        if (error := self._authorize(request)) is not None:
+            return error
+        resp = await self._prepare_stream(request)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._transaction_queues.append(queue)
+        messages = 0
+        try:
+            while True:
+                if self._should_disconnect(messages, request):
+                    return resp
+                try:
+                    tx = await asyncio.wait_for(queue.get(), self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    tx = {
+                        "type": "HEARTBEAT",
+                        "lastTransactionID": str(self.last_transaction_id),
+                        "time": _now(),
+                    }
+                if self._should_stall(messages):
+                    await self._stall(request)
+                    return resp
+                messages += 1
+                try:
+                    await resp.write(json.dumps(tx).encode() + b"\n")
+                except ConnectionResetError:
+                    return resp  # client went away
+        finally:
+            self._transaction_queues.remove(queue)
+
+    def add_transaction(self, tx: dict) -> dict:
+        self.last_transaction_id += 1
+        tx = {
+            "id": str(self.last_transaction_id),
+            "time": _now(),
+            "userID": 1,
+            "accountID": self.account,
+            "batchID": tx.pop("batchID", str(self.last_transaction_id)),
+            "requestID": str(self.random.getrandbits(60)),
+            **tx,
+        }
+        self.transactions.append(tx)
+        for queue in self._transaction_queues:
+            queue.put_nowait(tx)
+        return tx
+
+    async def handle_transactions_since_id(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        since = int(request.query["id"])
+        return self._transactions_response(since + 1, since + self.transaction_page_size)
+
+    async def handle_transactions_id_range(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        from_id, to_id = int(request.query["from"]), int(request.query["to"])
+        to_id = min(to_id, from_id + self.transaction_page_size - 1)
+        return self._transactions_response(from_id, to_id)
+
+    def _transactions_response(self, from_id: int, to_id: int) -> web.Response:
+        # transaction IDs are 1, 2, ... in the order of `self.transactions`
+        return web.json_response(
+            {
+                "transactions": self.transactions[max(from_id, 1) - 1 : max(to_id, 0)],
+                "lastTransactionID": str(self.last_transaction_id),
+            }
+        )
+
+    # Account
+
+    async def handle_account_summary(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        return web.json_response(
+            {
+                "account": {
+                    "id": self.account,
+                    "currency": "JPY",
+                    "openTradeCount": 0,
+                    "pendingOrderCount": len(self.pending_orders),
+                    "lastTransactionID": str(self.last_transaction_id),
+                },
+                "lastTransactionID": str(self.last_transaction_id),
+            }
+        )
+
+    # Orders
+
+    async def handle_create_order(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        order = (await request.json())["order"]
+        if self.random.random() < self.reject_rate:
+            return web.json_response({"errorMessage": "rejected by FakeOANDAServer"}, status=400)
+
+        order_type = order.get("type")
+        if order_type == "MARKET":
+            create_tx = self.add_transaction(
+                {
+                    "type": "MARKET_ORDER",
+                    "instrument": order["instrument"],
+                    "units": order["units"],
+                    "timeInForce": order.get("timeInForce", "FOK"),
+                    "positionFill": order.get("positionFill", "DEFAULT"),
+                    "reason": "CLIENT_ORDER",
+                    **self._client_extensions(order),
+                }
+            )
+            fill_tx = self._fill(create_tx, "MARKET_ORDER")
+            return web.json_response(
+                {
+                    "orderCreateTransaction": create_tx,
+                    "orderFillTransaction": fill_tx,
+                    "relatedTransactionIDs": [create_tx["id"], fill_tx["id"]],
+                    "lastTransactionID": fill_tx["id"],
+                },
+                status=201,
+            )
+
+        if order_type == "LIMIT":
+            create_tx = self.add_transaction(
+                {
+                    "type": "LIMIT_ORDER",
+                    "instrument": order["instrument"],
+                    "units": order["units"],
+                    "price": order["price"],
+                    "timeInForce": order.get("timeInForce", "GTC"),
+                    "positionFill": order.get("positionFill", "DEFAULT"),
+                    "triggerCondition": order.get("triggerCondition", "DEFAULT"),
+                    "reason": "CLIENT_ORDER",
+                    **self._client_extensions(order),
+                }
+            )
+            self.pending_orders[create_tx["id"]] = create_tx
+            if self.fill_limit_orders:
+                task = asyncio.create_task(self._fill_later(create_tx))
+                self._fill_tasks.add(task)
+                task.add_done_callback(self._fill_tasks.discard)
+            return web.json_response(
+                {
+                    "orderCreateTransaction": create_tx,
+                    "relatedTransactionIDs": [create_tx["id"]],
+                    "lastTransactionID": create_tx["id"],
+                },
+                status=201,
+            )
+
+        return web.json_response(
+            {"errorMessage": f"order type is not supported: {order_type}"}, status=400
+        )
+
+    async def handle_cancel_order(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        order_id = request.match_info["order_id"]
+        if order_id not in self.pending_orders:
+            return web.json_response(
+                {"errorCode": "ORDER_DOESNT_EXIST", "errorMessage": "The order does not exist"},
+                status=404,
+            )
+
+        order = self.pending_orders.pop(order_id)
+        cancel_tx = self.add_transaction(
+            {
+                "type": "ORDER_CANCEL",
+                "orderID": order_id,
+                "reason": "CLIENT_REQUEST",
+                **self._client_order_id_field(order),
+            }
+        )
+        return web.json_response(
+            {
+                "orderCancelTransaction": cancel_tx,
+                "relatedTransactionIDs": [cancel_tx["id"]],
+                "lastTransactionID": cancel_tx["id"],
+            },
+            status=200,
+        )
+
+    async def _fill_later(self, order: dict):
+        await asyncio.sleep(self.fill_delay)
+        if self.pending_orders.pop(order["id"], None) is not None:
+            self._fill(order, "LIMIT_ORDER")
+
+    def _fill(self, order: dict, reason: str) -> dict:
+        instrument = order["instrument"]
+        price = self.next_price(instrument)
+        units = Decimal(order["units"])
+        vwap = price["asks"][0]["price"] if units > 0 else price["bids"][0]["price"]
+        if "price" in order:
+            vwap = order["price"]
+        fill = {
+            "type": "ORDER_FILL",
+            "batchID": order["batchID"],
+            "orderID": order["id"],
+            "instrument": instrument,
+            "units": order["units"],
+            "requestedUnits": order["units"],
+            "price": vwap,
+            "fullVWAP": vwap,
+            "fullPrice": {
+                "bids": price["bids"][:1],
+                "asks": price["asks"][:1],
+                "closeoutBid": price["closeoutBid"],
+                "closeoutAsk": price["closeoutAsk"],
+                "timestamp": price["time"],
+            },
+            "reason": reason,
+            "pl": "0.0000",
+            "quotePL": "0",
+            "financing": "0.0000",
+            "baseFinancing": "0",
+            "commission": "0.0000",
+            "guaranteedExecutionFee": "0.0000",
+            "quoteGuaranteedExecutionFee": "0",
+            "accountBalance": "3000000.0000",
+            "halfSpreadCost": "0.0020",
+            "gainQuoteHomeConversionFactor": "1",
+            "lossQuoteHomeConversionFactor": "1",
+            "homeConversionFactors": {
+                "gainQuoteHome": {"factor": "1"},
+                "lossQuoteHome": {"factor": "1"},
+                "gainBaseHome": {"factor": price["bids"][0]["price"]},
+                "lossBaseHome": {"factor": price["asks"][0]["price"]},
+            },
+            "tradeOpened": {
+                "tradeID": str(self.last_transaction_id + 1),
+                "units": order["units"],
+                "price": vwap,
+                "guaranteedExecutionFee": "0.0000",
+                "quoteGuaranteedExecutionFee": "0",
+                "halfSpreadCost": "0.0020",
+                "initialMarginRequired": "6.0000",
+            },
+        }
+        if (client_order_id := self._client_order_id(order)) is not None:
+            fill["clientOrderID"] = client_order_id
+        return self.add_transaction(fill)
+
+    @staticmethod
+    def _client_order_id(order: dict) -> Optional[str]:
+        return order.get("clientExtensions", {}).get("id")
+
+    def _client_order_id_field(self, order: dict) -> dict:
+        client_order_id = self._client_order_id(order)
+        return {"clientOrderID": client_order_id} if client_order_id is not None else {}
+
+    @staticmethod
+    def _client_extensions(order: dict) -> dict:
+        if "clientExtensions" not in order:
+            return {}
+        return {"clientExtensions": order["clientExtensions"]}
+
+    # Instruments
+
+    async def handle_get_candles(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        instrument = request.match_info["instrument"]
+        granularity = request.query.get("granularity", "S5")
+        components = request.query.get("price", "M")
+        if granularity not in GRANULARITY_SECONDS:
+            return web.json_response(
+                {"errorMessage": f"Invalid value specified for 'granularity': {granularity}"},
+                status=400,
+            )
+        step = timedelta(seconds=GRANULARITY_SECONDS[granularity])
+        now = datetime.now(timezone.utc)
+
+        count = int(request.query["count"]) if "count" in request.query else None
+        from_time = parse_time(request.query["from"]) if "from" in request.query else None
+        to_time = parse_time(request.query["to"]) if "to" in request.query else None
+        if from_time is None:
+            from_time = (to_time or now) - step * (count or 500)
+        if to_time is None:
+            to_time = from_time + step * (count or 500)
+        to_time = min(to_time, now)
+        if count is not None and "from" in request.query and "to" in request.query:
+            return web.json_response(
+                {"errorMessage": "'count' cannot be specified with 'from' and 'to'"}, status=400
+            )
+
+        epoch = int(from_time.timestamp()) // int(step.total_seconds())
+        t = datetime.fromtimestamp(epoch * step.total_seconds(), tz=timezone.utc)
+        if t < from_time:
+            t += step
+        candles: list[dict] = []
+        while t < to_time and len(candles) < (count or 5000):
+            candles.append(self._candle(t, step, now, components))
+            t += step
+
+        return web.json_response(
+            {"instrument": instrument, "granularity": granularity, "candles": candles}
+        )
+
+    def _candle(self, t: datetime, step: timedelta, now: datetime, components: str) -> dict:
+        # deterministic prices per candle time, so repeated requests return the same data
+        rnd = random.Random(int(t.timestamp()))
+        mid = Decimal("150.000") + Decimal(rnd.randint(-1000, 1000)) / 1000
+        ohlc = {
+            "o": str(mid),
+            "h": str(mid + Decimal("0.050")),
+            "l": str(mid - Decimal("0.050")),
+            "c": str(mid + Decimal(rnd.randint(-50, 50)) / 1000),
+        }
+        candle: dict = {
+            "complete": t + step <= now,
+            "volume": rnd.randint(1, 100),
+            "time": format_datetime(t),
+        }
+        for c, key in (("B", "bid"), ("A", "ask"), ("M", "mid")):
+            if c in components:
+                candle[key] = ohlc
+        return candle
+
+    # Helpers
+
+    def _authorize(self, request: web.Request) -> Optional[web.Response]:
+        self.request_count += 1
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            return web.json_response({"errorMessage": "Insufficient authorization"}, status=401)
+        return None
+
+    async def _before_response(self, request: web.Request) -> Optional[web.Response]:
+        if (error := self._authorize(request)) is not None:
+            return error
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            return web.json_response(
+                {"errorMessage": "failed by FakeOANDAServer"}, status=self.fail_status
+            )
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return None
+
+    async def _prepare_stream(self, request: web.Request) -> web.StreamResponse:
+        resp = web.StreamResponse(status=200, headers={"Content-Type": "application/octet-stream"})
+        await resp.prepare(request)
+        return resp
+
+    def _should_stall(self, sent: int) -> bool:
+        return self.stall_after is not None and sent >= self.stall_after
+
+    async def _stall(self, request: web.Request):
+        # write nothing until the client gives up on the connection
+        while request.transport is not None and not request.transport.is_closing():
+            await asyncio.sleep(0.01)
+
+    def _should_disconnect(self, sent: int, request: web.Request) -> bool:
+        if self.disconnect_after is None or sent < self.disconnect_after:
+            return False
+        if request.transport is not None:
+            request.transport.close()
+        return True
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from strats_oanda.client.conflation import ConflatingQueue
+
+from .test_pricing_hub import FakePricingHub, make_price
+
+
+@pytest.mark.asyncio
+async def test_conflating_queue():
+    queue = ConflatingQueue()
+    queue.put_nowait(make_price("USD_JPY", "150.000"))
+    queue.put_nowait(make_price("EUR_USD", "1.080"))
+    queue.put_nowait(make_price("USD_JPY", "150.001"))
+    queue.put_nowait(make_price("USD_JPY", "150.002"))
+
+    assert queue.qsize() == 2
+    assert queue.dropped == {"USD_JPY": 2}
+
+    # instruments are delivered in the order they became pending, with the newest price
+    first = await queue.get()
+    second = await queue.get()
+    assert (first.instrument, str(first.bids[0].price)) == ("USD_JPY", "150.002")
+    assert (second.instrument, str(second.bids[0].price)) == ("EUR_USD", "1.080")
+
+    queue.close()
+    assert await queue.get() is None
+
+
+@pytest.mark.asyncio
+async def test_pricing_hub_conflating_subscription():
+    hub = FakePricingHub([make_price("USD_JPY", str(150 + i)) for i in range(5)])
+    sub = hub.subscribe(["USD_JPY"], conflate=True)
+    await asyncio.sleep(0.01)
+
+    assert sub.dropped_by_instrument == {"USD_JPY": 4}
+    await hub.close()
+    assert [str(p.bids[0].price) for p in [p async for p in sub.stream()]] == ["154"]
@@ -0,0 +1,64 @@
+from prometheus_client import CollectorRegistry
+
+from strats_oanda.client import PrometheusStreamHealthExporter, StreamHealth
+
+
+def test_stream_health_jitter():
+    health = StreamHealth(heartbeat_interval=5.0)
+    health.on_heartbeat(0)
+    health.on_heartbeat(5_200_000_000)
+    health.on_heartbeat(10_100_000_000)
+
+    assert health.heartbeats == 3
+    assert health.last_message_ns == 10_100_000_000
+    assert round(health.jitter, 6) == 0.1
+    assert round(health.max_jitter, 6) == 0.2
+    assert round(health.mean_jitter, 6) == 0.15
+
+    # intervals don't span reconnections
+    health.on_connect()
+    health.on_heartbeat(30_000_000_000)
+    assert round(health.jitter, 6) == 0.1
+
+
+def test_stream_health_idle():
+    health = StreamHealth()
+    health.on_message(health.resumed_ns - 1_000_000_000)
+    assert health.idle < 1
+
+    # the time the consumer holds a message is not idle time
+    health.on_deliver()
+    assert health.idle == 0
+    health.on_resume()
+    assert 0 <= health.idle < 1
+
+
+def test_prometheus_stream_health_exporter():
+    exporter = PrometheusStreamHealthExporter("test_stream")
+    registry = exporter.registry
+    # on its own registry by default
+    PrometheusStreamHealthExporter("test_stream")
+    health = StreamHealth()
+    exporter.add("pricing", health)
+
+    assert registry.get_sample_value("test_stream_heartbeats_total", {"stream": "pricing"}) == 0
+    assert (
+        registry.get_sample_value("test_stream_seconds_since_last_message", {"stream": "pricing"})
+        is None
+    )
+
+    health.on_message(health.resumed_ns)
+    health.stalls += 1
+    assert (
+        registry.get_sample_value("test_stream_seconds_since_last_message", {"stream": "pricing"})
+        >= 0
+    )
+    assert registry.get_sample_value("test_stream_stalls_total", {"stream": "pricing"}) == 1
+
+
+def test_prometheus_stream_health_exporter_on_given_registry():
+    registry = CollectorRegistry()
+    exporter = PrometheusStreamHealthExporter("test_stream", registry=registry)
+    exporter.add("pricing", StreamHealth())
+    assert exporter.registry is registry
+    assert registry.get_sample_value("test_stream_stalls_total", {"stream": "pricing"}) == 0
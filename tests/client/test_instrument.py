@@ -0,0 +1,169 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from strats_oanda.client import (
+    CandleStore,
+    GetCandlesQueryParams,
+    InstrumentClient,
+    Priority,
+    RequestScheduler,
+)
+from strats_oanda.client.instrument import to_query
+from strats_oanda.model import CandlestickGranularity, WeeklyAlignment
+
+
+@pytest.mark.asyncio
+async def test_get_candles_range(oanda_server):
+    from_time = datetime(2025, 3, 3, tzinfo=timezone.utc)
+    to_time = from_time + timedelta(minutes=12_000)
+
+    async with InstrumentClient(max_concurrency=2) as client:
+        result = await client.get_candles_range(
+            "USD_JPY",
+            from_time,
+            to_time,
+            granularity=CandlestickGranularity.M1,
+        )
+
+    # 12000 candles need 3 pages of 5000 candles
+    assert oanda_server.request_count == 3
+    assert len(result.candles) == 12_000
+    assert result.candles[0].time == from_time
+    assert result.candles[-1].time == to_time - timedelta(minutes=1)
+    assert all(a.time < b.time for a, b in zip(result.candles, result.candles[1:]))
+
+
+@pytest.mark.asyncio
+async def test_get_candles_range_with_cache(oanda_server, tmp_path):
+    cache = CandleStore(tmp_path / "candles.sqlite")
+    from_time = datetime(2025, 3, 3, tzinfo=timezone.utc)
+
+    async with InstrumentClient(cache=cache) as client:
+        first = await client.get_candles_range("USD_JPY", from_time, from_time + timedelta(hours=2))
+        assert oanda_server.request_count == 1
+
+        # fully cached
+        again = await client.get_candles_range("USD_JPY", from_time, from_time + timedelta(hours=1))
+        assert oanda_server.request_count == 1
+        assert again.candles == first.candles[:60]
+
+        # only the gap after the cached range is fetched
+        more = await client.get_candles_range("USD_JPY", from_time, from_time + timedelta(hours=3))
+        assert oanda_server.request_count == 2
+        assert more.candles[:120] == first.candles
+        assert len(more.candles) == 180
+
+    assert cache.covered_ranges(("USD_JPY", "M1", "M")) == [
+        (from_time, from_time + timedelta(hours=3))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_candles_range_with_cache_keeps_smoothed_candles_apart(oanda_server):
+    cache = CandleStore()
+    from_time = datetime(2025, 3, 3, tzinfo=timezone.utc)
+    to_time = from_time + timedelta(hours=1)
+
+    async with InstrumentClient(cache=cache) as client:
+        await client.get_candles_range("USD_JPY", from_time, to_time)
+        assert oanda_server.request_count == 1
+
+        # not served from the regular candles
+        smooth = GetCandlesQueryParams(smooth=True)
+        await client.get_candles_range("USD_JPY", from_time, to_time, params=smooth)
+        assert oanda_server.request_count == 2
+        await client.get_candles_range("USD_JPY", from_time, to_time, params=smooth)
+        assert oanda_server.request_count == 2
+
+    assert cache.covered_ranges(("USD_JPY", "M1+smooth", "M")) == [(from_time, to_time)]
+
+
+@pytest.mark.asyncio
+async def test_get_candles_range_with_cache_refetches_incomplete_candle(oanda_server):
+    cache = CandleStore()
+    now = datetime.now(timezone.utc)
+    from_time = now - timedelta(minutes=10)
+
+    async with InstrumentClient(cache=cache) as client:
+        first = await client.get_candles_range("USD_JPY", from_time, now + timedelta(minutes=5))
+        assert first.candles[-1].complete is False
+
+        await client.get_candles_range("USD_JPY", from_time, now + timedelta(minutes=5))
+        assert oanda_server.request_count == 2
+
+    (covered,) = cache.covered_ranges(("USD_JPY", "M1", "M"))
+    assert covered[1] == first.candles[-1].time
+
+
+@pytest.mark.asyncio
+async def test_get_candle_arrays(oanda_server):
+    pytest.importorskip("numpy")
+    from_time = datetime(2025, 3, 3, tzinfo=timezone.utc)
+    to_time = from_time + timedelta(hours=1)
+
+    async with InstrumentClient() as client:
+        candles = await client.get_candles_range("USD_JPY", from_time, to_time)
+        arrays = await client.get_candle_arrays("USD_JPY", from_time, to_time)
+
+    assert len(arrays) == 60
+    assert arrays.mid is not None
+    assert arrays.mid.o.tolist() == [float(x.mid.o) for x in candles.candles if x.mid]
+
+
+@pytest.mark.asyncio
+async def test_get_candles_is_rate_limited(oanda_server):
+    scheduler = RequestScheduler()
+    client = InstrumentClient(scheduler=scheduler)
+    # blocking: run it off the event loop serving the fake server
+    result = await asyncio.to_thread(client.get_candles, "USD_JPY", GetCandlesQueryParams(count=10))
+    assert result is not None
+    assert len(result.candles) == 10
+    assert scheduler.stats[Priority.HISTORY].count == 1
+
+
+def test_get_candles_query_params():
+    params = GetCandlesQueryParams(
+        granularity=CandlestickGranularity.D,
+        price="BAM",
+        daily_alignment=0,
+        alignment_timezone="UTC",
+        weekly_alignment=WeeklyAlignment.MONDAY,
+    )
+    assert to_query(params) == {
+        "granularity": "D",
+        "price": "BAM",
+        "dailyAlignment": "0",
+        "alignmentTimezone": "UTC",
+        "weeklyAlignment": "Monday",
+    }
+    assert params.alignment_key == "D@0/UTC/Monday"
+    # daily alignment 0 is not OANDA's default
+    params = GetCandlesQueryParams(granularity=CandlestickGranularity.D, alignment_timezone="UTC")
+    assert params.alignment_key == "D@/UTC/"
+
+    with pytest.raises(ValueError):
+        GetCandlesQueryParams(price="MX")
+    with pytest.raises(ValueError):
+        GetCandlesQueryParams(price="MM")
+
+
+@pytest.mark.asyncio
+async def test_get_candles_multi(oanda_server):
+    from_time = datetime(2025, 3, 3, tzinfo=timezone.utc)
+    to_time = from_time + timedelta(days=2)
+
+    async with InstrumentClient() as client:
+        got = await client.get_candles_multi(
+            "USD_JPY",
+            from_time,
+            to_time,
+            [CandlestickGranularity.H1, CandlestickGranularity.H4, CandlestickGranularity.D],
+            price="BAM",
+        )
+
+    assert [len(x.candles) for x in got.values()] == [48, 12, 2]
+    h4 = got[CandlestickGranularity.H4].candles
+    assert h4[1].time - h4[0].time == timedelta(hours=4)
+    assert all(x.bid and x.ask and x.mid for x in h4)
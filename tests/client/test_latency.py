@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import pytest
+
+from strats_oanda.client import OrderClient, PrometheusLatencyExporter, RequestTimings
+from strats_oanda.model import MarketOrderRequest
+
+REQUEST = MarketOrderRequest(instrument="USD_JPY", units=Decimal("1"))
+
+
+@pytest.mark.asyncio
+async def test_request_timings(oanda_server):
+    timings: list[RequestTimings] = []
+    async with OrderClient() as client:
+        client.add_latency_hook(timings.append)
+        await client.create_market_order(REQUEST)
+        await client.create_market_order(REQUEST)
+
+    first, second = timings
+    assert first.endpoint == "create_market_order"
+    assert first.status == 201
+    assert first.attempts == 1
+    assert not first.reused_connection
+    assert first.connect > 0
+    assert second.reused_connection
+    assert second.connect == 0
+    for t in timings:
+        assert t.encode > 0 and t.ttfb > 0 and t.body > 0 and t.parse > 0
+        stages = t.encode + t.queue + t.connect + t.ttfb + t.body + t.parse
+        assert stages <= t.total
+
+
+@pytest.mark.asyncio
+async def test_prometheus_latency_exporter(oanda_server):
+    exporter = PrometheusLatencyExporter("test_order")
+    # on its own registry by default
+    registry = exporter.registry
+    PrometheusLatencyExporter("test_order")
+    async with OrderClient() as client:
+        client.add_latency_hook(exporter)
+        await client.create_market_order(REQUEST)
+        with pytest.raises(RuntimeError):
+            await client.cancel_limit_order("unknown")
+
+    def sample(name: str, **labels) -> float:
+        value = registry.get_sample_value(name, labels)
+        assert value is not None
+        return value
+
+    count = "test_order_latency_seconds_count"
+    assert sample(count, endpoint="create_market_order", stage="ttfb") == 1
+    assert sample(count, endpoint="create_market_order", stage="total") == 1
+    assert sample("test_order_errors_total", endpoint="cancel_order") == 1
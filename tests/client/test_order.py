@@ -3,11 +3,12 @@ from decimal import Decimal
 
 # from dataclasses import asdict
 # from pprint import pprint
+import aiohttp
 import pytest
 
 import strats_oanda
-from strats_oanda.client import OrderClient
-from strats_oanda.model import MarketOrderRequest, OrderPositionFill
+from strats_oanda.client import OrderClient, OrderTemplate
+from strats_oanda.model import LimitOrderRequest, MarketOrderRequest, OrderPositionFill
 
 INSTRUMENT = "USD_JPY"
 UNITS = Decimal("1")
@@ -46,3 +47,113 @@ async def test_order_client():
         )
         # print("# EXIT")
         # pprint(asdict(result))
+
+
+@pytest.mark.asyncio
+async def test_order_client_with_fake_server(oanda_server):
+    async with OrderClient() as client:
+        result = await client.create_market_order(
+            MarketOrderRequest(
+                instrument=INSTRUMENT,
+                units=UNITS,
+            )
+        )
+        assert result.order_create_transaction.instrument == INSTRUMENT
+        assert result.order_create_transaction.type == "MARKET_ORDER"
+        assert result.order_fill_transaction.units == UNITS
+
+        limit = await client.create_limit_order(
+            LimitOrderRequest(
+                instrument=INSTRUMENT,
+                units=UNITS,
+                price=Decimal("140.000"),
+            )
+        )
+        order_id = limit.order_create_transaction.id
+        assert order_id in oanda_server.pending_orders
+
+        cancel = await client.cancel_limit_order(order_id)
+        assert cancel.order_cancel_transaction.order_id == order_id
+        assert order_id not in oanda_server.pending_orders
+
+        with pytest.raises(RuntimeError):
+            await client.cancel_limit_order(order_id)
+
+
+@pytest.mark.asyncio
+async def test_order_template_with_fake_server(oanda_server):
+    template = OrderTemplate(MarketOrderRequest(instrument=INSTRUMENT, units=UNITS))
+    async with OrderClient() as client:
+        for units in (Decimal("2"), Decimal("-2")):
+            result = await client.create_market_order_from_template(template, units, tag="t")
+            assert result.order_fill_transaction.units == units
+
+        with pytest.raises(ValueError):
+            await client.create_limit_order_from_template(template, UNITS)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_and_keepalive(oanda_server):
+    # opt-in: no request before the first order by default
+    async with OrderClient():
+        await asyncio.sleep(0.01)
+        assert oanda_server.request_count == 0
+
+    async with OrderClient(warm_up_connections=2, keepalive_interval=0.05) as client:
+        # connections are opened before the first order
+        assert oanda_server.request_count == 2
+        await asyncio.sleep(0.12)
+        assert oanda_server.request_count >= 4
+        assert "account" in await client.ping()
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_keepalive(oanda_server, monkeypatch):
+    oanda_server.latency = 0.05
+    client = OrderClient(keepalive_interval=0.01)
+    await client.open()
+    await asyncio.sleep(0.03)  # a ping is in flight
+    task = client._keepalive_task
+    assert task is not None
+
+    done_on_close = []
+    close = aiohttp.ClientSession.close
+
+    async def check_close(session):
+        done_on_close.append(task.done())
+        await close(session)
+
+    monkeypatch.setattr(aiohttp.ClientSession, "close", check_close)
+    await client.close()
+    assert done_on_close == [True]
+
+
+@pytest.mark.asyncio
+async def test_retry(oanda_server):
+    async with OrderClient(retry_delay=0) as client:
+        result = await client.create_limit_order(
+            LimitOrderRequest(instrument=INSTRUMENT, units=UNITS, price=Decimal("140"))
+        )
+
+        # cancel (PUT) is idempotent and retried on 5xx
+        oanda_server.fail_next = 2
+        await client.cancel_limit_order(result.order_create_transaction.id)
+        assert oanda_server.fail_next == 0
+
+        # ... but not more than max_retries times
+        oanda_server.fail_next = 3
+        with pytest.raises(RuntimeError):
+            await client.ping()
+
+        # creating an order (POST) is not retried on 5xx ...
+        oanda_server.fail_next = 1
+        with pytest.raises(RuntimeError):
+            await client.create_market_order(MarketOrderRequest(instrument=INSTRUMENT, units=UNITS))
+
+        # ... but is on 429
+        oanda_server.fail_next = 1
+        oanda_server.fail_status = 429
+        result = await client.create_market_order(
+            MarketOrderRequest(instrument=INSTRUMENT, units=UNITS)
+        )
+        assert result.order_fill_transaction.units == UNITS
@@ -0,0 +1,123 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from strats_oanda.client import PricingStreamClient
+from strats_oanda.model import ClientPrice, LazyClientPrice
+
+
+async def take(client, n: int) -> list:
+    prices = []
+    async for price in client.stream():
+        prices.append(price)
+        if len(prices) == n:
+            break
+    return prices
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client(oanda_server):
+    client = PricingStreamClient(["USD_JPY", "EUR_USD"])
+    prices = await take(client, 10)
+    assert all(isinstance(p, ClientPrice) for p in prices)
+    assert {p.instrument for p in prices} == {"USD_JPY", "EUR_USD"}
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_fast_decode(oanda_server):
+    client = PricingStreamClient(["USD_JPY"], fast_decode=True)
+    prices = await take(client, 10)
+    assert all(isinstance(p, LazyClientPrice) for p in prices)
+    assert all(p.best_bid.price < p.best_ask.price for p in prices)
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_reconnects(oanda_server):
+    oanda_server.disconnect_after = 5
+    client = PricingStreamClient(["USD_JPY"], base_delay=0)
+    prices = await take(client, 12)
+    assert len(prices) == 12
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_reconnects_with_batched_messages(oanda_server):
+    # as fast as possible: each write holds a batch of many messages
+    oanda_server.tick_rate = 0
+    oanda_server.disconnect_after = 5
+    client = PricingStreamClient(["USD_JPY"], base_delay=0)
+    prices = await take(client, 8)
+    assert len(prices) == 8
+    assert client.health.connects == 2
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_reconnects_on_stall(oanda_server):
+    oanda_server.stall_after = 5
+    client = PricingStreamClient(["USD_JPY"], base_delay=0, stall_timeout=0.1)
+    prices = await take(client, 8)
+    assert len(prices) == 8
+    assert client.health.stalls == 1
+    assert client.health.connects == 2
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_slow_consumer_is_not_a_stall(oanda_server):
+    oanda_server.tick_rate = 50
+    client = PricingStreamClient(["USD_JPY"], base_delay=0, stall_timeout=0.2)
+    stream = client.stream()
+    for _ in range(2):
+        await stream.__anext__()
+        await asyncio.sleep(0.4)  # the consumer is busy longer than stall_timeout
+    await stream.aclose()
+    assert client.health.stalls == 0
+    assert client.health.connects == 1
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_heartbeat(oanda_server):
+    oanda_server.tick_rate = 20
+    client = PricingStreamClient(["USD_JPY"])
+    await take(client, 10)
+    assert client.last_heartbeat is not None
+    assert client.health.heartbeats > 0
+    assert client.health.messages == 10
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_keeps_session(oanda_server):
+    oanda_server.disconnect_after = 5
+    client = PricingStreamClient(["USD_JPY"], base_delay=0)
+    stream = client.stream()
+    await stream.__anext__()
+    session = client.session
+    for _ in range(10):
+        await stream.__anext__()
+
+    assert client.session is session
+    assert client.health.connects >= 2
+    await stream.aclose()
+    assert session is not None and session.closed
+    assert client.session is None
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_conflate_releases_session(oanda_server):
+    client = PricingStreamClient(["USD_JPY"], conflate=True)
+    stream = client.stream()
+    await stream.__anext__()
+    session = client.session
+    await stream.aclose()
+    assert session is not None and session.closed
+    assert client.session is None
+
+
+@pytest.mark.asyncio
+async def test_pricing_stream_client_injected_session(oanda_server):
+    async with aiohttp.ClientSession() as session:
+        client = PricingStreamClient(["USD_JPY"], session=session)
+        stream = client.stream()
+        await stream.__anext__()
+        await stream.aclose()
+        assert client.session is session
+        assert not session.closed
@@ -0,0 +1,113 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from strats.monitor import StreamClient
+
+from strats_oanda.client import PricingHub
+from strats_oanda.model import ClientPrice, PriceBucket
+
+
+def make_price(instrument: str, bid: str) -> ClientPrice:
+    return ClientPrice(
+        type="PRICE",
+        instrument=instrument,
+        time=None,
+        timestamp=None,
+        tradeable=True,
+        bids=[PriceBucket(price=Decimal(bid), liquidity=250000)],
+        asks=[PriceBucket(price=Decimal(bid) + Decimal("0.004"), liquidity=250000)],
+        closeout_bid=Decimal(bid),
+        closeout_ask=Decimal(bid),
+    )
+
+
+class FakeUpstream(StreamClient):
+    def __init__(self, hub: "FakePricingHub"):
+        self.hub = hub
+
+    async def stream(self):
+        try:
+            for price in self.hub.prices:
+                yield price
+            if self.hub.endless:
+                await asyncio.sleep(3600)
+        finally:
+            await asyncio.sleep(0.01)  # closing the connection
+            self.hub.events.append("closed")
+
+
+class FakePricingHub(PricingHub):
+    def __init__(self, prices: list[ClientPrice], endless: bool = True):
+        super().__init__(resubscribe_delay=0)
+        self.prices = prices
+        self.endless = endless
+        self.connected: list[list[str]] = []
+        self.events: list[str] = []
+
+    def create_upstream(self, instruments):
+        self.connected.append(instruments)
+        self.events.append("connected")
+        return FakeUpstream(self)
+
+
+@pytest.mark.asyncio
+async def test_pricing_hub_fan_out():
+    usd_jpy = make_price("USD_JPY", "150.000")
+    eur_usd = make_price("EUR_USD", "1.080")
+    hub = FakePricingHub([usd_jpy, eur_usd])
+
+    a = hub.subscribe(["USD_JPY"])
+    b = hub.subscribe(["USD_JPY", "EUR_USD"])
+    await asyncio.sleep(0.01)
+
+    # one upstream with the union of the subscriptions
+    assert hub.connected == [["EUR_USD", "USD_JPY"]]
+    assert a.queue.qsize() == 1
+    assert b.queue.qsize() == 2
+    # each tick is parsed once and shared between subscribers
+    assert a.queue.get_nowait() is b.queue.get_nowait()
+
+    # unsubscribing an instrument nobody else needs reconnects the upstream
+    b.unsubscribe(["EUR_USD"])
+    await asyncio.sleep(0.05)
+    assert hub.connected[-1] == ["USD_JPY"]
+
+    await hub.close()
+    assert [p async for p in a.stream()] == [usd_jpy]
+
+
+@pytest.mark.asyncio
+async def test_pricing_subscription_drops_oldest():
+    hub = FakePricingHub([make_price("USD_JPY", str(150 + i)) for i in range(5)])
+    sub = hub.subscribe(["USD_JPY"], maxsize=2)
+    await asyncio.sleep(0.01)
+
+    assert sub.dropped == 3
+    assert sub.queue.get_nowait().bids[0].price == Decimal("153")
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_pricing_hub_closes_upstream_before_reconnecting():
+    hub = FakePricingHub([make_price("USD_JPY", "150.000")])
+    hub.subscribe(["USD_JPY"])
+    await asyncio.sleep(0.01)
+    hub.subscribe(["EUR_USD"])
+    await asyncio.sleep(0.05)
+
+    assert hub.events == ["connected", "closed", "connected"]
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_pricing_hub_drops_subscriptions_when_upstream_ends():
+    usd_jpy = make_price("USD_JPY", "150.000")
+    hub = FakePricingHub([usd_jpy], endless=False)
+    sub = hub.subscribe(["USD_JPY"])
+
+    assert [p async for p in sub.stream()] == [usd_jpy]
+    assert sub.closed
+    assert hub.subscriptions == []
+    assert hub.instruments == []
+    await hub.close()
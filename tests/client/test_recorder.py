@@ -0,0 +1,62 @@
+import pytest
+
+from strats_oanda.client import ReplayStreamClient, TickRecorder, TickRecording
+from strats_oanda.model import decode_client_price
+
+from .test_pricing_hub import make_price
+
+
+def test_tick_recorder(tmp_path):
+    with TickRecorder(tmp_path, flush_size=2) as recorder:
+        recorder.record(make_price("USD_JPY", "150.001"))
+        recorder.record(make_price("EUR_USD", "1.08"))
+        recorder.record(
+            decode_client_price(
+                b'{"type":"PRICE","time":"2025-03-31T15:31:22.518120299Z",'
+                b'"bids":[{"price":"150.002","liquidity":250000}],'
+                b'"asks":[{"price":"150.006","liquidity":500000}],'
+                b'"closeoutBid":"149.727","closeoutAsk":"149.742","instrument":"USD_JPY"}'
+            )
+        )
+
+    with TickRecording(tmp_path) as recording:
+        assert len(recording) == 3
+        assert recording.instruments == ["USD_JPY", "EUR_USD"]
+        ticks = list(recording)
+        assert [t.instrument for t in ticks] == ["USD_JPY", "EUR_USD", "USD_JPY"]
+        assert ticks[2].time_ns == 1743435082518120299
+        assert (ticks[2].bid, ticks[2].ask) == (150.002, 150.006)
+        assert ticks[2].ask_liquidity == 500000
+        assert str(ticks[2].best_bid.price) == "150.002"
+
+
+def test_tick_recorder_aligns_columns_after_interrupted_flush(tmp_path):
+    with TickRecorder(tmp_path) as recorder:
+        recorder.record(make_price("USD_JPY", "150.001"))
+
+    # a flush interrupted after writing two whole columns and part of the third
+    for file_name, data in [("time_ns.i64", 8), ("instrument.u16", 2), ("bid.f64", 3)]:
+        with open(tmp_path / file_name, "ab") as f:
+            f.write(b"\x01" * data)
+
+    with TickRecorder(tmp_path) as recorder:
+        recorder.record(make_price("USD_JPY", "150.002"))
+
+    with TickRecording(tmp_path) as recording:
+        assert len(recording) == 2
+        assert [(t.bid, t.instrument) for t in recording] == [
+            (150.001, "USD_JPY"),
+            (150.002, "USD_JPY"),
+        ]
+        assert {len(c) for c in recording.columns} == {2}
+
+
+@pytest.mark.asyncio
+async def test_replay_stream_client(tmp_path):
+    with TickRecorder(tmp_path) as recorder:
+        for i in range(10):
+            recorder.record(make_price("USD_JPY" if i % 2 else "EUR_USD", f"1.{i}"))
+
+    client = ReplayStreamClient(tmp_path, instruments=["USD_JPY"], yield_interval=2)
+    ticks = [t async for t in client.stream()]
+    assert [t.bid for t in ticks] == [1.1, 1.3, 1.5, 1.7, 1.9]
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from strats_oanda.client import Priority, RequestScheduler
+
+
+@pytest.mark.asyncio
+async def test_rate_limit():
+    scheduler = RequestScheduler(rate=100, burst=5)
+    start = time.monotonic()
+    await asyncio.gather(*(scheduler.acquire() for _ in range(15)))
+    elapsed = time.monotonic() - start
+
+    # 5 from the burst, 10 at 100/sec
+    assert 0.08 < elapsed < 0.5
+    stats = scheduler.stats[Priority.DEFAULT]
+    assert stats.count == 15
+    assert stats.delayed == 10
+    assert 0.08 < stats.max_delay < 0.5
+
+
+def test_acquire_blocking():
+    scheduler = RequestScheduler(rate=100, burst=5)
+    start = time.monotonic()
+    for _ in range(15):
+        scheduler.acquire_blocking(Priority.HISTORY)
+    elapsed = time.monotonic() - start
+
+    assert 0.08 < elapsed < 0.5
+    assert scheduler.stats[Priority.HISTORY].count == 15
+    assert scheduler.stats[Priority.HISTORY].delayed == 10
+
+
+@pytest.mark.asyncio
+async def test_priority():
+    scheduler = RequestScheduler(rate=100, burst=1)
+    order: list[str] = []
+
+    async def request(name: str, priority: Priority):
+        await scheduler.acquire(priority)
+        order.append(name)
+
+    await scheduler.acquire()  # empty the bucket
+    tasks = [asyncio.create_task(request(f"history{i}", Priority.HISTORY)) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(request(f"order{i}", Priority.ORDER)) for i in range(2)]
+    await asyncio.gather(*tasks)
+
+    assert order == ["order0", "order1", "history0", "history1", "history2"]
+    assert scheduler.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter():
+    scheduler = RequestScheduler(rate=50, burst=1)
+    await scheduler.acquire()
+    task = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    task.cancel()
+
+    await asyncio.wait_for(scheduler.acquire(), timeout=1)
+    assert scheduler.stats[Priority.DEFAULT].count == 2
+
+
+@pytest.mark.asyncio
+async def test_unlimited():
+    scheduler = RequestScheduler(rate=0)
+    await asyncio.gather(*(scheduler.acquire() for _ in range(1000)))
+    assert scheduler.stats[Priority.DEFAULT].delayed == 0
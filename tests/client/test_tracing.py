@@ -0,0 +1,91 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from strats_oanda.client import (
+    OrderClient,
+    PricingStreamClient,
+    TickToTradeTracer,
+    TransactionClient,
+)
+from strats_oanda.model import (
+    ClientExtensions,
+    LimitOrderRequest,
+    MarketOrderRequest,
+    OrderFillTransaction,
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fast_decode", [False, True])
+async def test_tick_to_trade(oanda_server, fast_decode):
+    oanda_server.fill_limit_orders = True
+    oanda_server.fill_delay = 0.02
+    tracer = TickToTradeTracer()
+    registry = tracer.registry
+
+    async def fills():
+        async for tx in TransactionClient().stream():
+            assert tx.received_ns is not None
+            if isinstance(tx, OrderFillTransaction):
+                return tracer.on_transaction(tx)
+
+    fill_task = asyncio.create_task(fills())
+    await asyncio.sleep(0.05)
+
+    async for price in PricingStreamClient(["USD_JPY"], fast_decode=fast_decode).stream():
+        assert price.received_ns is not None
+        tracer.on_tick(price)
+        break
+
+    async with OrderClient() as client:
+        tracer.order_sent(price, client_order_id="signal-1")
+        await client.create_limit_order(
+            LimitOrderRequest(
+                instrument="USD_JPY",
+                units=Decimal("1"),
+                price=Decimal("150"),
+                client_extensions=ClientExtensions(id="signal-1", tag="t", comment=""),
+            )
+        )
+
+    trace = await asyncio.wait_for(fill_task, 1)
+    assert trace is not None
+    assert trace.client_order_id == "signal-1"
+    assert trace.fill_received_ns is not None
+    assert trace.tick_received_ns <= trace.order_sent_ns < trace.fill_received_ns
+    assert tracer.pending == 0
+
+    for stage in ("feed", "decide", "fill", "tick_to_trade", "end_to_end"):
+        labels = {"instrument": "USD_JPY", "stage": stage}
+        assert registry.get_sample_value("oanda_tick_to_trade_latency_seconds_count", labels) == 1
+    fill_sum = registry.get_sample_value(
+        "oanda_tick_to_trade_latency_seconds_sum", {"instrument": "USD_JPY", "stage": "fill"}
+    )
+    assert fill_sum is not None and fill_sum >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_link_by_order_id(oanda_server):
+    registry = CollectorRegistry()
+    tracer = TickToTradeTracer(registry=registry, max_pending=1)
+
+    price = await PricingStreamClient(["EUR_USD"]).stream().__anext__()
+
+    async with OrderClient() as client:
+        traces = [tracer.order_sent(price) for _ in range(2)]
+        result = await client.create_market_order(
+            MarketOrderRequest(instrument="EUR_USD", units=Decimal("1"))
+        )
+        tracer.order_created(traces[0], "stale")
+        tracer.order_created(traces[1], result.order_create_transaction.id)
+
+    # only the latest `max_pending` orders are kept
+    assert tracer.pending == 1
+    # the fill of the REST response has no receive stamp: it is received now
+    assert tracer.on_transaction(result.order_fill_transaction) is traces[1]
+    assert tracer.on_transaction(result.order_fill_transaction) is None
+    labels = {"instrument": "EUR_USD", "stage": "tick_to_trade"}
+    assert registry.get_sample_value("oanda_tick_to_trade_latency_seconds_count", labels) == 1
@@ -0,0 +1,100 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from strats_oanda.client import OrderClient, TransactionClient
+from strats_oanda.model import (
+    DailyFinancingTransaction,
+    LimitOrderRequest,
+    LimitOrderTransaction,
+    OrderFillTransaction,
+)
+
+
+@pytest.mark.asyncio
+async def test_transaction_client(oanda_server):
+    oanda_server.fill_limit_orders = True
+    oanda_server.fill_delay = 0.05
+    received = []
+
+    async def consume():
+        async for tx in TransactionClient().stream():
+            received.append(tx)
+            if len(received) == 2:
+                break
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.05)
+
+    async with OrderClient() as client:
+        await client.create_limit_order(
+            LimitOrderRequest(instrument="USD_JPY", units=Decimal("1"), price=Decimal("150"))
+        )
+    await asyncio.wait_for(task, 1)
+
+    assert isinstance(received[0], LimitOrderTransaction)
+    assert isinstance(received[1], OrderFillTransaction)
+    assert received[1].order_id == received[0].id
+
+
+@pytest.mark.asyncio
+async def test_transaction_client_unknown_type(oanda_server):
+    client = TransactionClient()
+    stream = client.stream()
+    task = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0.05)
+
+    oanda_server.add_transaction({"type": "SOMETHING_NEW"})
+    oanda_server.add_transaction(
+        {"type": "DAILY_FINANCING", "financing": "-1.5", "accountBalance": "100"}
+    )
+    tx = await asyncio.wait_for(task, 1)
+    await stream.aclose()
+
+    assert isinstance(tx, DailyFinancingTransaction)
+    assert tx.financing == Decimal("-1.5")
+    assert client.unknown_counts == {"SOMETHING_NEW": 1}
+
+
+def add_fills(server, n: int):
+    for _ in range(n):
+        server.add_transaction(
+            {"type": "DAILY_FINANCING", "financing": "-1", "accountBalance": "100"}
+        )
+
+
+@pytest.mark.asyncio
+async def test_transaction_client_backfill(oanda_server):
+    oanda_server.transaction_page_size = 100
+    add_fills(oanda_server, 350)
+
+    client = TransactionClient(since_id="20")
+    stream = client.stream()
+    received = [await asyncio.wait_for(stream.__anext__(), 2) for _ in range(330)]
+
+    # live transactions follow the backfilled ones without duplicates
+    add_fills(oanda_server, 1)
+    received.append(await asyncio.wait_for(stream.__anext__(), 1))
+    await stream.aclose()
+
+    assert [int(tx.id) for tx in received] == list(range(21, 352))
+    assert client.last_transaction_id == "351"
+
+
+@pytest.mark.asyncio
+async def test_transaction_client_heartbeat_id(oanda_server):
+    add_fills(oanda_server, 3)
+    client = TransactionClient()
+    stream = client.stream()
+    task = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0.2)  # a few heartbeats
+
+    assert client.last_transaction_id is None
+    assert client.last_heartbeat is not None
+    assert client.last_heartbeat.last_transaction_id == "3"
+    assert client.health.heartbeats > 0
+    add_fills(oanda_server, 1)
+    tx = await asyncio.wait_for(task, 1)
+    await stream.aclose()
+    assert tx.id == "4"
@@ -0,0 +1,10 @@
+import pytest_asyncio
+
+from strats_oanda.testing import FakeOANDAServer
+
+
+@pytest_asyncio.fixture
+async def oanda_server():
+    async with FakeOANDAServer(tick_rate=1000, heartbeat_interval=0.05, seed=0) as server:
+        server.basic_config()
+        yield server
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from strats_oanda.helper import format_datetime, parse_time
+from strats_oanda.helper import datetime_to_ns, format_datetime, parse_time, parse_time_ns
 
 
 def test_format_datetime():
@@ -11,3 +11,10 @@ def test_format_datetime():
 def test_parse_time():
     s = "2025-03-24T15:34:25.366624289Z"
     assert parse_time(s) == datetime(2025, 3, 24, 15, 34, 25, 366624, tzinfo=timezone.utc)
+
+
+def test_parse_time_ns():
+    s = "2025-03-24T15:34:25.366624289Z"
+    assert parse_time_ns(s) == 1742830465366624289
+    assert parse_time_ns("2025-03-24T15:34:25Z") == 1742830465000000000
+    assert datetime_to_ns(parse_time(s)) == 1742830465366624000
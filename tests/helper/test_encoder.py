@@ -0,0 +1,90 @@
+import json
+from dataclasses import asdict
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from strats_oanda.client import OrderTemplate
+from strats_oanda.helper import JSONEncoder, remove_none, to_camel_case
+from strats_oanda.helper.encoder import encode_request
+from strats_oanda.model import (
+    ClientExtensions,
+    LimitOrderRequest,
+    MarketOrderRequest,
+    OrderPositionFill,
+    StopLossDetails,
+    TakeProfitDetails,
+)
+
+
+def legacy_encode(order) -> dict:
+    return json.loads(
+        json.dumps(to_camel_case(remove_none({"order": asdict(order)})), cls=JSONEncoder)
+    )
+
+
+def test_encode_request():
+    orders = [
+        MarketOrderRequest(instrument="USD_JPY", units=Decimal("1")),
+        MarketOrderRequest(
+            instrument="USD_JPY",
+            units=Decimal("-100"),
+            price_bound=Decimal("150.123"),
+            position_fill=OrderPositionFill.REDUCE_ONLY,
+            client_extensions=ClientExtensions(id="a", tag="b", comment='"quoted"'),
+        ),
+        LimitOrderRequest(
+            instrument="EUR_USD",
+            units=Decimal("1000"),
+            price=Decimal("1.08500"),
+            take_profit_on_fill=TakeProfitDetails(price=Decimal("1.09")),
+            stop_loss_on_fill=StopLossDetails(distance=Decimal("0.005")),
+            trade_client_extensions=ClientExtensions(id="t", tag="grid", comment=""),
+        ),
+    ]
+    for order in orders:
+        assert json.loads(encode_request("order", order)) == legacy_encode(order)
+
+
+def test_encode_request_datetime():
+    t = datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+    order = LimitOrderRequest(
+        instrument="USD_JPY", units=Decimal("1"), price=Decimal("150"), gtd_time=t
+    )
+    assert json.loads(encode_request("order", order))["order"]["gtdTime"] == (
+        "2025-01-02T03:04:05.123456000Z"
+    )
+
+
+def test_order_template():
+    base = LimitOrderRequest(
+        instrument="USD_JPY",
+        units=Decimal("1"),
+        price=Decimal("150"),
+        client_extensions=ClientExtensions(id="base", tag="base", comment="c"),
+    )
+    template = OrderTemplate(base)
+
+    # without overrides the template renders the request itself
+    assert json.loads(template.render(Decimal("1"))) == legacy_encode(base)
+
+    expected = LimitOrderRequest(
+        instrument="USD_JPY",
+        units=Decimal("-25"),
+        price=Decimal("151.5"),
+        client_extensions=ClientExtensions(id="order-2", tag="grid", comment="c"),
+    )
+    rendered = template.render(Decimal("-25"), Decimal("151.5"), tag="grid", client_id="order-2")
+    assert json.loads(rendered) == legacy_encode(expected)
+
+
+def test_market_order_template():
+    template = OrderTemplate(MarketOrderRequest(instrument="USD_JPY", units=Decimal("1")))
+    expected = MarketOrderRequest(
+        instrument="USD_JPY",
+        units=Decimal("3"),
+        price_bound=Decimal("150.1"),
+        client_extensions=None,
+    )
+    data = json.loads(template.render(Decimal("3"), Decimal("150.1"), tag="x"))
+    assert data["order"].pop("clientExtensions") == {"tag": "x"}
+    assert data == legacy_encode(expected)
@@ -0,0 +1,43 @@
+import pytest
+
+from strats_oanda.model import parse_candlestick_arrays
+from strats_oanda.model.instrument import parse_candlestick
+
+np = pytest.importorskip("numpy")
+
+
+def test_parse_candlestick_arrays():
+    candles = [
+        {
+            "complete": True,
+            "volume": 12,
+            "time": "2025-03-24T15:34:00.000000000Z",
+            "bid": {"o": "150.690", "h": "150.700", "l": "150.680", "c": "150.695"},
+            "mid": {"o": "150.692", "h": "150.702", "l": "150.682", "c": "150.697"},
+        },
+        {
+            "complete": False,
+            "volume": 3,
+            "time": "2025-03-24T15:35:00.000000000Z",
+            "bid": {"o": "150.695", "h": "150.699", "l": "150.690", "c": "150.691"},
+            "mid": {"o": "150.697", "h": "150.701", "l": "150.692", "c": "150.693"},
+        },
+    ]
+    got = parse_candlestick_arrays(candles)
+
+    assert len(got) == 2
+    assert got.time.dtype == np.int64
+    assert got.time.tolist() == [1742830440000000000, 1742830500000000000]
+    assert got.volume.tolist() == [12, 3]
+    assert got.complete.tolist() == [True, False]
+    assert got.ask is None
+    assert got.bid is not None and got.mid is not None
+    assert got.bid.ohlc.flags["C_CONTIGUOUS"]
+    assert got.mid.c.tolist() == [150.697, 150.693]
+    assert got.bid.h.tolist() == [float(parse_candlestick(x).bid.h) for x in candles]
+
+
+def test_parse_candlestick_arrays_empty():
+    got = parse_candlestick_arrays([])
+    assert len(got) == 0
+    assert got.mid is None
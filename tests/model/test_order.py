@@ -122,10 +122,10 @@ def test_parse_create_market_order_response():
             instrument="USD_JPY",
             units=Decimal("1"),
             home_conversion_factors=HomeConversionFactors(
-                gain_quote_home={"factor": "1"},
-                loss_quote_home={"factor": "1"},
-                gain_base_home={"factor": "150.459478"},
-                loss_base_home={"factor": "151.062522"},
+                gain_quote_home=Decimal("1"),
+                loss_quote_home=Decimal("1"),
+                gain_base_home=Decimal("150.459478"),
+                loss_base_home=Decimal("151.062522"),
             ),
             full_vwap=Decimal("150.763"),
             full_price=ClientPrice(
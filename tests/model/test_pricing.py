@@ -1,7 +1,14 @@
+import json
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from strats_oanda.model import ClientPrice, PriceBucket, parse_client_price
+from strats_oanda.model import (
+    ClientPrice,
+    LazyClientPrice,
+    PriceBucket,
+    decode_client_price,
+    parse_client_price,
+)
 
 
 def test_parse_client_price():
@@ -82,3 +89,35 @@ def test_parse_client_price_in_pricing_stream_api():
         closeout_ask=Decimal("149.742"),
     )
     assert parse_client_price(data) == expect
+
+
+def test_decode_client_price():
+    data = {
+        "type": "PRICE",
+        "time": "2025-03-31T15:31:22.518120299Z",
+        "bids": [
+            {"price": "149.732", "liquidity": 250000},
+            {"price": "149.731", "liquidity": 1000000},
+        ],
+        "asks": [
+            {"price": "149.736", "liquidity": 250000},
+            {"price": "149.737", "liquidity": 1000000},
+        ],
+        "closeoutBid": "149.727",
+        "closeoutAsk": "149.742",
+        "status": "tradeable",
+        "tradeable": True,
+        "instrument": "USD_JPY",
+    }
+    got = decode_client_price(json.dumps(data).encode() + b"\n")
+    assert isinstance(got, LazyClientPrice)
+
+    # top-of-book is built eagerly
+    assert got.instrument == "USD_JPY"
+    assert got.best_bid == PriceBucket(price=Decimal("149.732"), liquidity=250000)
+    assert got.best_ask == PriceBucket(price=Decimal("149.736"), liquidity=250000)
+
+    # the rest is built on first access and is equal to the eager parser
+    assert got.to_client_price() == parse_client_price(data)
+    assert got.bids[0] is got.best_bid
+    assert got.time is got.time
@@ -3,12 +3,19 @@ from decimal import Decimal
 
 from strats_oanda.model import (
     ClientPrice,
+    DailyFinancingTransaction,
     HomeConversionFactors,
     OrderFillReason,
     OrderFillTransaction,
+    OrderTriggerCondition,
+    PositionFinancing,
     PriceBucket,
+    RejectTransaction,
+    StopLossOrderTransaction,
     TradeOpen,
+    TradeReduce,
     parse_order_fill_transaction,
+    parse_transaction,
 )
 
 
@@ -76,10 +83,10 @@ def test_parse_order_fill_transaction():
         instrument="USD_JPY",
         units=Decimal("-1"),
         home_conversion_factors=HomeConversionFactors(
-            gain_quote_home={"factor": "1"},
-            loss_quote_home={"factor": "1"},
-            gain_base_home={"factor": "150.193012"},
-            loss_base_home={"factor": "150.794988"},
+            gain_quote_home=Decimal("1"),
+            loss_quote_home=Decimal("1"),
+            gain_base_home=Decimal("150.193012"),
+            loss_base_home=Decimal("150.794988"),
         ),
         full_vwap=Decimal("150.492"),
         full_price=ClientPrice(
@@ -126,3 +133,102 @@ def test_parse_order_fill_transaction():
         half_spread_cost=Decimal("0.0020"),
     )
     assert got == expect
+
+    # closing the trade
+    data = {k: v for k, v in data.items() if k != "tradeOpened"}
+    data["units"] = "1"
+    data["tradesClosed"] = [
+        {
+            "tradeID": "69",
+            "units": "1",
+            "price": "150.496",
+            "realizedPL": "-0.0040",
+            "financing": "0.0000",
+            "baseFinancing": "0",
+            "guaranteedExecutionFee": "0.0000",
+            "quoteGuaranteedExecutionFee": "0",
+            "halfSpreadCost": "0.0020",
+        }
+    ]
+    got = parse_order_fill_transaction(data)
+    assert got.trade_opened is None
+    assert got.trades_closed == [TradeReduce("69", Decimal("1"), Decimal("150.496"))]
+
+
+BASE = {
+    "id": "100",
+    "time": "2025-03-26T21:00:00.000000000Z",
+    "userID": 1,
+    "accountID": "101-009-31084545-001",
+    "batchID": "100",
+}
+
+
+def test_parse_transaction_daily_financing():
+    got = parse_transaction(
+        {
+            **BASE,
+            "type": "DAILY_FINANCING",
+            "financing": "-12.3456",
+            "accountBalance": "2999987.6654",
+            "accountFinancingMode": "DAILY",
+            "positionFinancings": [{"instrument": "USD_JPY", "financing": "-12.3456"}],
+        }
+    )
+    assert isinstance(got, DailyFinancingTransaction)
+    assert got.financing == Decimal("-12.3456")
+    assert got.position_financings == [PositionFinancing("USD_JPY", Decimal("-12.3456"))]
+
+
+def test_parse_transaction_stop_loss_order():
+    got = parse_transaction(
+        {
+            **BASE,
+            "type": "STOP_LOSS_ORDER",
+            "tradeID": "69",
+            "price": "149.500",
+            "timeInForce": "GTC",
+            "triggerCondition": "DEFAULT",
+            "reason": "ON_FILL",
+            "orderFillTransactionID": "68",
+        }
+    )
+    assert isinstance(got, StopLossOrderTransaction)
+    assert got.trade_id == "69"
+    assert got.price == Decimal("149.500")
+    assert got.distance is None
+    assert got.order_fill_transaction_id == "68"
+
+    got = parse_transaction(
+        {
+            **BASE,
+            "type": "STOP_LOSS_ORDER",
+            "tradeID": "69",
+            "price": "149.500",
+            "timeInForce": "GTC",
+            "triggerCondition": "MID",
+            "reason": "CLIENT_ORDER",
+        }
+    )
+    assert isinstance(got, StopLossOrderTransaction)
+    assert got.trigger_condition == OrderTriggerCondition.MID
+
+
+def test_parse_transaction_reject():
+    got = parse_transaction(
+        {
+            **BASE,
+            "type": "LIMIT_ORDER_REJECT",
+            "instrument": "USD_JPY",
+            "units": "100",
+            "rejectReason": "INSUFFICIENT_MARGIN",
+        }
+    )
+    assert isinstance(got, RejectTransaction)
+    assert got.type == "LIMIT_ORDER_REJECT"
+    assert got.reject_reason == "INSUFFICIENT_MARGIN"
+    assert got.units == Decimal("100")
+
+
+def test_parse_transaction_unknown_type():
+    assert parse_transaction({**BASE, "type": "SOMETHING_NEW"}) is None
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from strats_oanda.state.trade import TradeAggregates
+from strats_oanda.state.trade.trade import Transaction
+
+T = datetime(2025, 3, 26, tzinfo=timezone.utc)
+
+
+def fill(id: str, units: str, pl: str, instrument: str, tags=None) -> Transaction:
+    return Transaction(
+        id=id,
+        order_id=id,
+        units=Decimal(units),
+        price=Decimal("150"),
+        time=T,
+        pl=Decimal(pl),
+        tags=tags,
+        instrument=instrument,
+    )
+
+
+def test_trade_aggregates():
+    aggregates = TradeAggregates()
+    aggregates.add(fill("1", "10", "0", "USD_JPY", {"level": 1, "side": "bid"}))
+    aggregates.add(fill("2", "-4", "12.5", "USD_JPY", {"level": 2, "side": "ask"}))
+    aggregates.add(fill("3", "3", "-1.5", "EUR_USD", {"level": 1, "extra": ["unhashable"]}))
+
+    assert aggregates.total.profit == Decimal("11.0")
+    assert aggregates.total.units == Decimal("9")
+    assert aggregates.total.count == 3
+
+    assert aggregates.instrument("USD_JPY").units == Decimal("6")
+    assert aggregates.instrument("USD_JPY").profit == Decimal("12.5")
+    assert aggregates.instrument("EUR_USD").count == 1
+    assert aggregates.instrument("GBP_USD").count == 0
+
+    assert aggregates.tag("level", 1).units == Decimal("13")
+    assert aggregates.tag("side", "ask").profit == Decimal("12.5")
+    assert all(key != "extra" for key, _ in aggregates.by_tag)
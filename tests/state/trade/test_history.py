@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from strats_oanda.state.trade import Transaction, TransactionHistory
+
+T = datetime(2025, 3, 26, tzinfo=timezone.utc)
+
+
+def fill(i: int) -> Transaction:
+    return Transaction(
+        id=str(i),
+        order_id=str(i),
+        units=Decimal("1") if i % 2 else Decimal("-1"),
+        price=Decimal("150.001") + i,
+        time=T + timedelta(minutes=i),
+        pl=Decimal("0.0001") * i,
+        tags={"level": i % 2},
+        instrument="USD_JPY",
+    )
+
+
+def test_transaction_history_spills_to_log(tmp_path):
+    history = TransactionHistory(max_size=2, path=tmp_path / "fills.jsonl")
+    for i in range(1, 6):
+        history.add(fill(i))
+
+    assert list(history) == ["4", "5"]
+    assert history["5"] == fill(5)
+    assert history.evicted == 3
+    # evicted fills still count as seen
+    assert "1" in history
+    assert "6" not in history
+
+    assert list(history.query()) == [fill(i) for i in range(1, 6)]
+    got = history.query(from_time=T + timedelta(minutes=2), to_time=T + timedelta(minutes=5))
+    assert [tx.id for tx in got] == ["2", "3", "4"]
+    assert [tx.id for tx in history.query(tag=("level", 1))] == ["1", "3", "5"]
+
+    history.close()
+    assert [tx.id for tx in TransactionHistory(path=tmp_path / "fills.jsonl").query()] == [
+        "1",
+        "2",
+        "3",
+    ]
+
+
+def test_transaction_history_out_of_order_ids():
+    history = TransactionHistory(max_size=2)
+    # e.g. an early fill replayed after later ones, past the bound
+    for i in [10, 12, 3, 11, 20, 1]:
+        history.add(fill(i))
+
+    assert list(history) == ["20", "1"]
+    assert history.evicted == 4
+    for i in [10, 12, 3, 11]:
+        assert str(i) in history
+    # lower than evicted ids, but never added
+    for i in [2, 4, 9, 13]:
+        assert str(i) not in history
+
+
+def test_transaction_history_without_log():
+    history = TransactionHistory(max_size=2)
+    for i in range(1, 6):
+        history.add(fill(i))
+    assert [tx.id for tx in history.query()] == ["4", "5"]
+
+    with pytest.raises(ValueError):
+        TransactionHistory(max_size=0)
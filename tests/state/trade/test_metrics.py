@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+import pytest
+
+from strats_oanda.client import OrderClient
+from strats_oanda.model import MarketOrderRequest
+from strats_oanda.state import Trade, TradeMetrics, trade_to_trade_metrics
+
+
+@pytest.mark.asyncio
+async def test_trade_metrics(oanda_server):
+    metrics = TradeMetrics(flush_interval=60)
+    TradeMetrics()  # collectors are not global
+
+    trade = Trade(order_client=OrderClient())
+    await trade.session_open()
+    labels = {"trade_id": str(trade.id), "instrument": "USD_JPY"}
+
+    await trade.create_market_order(
+        MarketOrderRequest(instrument="USD_JPY", units=Decimal("2")), tags={"level": 1}
+    )
+    trade_to_trade_metrics(trade, metrics)  # first call flushes
+    assert metrics.registry.get_sample_value("oanda_trade_net_units", labels) == 2
+    assert metrics.registry.get_sample_value("oanda_trade_transaction_count_total", labels) == 1
+
+    await trade.create_market_order(
+        MarketOrderRequest(instrument="USD_JPY", units=Decimal("3")), tags={"level": 1}
+    )
+    trade_to_trade_metrics(trade, metrics)  # coalesced until the next flush
+    assert metrics.registry.get_sample_value("oanda_trade_net_units", labels) == 2
+
+    metrics.flush()
+    assert metrics.registry.get_sample_value("oanda_trade_net_units", labels) == 5
+    assert metrics.registry.get_sample_value("oanda_trade_transaction_count_total", labels) == 2
+    assert (
+        metrics.registry.get_sample_value(
+            "oanda_trade_tag_units", {"trade_id": str(trade.id), "tag": "level=1"}
+        )
+        == 5
+    )
+
+    await trade.session_close()
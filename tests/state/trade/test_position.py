@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from strats_oanda.model import ClientPrice, HomeConversionFactors, PriceBucket
+from strats_oanda.state.trade import Position
+
+FACTORS = HomeConversionFactors(
+    gain_quote_home=Decimal("150"),
+    loss_quote_home=Decimal("151"),
+    gain_base_home=Decimal("1"),
+    loss_base_home=Decimal("1"),
+)
+
+
+def price(bid: str, ask: str) -> ClientPrice:
+    return ClientPrice(
+        type="PRICE",
+        instrument="EUR_USD",
+        time=None,
+        timestamp=None,
+        tradeable=True,
+        bids=[PriceBucket(price=Decimal(bid), liquidity=1000000)],
+        asks=[PriceBucket(price=Decimal(ask), liquidity=1000000)],
+        closeout_bid=Decimal(bid),
+        closeout_ask=Decimal(ask),
+    )
+
+
+def test_position_average_cost():
+    position = Position("EUR_USD")
+    position.fill(Decimal("100"), Decimal("1.1000"), FACTORS)
+    position.fill(Decimal("300"), Decimal("1.1040"), FACTORS)
+    assert position.units == Decimal("400")
+    assert position.average_price == Decimal("1.1030")
+
+    # long positions are marked at the bid
+    position.on_price(price("1.1050", "1.1052"))
+    assert position.unrealized_pl == Decimal("0.8000")
+    assert position.unrealized_pl_home == Decimal("120.0000")
+
+    # partial close realizes against the average cost
+    position.fill(Decimal("-100"), Decimal("1.1010"), FACTORS)
+    assert position.units == Decimal("300")
+    assert position.average_price == Decimal("1.1030")
+    assert position.realized_pl == Decimal("-0.2000")
+    assert position.realized_pl_home == Decimal("-30.2000")
+    assert position.unrealized_pl == Decimal("0.6000")
+
+
+def test_position_flip_and_close():
+    position = Position("EUR_USD")
+    position.fill(Decimal("100"), Decimal("1.1000"))
+    position.fill(Decimal("-150"), Decimal("1.1020"))
+    assert position.units == Decimal("-50")
+    assert position.average_price == Decimal("1.1020")
+    assert position.realized_pl == Decimal("0.2000")
+
+    # short positions are marked at the ask
+    position.on_price(price("1.1000", "1.1010"))
+    assert position.unrealized_pl == Decimal("0.0500")
+
+    position.fill(Decimal("50"), Decimal("1.1010"))
+    assert position.units == 0
+    assert position.unrealized_pl == 0
+    assert position.realized_pl == Decimal("0.2500")
@@ -6,11 +6,14 @@ import pytest
 import strats_oanda
 from strats_oanda.client import OrderClient
 from strats_oanda.model import (
+    ClientExtensions,
     LimitOrderRequest,
     MarketOrderRequest,
     OrderPositionFill,
+    parse_client_price,
+    parse_transaction,
 )
-from strats_oanda.state import Trade
+from strats_oanda.state import Trade, transaction_to_trade
 
 INSTRUMENT = "USD_JPY"
 UNITS = Decimal("1")
@@ -90,3 +93,247 @@ async def test_create_limit_order():
     assert len(trade.limit_orders) == 0
 
     await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_batch_limit_orders_with_fake_server(oanda_server):
+    trade = Trade(order_client=OrderClient(max_in_flight=2))
+    await trade.session_open()
+
+    requests = [
+        LimitOrderRequest(instrument=INSTRUMENT, units=UNITS, price=Decimal(140 + i))
+        for i in range(5)
+    ]
+    results = await trade.create_limit_orders(requests, tags=[{"level": i} for i in range(5)])
+    limit_orders = [o for o in results if not isinstance(o, Exception)]
+    assert [o.price for o in limit_orders] == [r.price for r in requests]
+    assert [o.tags for o in limit_orders] == [{"level": i} for i in range(5)]
+    assert len(trade.limit_orders) == 5
+
+    ids = [o.id for o in limit_orders]
+    results = await trade.cancel_limit_orders([ids[0], "unknown", ids[1]])
+    assert results[0] == ids[0]
+    assert isinstance(results[1], ValueError)
+    assert results[2] == ids[1]
+    assert set(trade.limit_orders) == set(ids[2:])
+
+    # cancelled on the server but not known to the trade: the error is returned per item
+    oanda_server.pending_orders.pop(ids[2])
+    results = await trade.cancel_limit_orders(ids[2:])
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == ids[3:]
+    assert set(trade.limit_orders) == {ids[2]}
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_aggregates_with_fake_server(oanda_server):
+    trade = Trade(order_client=OrderClient())
+    await trade.session_open()
+
+    await trade.create_market_order(
+        MarketOrderRequest(instrument=INSTRUMENT, units=Decimal("3")), tags={"side": "long"}
+    )
+    await trade.create_market_order(
+        MarketOrderRequest(instrument="EUR_USD", units=Decimal("-1")), tags={"side": "short"}
+    )
+    await trade.create_market_order(
+        MarketOrderRequest(instrument=INSTRUMENT, units=Decimal("-1")), tags={"side": "short"}
+    )
+
+    assert trade.net_units == Decimal("1")
+    assert trade.total_profit == Decimal("0")
+    assert trade.net_units_by_instrument() == {INSTRUMENT: Decimal("2"), "EUR_USD": Decimal("-1")}
+    assert trade.aggregates.tag("side", "short").units == Decimal("-2")
+    assert trade.aggregates.total.count == len(trade.transactions) == 3
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_aggregates_exact_after_eviction(oanda_server):
+    trade = Trade(order_client=OrderClient(), history_size=2)
+    await trade.session_open()
+
+    for units in ("3", "-1", "2"):
+        await trade.create_market_order(
+            MarketOrderRequest(instrument=INSTRUMENT, units=Decimal(units))
+        )
+
+    assert len(trade.transactions) == 2
+    assert trade.transactions.evicted == 1
+    assert trade.net_units == Decimal("4")
+    assert trade.aggregates.total.count == 3
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_positions_marked_to_market(oanda_server):
+    trade = Trade(order_client=OrderClient())
+    await trade.session_open()
+
+    tx = await trade.create_market_order(
+        MarketOrderRequest(instrument=INSTRUMENT, units=Decimal("10"))
+    )
+    position = trade.positions[INSTRUMENT]
+    assert position.units == Decimal("10")
+    assert position.average_price == tx.price
+
+    price = oanda_server.next_price(INSTRUMENT)
+    price["bids"][0]["price"] = str(tx.price + 1)
+    trade.on_price(parse_client_price(price))
+    assert trade.unrealized_pl == Decimal("10")
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_fill_before_limit_order_is_registered(oanda_server):
+    oanda_server.fill_limit_orders = True
+    order_client = OrderClient()
+    trade = Trade(order_client=order_client)
+    await trade.session_open()
+
+    request = LimitOrderRequest(
+        instrument=INSTRUMENT,
+        units=UNITS,
+        price=Decimal("140"),
+        client_extensions=ClientExtensions(id="my-order", tag="", comment=""),
+    )
+    result = await order_client.create_limit_order(request)
+    while oanda_server.pending_orders:
+        await asyncio.sleep(0.01)
+
+    # the stream delivers the fill before create_limit_order returns
+    fill = parse_transaction(oanda_server.transactions[-1])
+    transaction_to_trade(fill, trade)
+    assert len(trade.transactions) == 0
+    assert list(trade.pending) == [fill.order_id]
+
+    trade._add_limit_order(request, result, {"level": 0})
+    assert trade.pending == {}
+    assert trade.limit_orders == {}
+    assert trade.client_order_ids == {}
+    assert trade.transactions[fill.id].tags == {"level": 0}
+    assert trade.trade_ids == {fill.trade_opened.trade_id: fill.order_id}
+
+    # delivered again, e.g. by the backfill after a reconnect
+    transaction_to_trade(fill, trade)
+    assert trade.net_units == UNITS
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_order_cancelled_by_server(oanda_server):
+    trade = Trade(order_client=OrderClient())
+    await trade.session_open()
+
+    limit_order = await trade.create_limit_order(
+        LimitOrderRequest(
+            instrument=INSTRUMENT,
+            units=UNITS,
+            price=Decimal("140"),
+            client_extensions=ClientExtensions(id="my-order", tag="", comment=""),
+        )
+    )
+    assert limit_order.client_order_id == "my-order"
+    assert trade.limit_order_by_client_id("my-order") is limit_order
+
+    # e.g. cancelled from another process
+    async with OrderClient() as other:
+        await other.cancel_limit_order(limit_order.id)
+    cancel = parse_transaction(oanda_server.transactions[-1])
+    transaction_to_trade(cancel, trade)
+    assert trade.limit_orders == {}
+    assert trade.limit_order_by_client_id("my-order") is None
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_pending_is_bounded(oanda_server):
+    trade = Trade(order_client=OrderClient(), max_pending=2)
+    await trade.session_open()
+
+    # fills of orders of another trade on the same account
+    for _ in range(3):
+        await trade.order_client.create_market_order(
+            MarketOrderRequest(instrument=INSTRUMENT, units=UNITS)
+        )
+        transaction_to_trade(parse_transaction(oanda_server.transactions[-1]), trade)
+    assert len(trade.pending) == 2
+    assert len(trade.transactions) == 0
+
+    tx = await trade.create_market_order(MarketOrderRequest(instrument=INSTRUMENT, units=UNITS))
+    # the stream delivers the fill of the market order after its response
+    transaction_to_trade(parse_transaction(oanda_server.transactions[-1]), trade)
+    assert list(trade.transactions) == [tx.id]
+    assert len(trade.pending) == 2
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_forgets_closed_trades(oanda_server):
+    trade = Trade(order_client=OrderClient())
+    await trade.session_open()
+
+    await trade.create_market_order(MarketOrderRequest(instrument=INSTRUMENT, units=UNITS))
+    opening = oanda_server.transactions[-1]
+    trade_id = opening["tradeOpened"]["tradeID"]
+    assert list(trade.trade_ids) == [trade_id]
+
+    limit_order = await trade.create_limit_order(
+        LimitOrderRequest(instrument=INSTRUMENT, units=-UNITS, price=Decimal(opening["price"]))
+    )
+    closing = {k: v for k, v in opening.items() if k != "tradeOpened"}
+    closing.update(
+        id=str(oanda_server.last_transaction_id + 1),
+        orderID=limit_order.id,
+        units=str(-UNITS),
+        reason="LIMIT_ORDER",
+        tradesClosed=[
+            {
+                "tradeID": trade_id,
+                "units": str(-UNITS),
+                "price": opening["price"],
+                "realizedPL": "0.0000",
+                "financing": "0.0000",
+                "guaranteedExecutionFee": "0.0000",
+                "halfSpreadCost": "0.0020",
+            }
+        ],
+    )
+    transaction_to_trade(parse_transaction(closing), trade)
+    assert trade.limit_orders == {}
+    assert trade.trade_ids == {}
+
+    await trade.session_close()
+
+
+@pytest.mark.asyncio
+async def test_trade_replays_early_fill_after_eviction(oanda_server):
+    oanda_server.fill_limit_orders = True
+    order_client = OrderClient()
+    trade = Trade(order_client=order_client, history_size=1)
+    await trade.session_open()
+
+    request = LimitOrderRequest(instrument=INSTRUMENT, units=UNITS, price=Decimal("140"))
+    result = await order_client.create_limit_order(request)
+    while oanda_server.pending_orders:
+        await asyncio.sleep(0.01)
+    transaction_to_trade(parse_transaction(oanda_server.transactions[-1]), trade)
+
+    # later fills with higher ids, one of them evicted
+    for _ in range(2):
+        await trade.create_market_order(MarketOrderRequest(instrument=INSTRUMENT, units=UNITS))
+    assert trade.transactions.evicted == 1
+
+    trade._add_limit_order(request, result, None)
+    assert trade.aggregates.total.count == 3
+    assert trade.net_units == 3 * UNITS
+
+    await trade.session_close()